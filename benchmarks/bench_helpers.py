@@ -0,0 +1,447 @@
+"""
+WENBNB Helper Benchmarks v1.0 — Micro-Benchmarks for Per-Message Helpers
+──────────────────────────────────────────────────────────────────────────────
+• pytest-benchmark style runner with no extra dependencies: calibrated
+  rounds, gc off while timing, min / median / mean / stddev per call + OPS
+• Realistic corpora: English, Hinglish, Devanagari and emoji-heavy chat,
+  plus memory-entry lists and DexScreener-like (liquidity, volume) pairs
+• Covers every helper that runs on each message or command, and the whole
+  per-message preprocessing chain
+• Pair ranking over DexScreener-sized answers (30 / 300 / 3000 pairs),
+  next to the pure-Python scoring loop it replaced
+• Baselines live in benchmarks/baselines.json; comparisons are scaled by a
+  fixed pure-Python reference loop so a slower CI box is not a "regression"
+• A row over the limit is re-measured CONFIRM_RUNS times, each next to a
+  fresh reference, and fails only if every run agrees; rows under SMALL_US
+  (single-µs helpers, the noisiest) get at least SMALL_REGRESS % slack
+• --save merges: rows are stored in the baseline's reference frame, so
+  `-k name --save` refreshes only those rows
+
+    python -m benchmarks.bench_helpers                    # run + compare
+    python -m benchmarks.bench_helpers -k detect_topic    # filter by name
+    python -m benchmarks.bench_helpers --save             # refresh baselines
+"""
+
+import argparse, gc, json, os, platform, random, statistics, sys, tempfile, time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_FILE = os.path.join(ROOT, "benchmarks", "baselines.json")
+ROUND_NS = 10_000_000      # calibrate inner loops so one round takes ≥ 10 ms
+MIN_ROUNDS = 5
+CONFIRM_RUNS = 3           # re-measurements before a regression is reported
+SMALL_US = 10              # rows faster than this per call…
+SMALL_REGRESS = 50         # …may drop this much (%) before they count
+
+# === CORPORA ===
+CORPORA = {
+    "english": [
+        "gm everyone, what's the plan for today?",
+        "is bnb going to pump this week or are we dumping again",
+        "how do I connect metamask and stake on the new dex?",
+        "just claimed the airdrop reward, points finally showed up",
+        "I'm so tired after work, need some sleep before the next trade",
+        "can someone explain gas fees on this contract deploy",
+        "chart looks bullish, price broke the trend line with volume",
+        "waiting for the bridge to confirm, it's been an hour",
+        "booked a flight and hotel for the crypto conference trip",
+        "honestly the market feels slow and steady today, just chill",
+        "lost a lot on that red candle, pain",
+        "what is the best wallet for a beginner who wants to hodl",
+    ],
+    "hinglish": [
+        "bhai market kaisa lag raha hai aaj?",
+        "yaar airdrop kab aayega, bata na",
+        "kya scene hai wenbnb ka, hold karu ya sell?",
+        "acha sun, chart dekh ke bata pump hoga kya",
+        "nahi yaar, aaj kuch mood nahi hai trade karne ka",
+        "haan bhai claim kar liya, reward aa gaya",
+        "bolo kise wallet connect karna hai",
+        "chal theek hai, thoda chill karte hai aaj",
+        "kuch tips do na staking ke liye",
+        "bhai gas fees bahut zyada hai aaj",
+        "price gir gaya yaar, loss ho gaya",
+        "meme coin mein paisa lagau kya? lol",
+    ],
+    "devanagari": [
+        "नमस्ते दोस्तों, आज बाजार कैसा है?",
+        "मुझे नया टोकन खरीदना चाहिए क्या?",
+        "एयरड्रॉप का रिवॉर्ड कब मिलेगा भाई",
+        "आज बहुत थकान है, थोड़ा आराम करूँगा",
+        "bnb का चार्ट देखो, pump हो रहा है",
+        "वॉलेट कनेक्ट नहीं हो रहा, मदद करो",
+        "मार्केट में आज बहुत गिरावट है",
+        "सब लोग शांत रहो, hodl करो",
+        "क्या यह कॉन्ट्रैक्ट सुरक्षित है?",
+        "यात्रा के लिए होटल बुक कर लिया",
+        "मज़ेदार मीम भेजो कोई",
+        "लंबे समय के लिए निवेश करना सही है",
+    ],
+    "emoji": [
+        "🚀🚀🚀 to the moon!!! 🌕",
+        "😭😭 why is everything red 📉",
+        "gm ☀️☕ let's get this bread 🍞",
+        "🔥🔥 this meme is lit 😂😂",
+        "💎🙌 hodl hodl hodl 💎🙌",
+        "🤔 wen airdrop? 🪂🎁",
+        "😴😴 market so slow today 🐢",
+        "🎉🎉 we did it fam 🥳🥂",
+        "😡 who dumped on me 🗑️",
+        "👀👀 something big is coming 👀",
+        "💸💸 gas fees are crazy ⛽🤯",
+        "❤️ love this community 🫶✨",
+    ],
+}
+# Not timed — sentiment's single and batch paths must agree on these too
+# (non-ASCII capitals change length when lower-cased: "İ" → "i̇")
+EDGE_TEXTS = [
+    "İstanbul is GREAT", "ǅemal is SO happy", "ẞ GREAT day", "ﬁne but the chart is BAD!!",
+    "I DON'T like this", "", "!!!", "GREAT 🚀 ŞAHANE",
+]
+# (liquidity_usd, volume24_usd, pair_age_days) as DexScreener returns them
+PAIRS = [(random.Random(i).uniform(1e2, 5e7), random.Random(-i).uniform(0, 2e7), i % 45)
+         for i in range(64)]
+
+
+def _dex_pairs(n, seed=3):
+    """Full DexScreener pair dicts — what pair_ranker actually parses."""
+    rng, now_ms = random.Random(seed), time.time() * 1000
+    chains = ("bsc", "ethereum", "base", "solana", "arbitrum", "polygon")
+    return [{"chainId": rng.choice(chains), "dexId": "pancakeswap", "priceUsd": f"{rng.uniform(0, 3):.8f}",
+             "liquidity": {"usd": rng.choice((0, 10 ** rng.uniform(1, 7.5)))},
+             "volume": {"h24": 10 ** rng.uniform(0, 7)},
+             "txns": {"h24": {"buys": rng.randrange(5000), "sells": rng.randrange(5000)}},
+             "pairCreatedAt": now_ms - rng.uniform(0, 400) * 86_400_000}
+            for _ in range(n)]
+
+
+DEX_PAIRS = {n: _dex_pairs(n) for n in (30, 300, 3000)}
+
+
+def python_best_pair(pairs):
+    """pair_ranker's score as a plain Python loop — the yardstick for the NumPy pass."""
+    import math
+    best, best_score, now_ms = None, None, time.time() * 1000
+    for p in pairs:
+        liq = float((p.get("liquidity") or {}).get("usd") or 0)
+        vol = float((p.get("volume") or {}).get("h24") or 0)
+        tx = (p.get("txns") or {}).get("h24") or {}
+        n = float(tx.get("buys") or 0) + float(tx.get("sells") or 0)
+        age = (now_ms - float(p.get("pairCreatedAt") or now_ms)) / 86_400_000
+        s = (0.45 * min(math.log10(1 + liq) / 7, 1) + 0.25 * min(math.log10(1 + vol) / 7, 1)
+             + 0.15 * min(math.log10(1 + n) / 4, 1) + 0.10 * min(max(age / 30, 0), 1)
+             + 0.05 * (1.0 if p.get("chainId") == "bsc" else 0.5))
+        if liq < 1000 or not float(p.get("priceUsd") or 0):
+            s -= 10
+        if best_score is None or s > best_score:
+            best, best_score = p, s
+    return best
+
+
+def _entries(n, seed=7):
+    rng, now = random.Random(seed), datetime.now()
+    out = []
+    for i in range(n):
+        ts = now - timedelta(hours=rng.uniform(0, 96))
+        stamp = ts.strftime("%Y-%m-%d %H:%M:%S") if i % 5 == 0 else ts.isoformat()   # legacy format too
+        out.append({"text": rng.choice(CORPORA["english"]), "mood": "Balanced", "time": stamp})
+    return out
+
+
+MEMORY_ENTRIES = [_entries(n, seed=n) for n in (5, 15, 40)]
+
+
+def log(msg):
+    print(f"[Bench] {msg}")
+
+
+# === RUNNER ===
+def measure(fn, calls, min_time):
+    """fn() performs `calls` helper calls. Returns per-call ns for each round."""
+    loops = 1
+    while True:
+        started = time.perf_counter_ns()
+        for _ in range(loops):
+            fn()
+        took = time.perf_counter_ns() - started
+        if took >= ROUND_NS:
+            break
+        loops *= 2 if took < ROUND_NS / 4 else 1 + ROUND_NS // max(took, 1)
+
+    rounds, spent, deadline = [], 0, min_time * 1e9
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        while len(rounds) < MIN_ROUNDS or spent < deadline:
+            started = time.perf_counter_ns()
+            for _ in range(loops):
+                fn()
+            took = time.perf_counter_ns() - started
+            spent += took
+            rounds.append(took / (loops * calls))
+    finally:
+        if enabled:
+            gc.enable()
+    return rounds
+
+
+def stats(rounds):
+    median = statistics.median(rounds)
+    return {"rounds": len(rounds), "min_us": min(rounds) / 1e3, "median_us": median / 1e3,
+            "mean_us": statistics.fmean(rounds) / 1e3,
+            "stddev_us": statistics.pstdev(rounds) / 1e3, "ops": 1e9 / median}
+
+
+def _over(helper, items):
+    def run():
+        for x in items:
+            helper(x)
+    return run, len(items)
+
+
+def _reference():
+    """Fixed pure-Python workload — the yardstick for machine speed."""
+    text = " ".join(CORPORA["english"])
+
+    def run():
+        total = 0
+        for word in text.lower().split():
+            total += len(word) * 3 % 7
+        return total
+    return run, 1
+
+
+def legacy_chain(text):
+    """The substring scans the helpers ran before plugins/lexicon.py — kept as a yardstick."""
+    t = text.lower()
+    any("\u0900" <= c <= "\u097F" for c in t) or any(x in t for x in LEGACY["hinglish"]["hinglish"])
+    for _ in range(2):
+        next((k for k, v in LEGACY["topic"].items() if any(x in t for x in v)), "general")
+    next((k for k, v in LEGACY["memory_topic"].items() if any(x in t for x in v)), "general")
+    next((k for k, v in LEGACY["tone"].items() if any(x in t for x in v)), None)
+    next((k for k, v in LEGACY["sentiment"].items() if any(x in t for x in v)), None)
+
+
+LEGACY = {}     # same vocabularies as the lexicon, filled in by collect()
+
+
+def collect():
+    """[(name, fn, calls)] — every helper × every corpus, plus the chain."""
+    from plugins import (ai_auto_reply, airdrop_sentinel, emotion_stabilizer, emotion_sync,
+                         lexicon, memory_engine, pair_ranker, sentiment, tokeninfo)
+    LEGACY.update(lexicon.VOCABULARIES)
+
+    def fresh():
+        # time the cache-miss path: every text is a new message
+        lexicon.scan.cache_clear()
+        sentiment._cached.cache_clear()
+
+    def chain(text):
+        # What one chat message costs before any I/O: ai_auto_chat, memory and emotion plugins
+        fresh()
+        ai_auto_reply.is_hinglish(text)
+        ai_auto_reply.detect_topic(text)
+        ai_auto_reply.detect_topic(text)      # called twice per reply (tail + stored entry)
+        memory_engine._guess_topic(text)
+        emotion_stabilizer._text_tone_score(text)
+        emotion_sync.analyze_sentiment(text)
+
+    text_helpers = [     # (name, helper, reads a per-text cache)
+        ("detect_topic", ai_auto_reply.detect_topic, True),
+        ("is_hinglish", ai_auto_reply.is_hinglish, True),
+        ("contains_dev", ai_auto_reply.contains_dev, False),
+        ("guess_topic", memory_engine._guess_topic, True),
+        ("text_tone_score", emotion_stabilizer._text_tone_score, True),
+        ("analyze_sentiment", emotion_sync.analyze_sentiment, True),
+        ("analyze_emotion", memory_engine.analyze_emotion, True),
+    ]
+    out = [("reference",) + _reference()]
+    for name, helper, cached in text_helpers:
+        run = (lambda t, h=helper: (fresh(), h(t))) if cached else helper
+        for corpus, texts in CORPORA.items():
+            out.append((f"{name}[{corpus}]",) + _over(run, texts))
+    for name, helper in (("lexicon_match", lexicon.match), ("chain", chain), ("legacy_chain", legacy_chain)):
+        for corpus, texts in CORPORA.items():
+            out.append((f"{name}[{corpus}]",) + _over(helper, texts))
+    everything = [t for texts in CORPORA.values() for t in texts] * 8
+    out.append(("sentiment_many[batch]",) + (lambda: sentiment.score_many(everything), len(everything)))
+    try:
+        from textblob import TextBlob     # the per-message engine sentiment.py replaced
+        out.append(("textblob_polarity[english]",)
+                   + _over(lambda t: TextBlob(t).sentiment.polarity, CORPORA["english"]))
+    except ImportError:
+        pass
+    for entries in MEMORY_ENTRIES:
+        out.append((f"clean_entries[{len(entries)}]",) + _over(memory_engine._clean_entries, [entries]))
+    out.append(("estimate_airdrop_probability",)
+               + _over(lambda p: airdrop_sentinel.estimate_airdrop_probability(*p), PAIRS))
+    out.append(("neural_rank",) + _over(lambda p: tokeninfo.neural_rank(p[0], p[1]), PAIRS))
+    for n, pairs in DEX_PAIRS.items():
+        out.append((f"best_pair[{n}]",) + _over(pair_ranker.best, [pairs]))
+        out.append((f"python_best_pair[{n}]",) + _over(python_best_pair, [pairs]))
+    return out
+
+
+def check_sentiment():
+    """Texts where sentiment's polarity() and score_many() paths disagree (or raise)."""
+    from plugins import sentiment
+    texts = [t for texts in CORPORA.values() for t in texts] + EDGE_TEXTS
+    try:
+        batch = sentiment.BATCH["vader"](texts)
+    except Exception as e:
+        return [f"score_many: {type(e).__name__}: {e}"]
+    bad = []
+    for text, b in zip(texts, batch):
+        try:
+            one = sentiment.BACKENDS["vader"](text)
+        except Exception as e:
+            one = f"{type(e).__name__}: {e}"
+        if isinstance(one, str) or abs(one - b) > 1e-9:
+            bad.append(f"{text!r}: polarity {one} vs score_many {b:.4f}")
+    return bad
+
+
+# === BASELINES ===
+def load_baseline(path=BASELINE_FILE):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def save_baseline(results, path=BASELINE_FILE):
+    """Merge into the stored baselines — a -k run only refreshes what it measured.
+
+    A partial run is rescaled to the stored reference (which it keeps), so
+    the rows it did not measure stay comparable with the ones it did.
+    """
+    ops = (load_baseline(path) or {}).get("ops", {})
+    scale = 1.0
+    if ops.get("reference") and "reference" in results and any(n not in results for n in ops):
+        scale = ops["reference"] / results["reference"]["ops"]
+    ops.update({name: round(r["ops"] * scale, 1) for name, r in results.items()})
+    data = {
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()}",
+        "saved": datetime.now().isoformat(timespec="seconds"),
+        "ops": ops,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+    log(f"💾 Baselines saved → {os.path.relpath(path, ROOT)} ({len(results)} benchmarks)")
+
+
+def compare(results, baseline, max_regress):
+    """{name: change %} after scaling the baseline by the reference loop; plus regressions."""
+    old = baseline.get("ops", {})
+    scale = results["reference"]["ops"] / old["reference"] if old.get("reference") and "reference" in results else 1.0
+    changes, regressions = {}, []
+    for name, r in results.items():
+        if name == "reference" or not old.get(name):
+            continue
+        change = (r["ops"] / (old[name] * scale) - 1) * 100
+        changes[name] = change
+        if change < -_limit(r, max_regress):
+            regressions.append(name)
+    return scale, changes, regressions
+
+
+def _limit(r, max_regress):
+    return max(max_regress, SMALL_REGRESS) if r["median_us"] < SMALL_US else max_regress
+
+
+def confirm(suspects, benches, baseline, max_regress, min_time):
+    """Re-measure suspects, each right after a fresh reference; keep the best change.
+
+    The box's speed drifts during a run (the reference alone swings by a
+    third), so a row only counts as a regression if it is over the limit in
+    every one of CONFIRM_RUNS paired measurements.
+    """
+    old = baseline.get("ops", {})
+    best = {}
+    for _ in range(CONFIRM_RUNS):
+        still = []
+        for name in suspects:
+            scale = 1.0
+            if old.get("reference"):
+                scale = stats(measure(*benches["reference"], min_time))["ops"] / old["reference"]
+            r = stats(measure(*benches[name], min_time))
+            change = (r["ops"] / (old[name] * scale) - 1) * 100
+            best[name] = max(best.get(name, change), change)
+            if change < -_limit(r, max_regress):
+                still.append(name)
+        suspects = still
+        if not suspects:
+            break
+    return best, suspects
+
+
+# === REPORT ===
+def render(results, changes=None):
+    lines = [f"{'benchmark':<36}{'min µs':>10}{'median µs':>11}{'mean µs':>10}{'stddev':>9}"
+             f"{'OPS':>12}{'rounds':>8}" + (f"{'vs base':>10}" if changes is not None else "")]
+    for name, r in results.items():
+        row = (f"{name:<36}{r['min_us']:>10.2f}{r['median_us']:>11.2f}{r['mean_us']:>10.2f}"
+               f"{r['stddev_us']:>9.2f}{r['ops']:>12,.0f}{r['rounds']:>8}")
+        if changes is not None:
+            row += f"{changes[name]:>+9.1f}%" if name in changes else f"{'—':>10}"
+        lines.append(row)
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the per-message helpers")
+    parser.add_argument("-k", dest="keyword", help="only benchmarks whose name contains this")
+    parser.add_argument("--min-time", type=float, default=0.3, help="seconds of timing per benchmark")
+    parser.add_argument("--save", action="store_true", help="write results as the new baselines")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--max-regress", type=float, default=30, help="allowed OPS drop in %%")
+    parser.add_argument("--json", help="write raw results here")
+    args = parser.parse_args(argv)
+
+    out_path = os.path.abspath(args.json) if args.json else None
+    baseline_path = os.path.abspath(args.baseline)
+    # Plugins create data/ files on import — keep them out of the checkout
+    os.chdir(tempfile.mkdtemp(prefix="wenbnb_bench_"))
+    sys.path.insert(0, ROOT)
+    random.seed(0)      # tone / sentiment helpers pick random jitter
+
+    mismatches = check_sentiment()
+    for line in mismatches:
+        log(f"❌ sentiment parity — {line}")
+
+    results, benches = {}, {}
+    for name, fn, calls in collect():
+        if args.keyword and args.keyword not in name and name != "reference":
+            continue
+        benches[name] = (fn, calls)
+        results[name] = stats(measure(fn, calls, args.min_time))
+
+    baseline = None if args.save else load_baseline(baseline_path)
+    changes, regressions = None, []
+    if baseline:
+        scale, changes, regressions = compare(results, baseline, args.max_regress)
+        log(f"📏 Machine speed vs baseline: ×{scale:.2f} (reference loop)")
+        if regressions:
+            log(f"🔁 Re-checking {len(regressions)} row(s) against a fresh reference")
+            rechecked, regressions = confirm(regressions, benches, baseline, args.max_regress, args.min_time)
+            changes.update(rechecked)
+    print(render(results, changes))
+
+    if out_path:
+        with open(out_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.save:
+        save_baseline(results, baseline_path)
+    for name in regressions:
+        log(f"❌ {name}: {changes[name]:+.1f}% OPS vs baseline")
+    if baseline and not regressions:
+        log(f"✅ No helper slower than {args.max_regress:.0f}% below baseline "
+            f"({max(args.max_regress, SMALL_REGRESS):.0f}% under {SMALL_US} µs)")
+    return 1 if regressions or mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,479 @@
+"""
+WENBNB Load Test v1.0 — Offline Synthetic Traffic Replay
+──────────────────────────────────────────────────────────────────────────────
+• Builds the dispatcher exactly like wenbot.start_bot (Updater →
+  build_dispatcher → deferred plugin setups) and feeds synthetic Updates
+  straight into its update queue — no polling, no network
+• One local stub server plays Telegram Bot API, OpenAI, Binance, CoinGecko
+  and DexScreener; every outbound requests call is rewritten to it and
+  unknown hosts get a 404
+• A local WebSocket stub plays Binance's combined ticker stream (miniTicker
+  frames + SUBSCRIBE acks) for plugins/binance_stream; --no-stream runs
+  the REST-only path instead
+• Scenarios: chat (English / Hinglish / Devanagari), /price, /tokeninfo,
+  /join storms, member joins — seeded, so every run replays the same traffic
+• Reports msgs/s, p50/p95/p99 per scenario and per handler (perf_trace),
+  CPU and peak RSS; --json + --baseline make it a CI regression gate
+
+    python -m benchmarks.load_test --updates 2000 --json load.json
+    python -m benchmarks.load_test --baseline load.json --max-regress 25
+"""
+
+import argparse, json, os, random, sys, tempfile, threading, time, warnings, zlib
+from contextlib import redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TOKEN = "123456:LOADTEST"
+CHAT_ID = -1001000000001
+SCENARIOS = {            # name -> share of the traffic mix
+    "chat": 50,
+    "price": 15,
+    "tokeninfo": 10,
+    "join_storm": 15,
+    "member_join": 10,
+}
+
+CHAT_LINES = [
+    "gm everyone, what's the plan for today?",
+    "is bnb going to pump this week or nah",
+    "how do I stake my tokens safely?",
+    "bhai market kaisa lag raha hai aaj?",
+    "yaar airdrop kab aayega, bata na",
+    "kya scene hai wenbnb ka, hold karu ya sell?",
+    "नमस्ते दोस्तों, आज बाजार कैसा है?",
+    "मुझे नया टोकन खरीदना चाहिए क्या?",
+    "lol this meme coin is wild 😂🚀",
+    "feeling a bit down after that dip 😔",
+]
+PRICE_TOKENS = ["bnb", "btc", "eth", "sol", "wenbnb", "cake"]
+TOKENINFO_QUERIES = ["bnb", "wenbnb", "cake", "pepe", "eth"]
+
+# === STUB UPSTREAMS ===
+KNOWN_SYMBOLS = {"BNBUSDT": "612.40", "BTCUSDT": "67250.10", "ETHUSDT": "3120.55", "SOLUSDT": "151.20"}
+HITS = {}
+_hits_lock = threading.Lock()
+
+
+def log(msg):
+    print(f"[LoadTest] {msg}", file=sys.__stdout__, flush=True)
+
+
+def _message(chat_id, text, message_id):
+    return {"message_id": message_id, "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "supergroup", "title": "WENBNB Load"},
+            "from": {"id": 1, "is_bot": True, "first_name": "WENBNB", "username": "wenbnb_loadbot"},
+            "text": text or ""}
+
+
+def _pairs(q, contract=None):
+    q = q.upper()
+    contract = contract or f"0x{zlib.crc32(q.encode()):040x}"   # one token per symbol
+    return [{"chainId": "bsc", "dexId": dex, "url": f"https://dexscreener.com/bsc/{q.lower()}{i}",
+             "pairAddress": f"0x{i:040x}",
+             "baseToken": {"address": contract, "name": f"{q} Token", "symbol": q},
+             "quoteToken": {"symbol": "WBNB"},
+             "priceUsd": f"{0.00042 * (i + 1):.8f}",
+             "liquidity": {"usd": 125000.0 / (i + 1)},
+             "volume": {"h24": 98000.0 / (i + 1)}}
+            for i, dex in enumerate(("pancakeswap", "uniswap", "biswap"))]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """/<original host>/<original path> → canned upstream answers."""
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True     # keep-alive + Nagle = 40 ms per call
+    upstream_ms = 0.0
+    telegram_ms = 0.0
+    message_ids = iter(range(1, 1 << 30))
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body):
+        raw = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def _body(self):
+        n = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(n) if n else b""
+        try:
+            return json.loads(raw or b"{}")
+        except ValueError:
+            return {}          # multipart uploads (sendDocument / sendPhoto)
+
+    def do_GET(self):
+        self._route(self._body() if self.command == "POST" else {})
+
+    do_POST = do_GET
+
+    def _route(self, body):
+        parts = urlsplit(self.path)
+        host, _, path = parts.path.lstrip("/").partition("/")
+        query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        with _hits_lock:
+            HITS[host] = HITS.get(host, 0) + 1
+
+        if host == "api.telegram.org":
+            time.sleep(self.telegram_ms / 1000)
+            method = path.rsplit("/", 1)[-1]
+            if method == "getMe":
+                return self._reply(200, {"ok": True, "result": {
+                    "id": 1, "is_bot": True, "first_name": "WENBNB", "username": "wenbnb_loadbot"}})
+            if method.startswith(("send", "edit")):
+                msg = _message(body.get("chat_id", CHAT_ID), body.get("text"), next(self.message_ids))
+                return self._reply(200, {"ok": True, "result": msg})
+            return self._reply(200, {"ok": True, "result": True})
+
+        time.sleep(self.upstream_ms / 1000)
+        if host == "api.binance.com":
+            symbol = query.get("symbol", "")
+            if symbol in KNOWN_SYMBOLS:
+                return self._reply(200, {"symbol": symbol, "price": KNOWN_SYMBOLS[symbol]})
+            return self._reply(400, {"code": -1121, "msg": "Invalid symbol."})
+        if host == "api.coingecko.com":
+            ids = query.get("ids", "")
+            return self._reply(200, {ids: {"usd": 1.2345}} if ids in ("binancecoin", "bitcoin", "ethereum") else {})
+        if host in ("api.dexscreener.io", "api.dexscreener.com"):
+            if "/tokens/" in path:
+                return self._reply(200, {"schemaVersion": "1.0.0",
+                                         "pairs": _pairs("TKN", path.rsplit("/", 1)[-1].lower())})
+            return self._reply(200, {"schemaVersion": "1.0.0", "pairs": _pairs(query.get("q", "x"))})
+        if host == "api.openai.com":
+            return self._reply(200, {
+                "id": "chatcmpl-load", "object": "chat.completion", "model": "gpt-4o-mini",
+                "choices": [{"index": 0, "finish_reason": "stop", "message": {
+                    "role": "assistant", "content": "haan bro, market thoda choppy hai — patience rakho 😎"}}],
+                "usage": {"prompt_tokens": 180, "completion_tokens": 24, "total_tokens": 204}})
+        if path.endswith("update_status"):       # metrics_exporter → dashboard
+            return self._reply(200, {"ok": True})
+        return self._reply(404, {"error": f"no stub for {host}"})
+
+
+def start_stub(upstream_ms, telegram_ms):
+    StubHandler.upstream_ms, StubHandler.telegram_ms = upstream_ms, telegram_ms
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="load-stub", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def _ws_stub(ws):
+    """Binance combined stream: miniTicker frames for the requested pairs, SUBSCRIBE acks."""
+    query = parse_qs(urlsplit(ws.request.path).query).get("streams", [""])[0]
+    pairs = {s.split("@")[0].upper() for s in query.split("/") if s}
+    with _hits_lock:
+        HITS["stream.binance.com"] = HITS.get("stream.binance.com", 0) + 1
+    rng = random.Random(7)
+    while True:
+        try:
+            msg = json.loads(ws.recv(timeout=0.25))
+            pairs |= {s.split("@")[0].upper() for s in msg.get("params", [])}
+            ws.send(json.dumps({"result": None, "id": msg.get("id")}))
+        except TimeoutError:
+            pass
+        except Exception:
+            return
+        for pair in sorted(pairs & set(KNOWN_SYMBOLS)):
+            close = float(KNOWN_SYMBOLS[pair]) * (1 + rng.uniform(-0.001, 0.001))
+            ws.send(json.dumps({"stream": f"{pair.lower()}@miniTicker",
+                                "data": {"e": "24hrMiniTicker", "E": int(time.time() * 1000),
+                                         "s": pair, "c": f"{close:.2f}"}}))
+
+
+def start_ws_stub():
+    from websockets.sync.server import serve
+    server = serve(_ws_stub, "127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, name="load-ws-stub", daemon=True).start()
+    return server, f"ws://127.0.0.1:{server.socket.getsockname()[1]}/stream"
+
+
+def route_requests_to(stub):
+    """Rewrite every requests call to the stub — nothing leaves the machine."""
+    import requests.sessions
+    session_request = requests.sessions.Session.request
+
+    def request(self, method, url, *args, **kwargs):
+        parts = urlsplit(str(url))
+        if not str(url).startswith(stub):
+            url = f"{stub}/{parts.hostname}{parts.path}" + (f"?{parts.query}" if parts.query else "")
+        return session_request(self, method, url, *args, **kwargs)
+
+    requests.sessions.Session.request = request
+
+
+# === TRAFFIC ===
+def _user(uid):
+    return {"id": uid, "is_bot": False, "first_name": f"User{uid}", "username": f"user{uid}",
+            "language_code": "en"}
+
+
+def _update(update_id, uid, text=None, new_members=None):
+    msg = {"message_id": update_id, "date": int(time.time()),
+           "chat": {"id": CHAT_ID, "type": "supergroup", "title": "WENBNB Load"},
+           "from": _user(uid)}
+    if new_members:
+        msg["new_chat_members"] = [_user(m) for m in new_members]
+    else:
+        msg["text"] = text
+        if text.startswith("/"):
+            msg["entities"] = [{"type": "bot_command", "offset": 0, "length": len(text.split()[0])}]
+    return {"update_id": update_id, "message": msg}
+
+
+def traffic(n, seed, only=None):
+    """[(scenario, update dict)] — same seed, same traffic."""
+    rng = random.Random(seed)
+    names = [only] if only else list(SCENARIOS)
+    weights = [SCENARIOS[s] for s in names]
+    out, update_id, joiner = [], 1, 9_000_000
+    while len(out) < n:
+        scenario = rng.choices(names, weights)[0]
+        uid = rng.randrange(100_000, 100_400)
+        if scenario == "chat":
+            batch = [_update(update_id, uid, rng.choice(CHAT_LINES))]
+        elif scenario == "price":
+            batch = [_update(update_id, uid, f"/price {rng.choice(PRICE_TOKENS)}")]
+        elif scenario == "tokeninfo":
+            batch = [_update(update_id, uid, f"/tokeninfo {rng.choice(TOKENINFO_QUERIES)}")]
+        elif scenario == "join_storm":     # a burst of distinct users hitting /join at once
+            batch = [_update(update_id + i, rng.randrange(200_000, 900_000), "/join")
+                     for i in range(rng.randrange(5, 20))]
+        else:
+            count = rng.randrange(1, 4)
+            batch = [_update(update_id, uid, new_members=range(joiner, joiner + count))]
+            joiner += count
+        update_id += len(batch)
+        out.extend((scenario, u) for u in batch)
+    return out[:n]
+
+
+# === MEASUREMENT ===
+def pct(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, max(0, int(round(q / 100 * len(values))) - 1))], 2)
+
+
+def summary(values):
+    return {"count": len(values), "p50": pct(values, 50), "p95": pct(values, 95),
+            "p99": pct(values, 99), "max": round(max(values), 2) if values else None}
+
+
+class RssSampler(threading.Thread):
+    def __init__(self, proc, every=0.05):
+        super().__init__(name="load-rss", daemon=True)
+        self.proc, self.every, self.peak = proc, every, proc.memory_info().rss
+        self.running = True
+
+    def run(self):
+        while self.running:
+            self.peak = max(self.peak, self.proc.memory_info().rss)
+            time.sleep(self.every)
+
+
+def run(args):
+    import psutil
+
+    server, stub = start_stub(args.upstream_ms, args.telegram_ms)
+    route_requests_to(stub)
+    ws_server = None
+    if args.no_stream:
+        os.environ["BINANCE_STREAM"] = "off"
+    else:
+        ws_server, os.environ["BINANCE_WS_URL"] = start_ws_stub()
+
+    import wenbot
+    from telegram import Update
+    from telegram.ext import Updater
+    from plugins import perf_trace, scheduler
+
+    updater = Updater(TOKEN, use_context=True, base_url=f"{stub}/api.telegram.org/bot",
+                      request_kwargs={"con_pool_size": 16})
+    dp = wenbot.build_dispatcher(updater.dispatcher)
+    if not args.no_setup:
+        wenbot.finish_startup(dp)
+
+    per_handler = {}
+    perf_trace.LISTENERS.append(lambda name, ms: per_handler.setdefault(name, []).append(ms))
+
+    sent, latencies, service = {}, {}, {}
+    done = threading.Semaphore(0)
+    process_update = dp.process_update
+
+    def timed(update):
+        started = time.perf_counter()
+        try:
+            process_update(update)
+        finally:
+            finished = time.perf_counter()
+            key = getattr(update, "update_id", None)
+            if key in sent:
+                scenario, queued = sent.pop(key)
+                latencies.setdefault(scenario, []).append((finished - queued) * 1000)
+                service.setdefault(scenario, []).append((finished - started) * 1000)
+                done.release()
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")         # PTB frowns on patching Dispatcher attributes
+        dp.process_update = timed
+    threading.Thread(target=dp.start, name="load-dispatcher", daemon=True).start()
+    while not dp.running:
+        time.sleep(0.01)
+
+    plan = traffic(args.warmup + args.updates, args.seed, args.scenario)
+    updates = [(s, Update.de_json(u, updater.bot)) for s, u in plan]
+
+    def replay(batch, rate):
+        started = time.perf_counter()
+        for i, (scenario, update) in enumerate(batch):
+            if rate:
+                wait = started + i / rate - time.perf_counter()
+                if wait > 0:
+                    time.sleep(wait)
+            sent[update.update_id] = (scenario, time.perf_counter())
+            dp.update_queue.put(update)
+        for _ in batch:
+            if not done.acquire(timeout=args.timeout):
+                raise SystemExit(f"❌ Dispatcher stalled — {len(sent)} updates unfinished")
+
+    replay(updates[:args.warmup], 0)
+    latencies.clear()
+    service.clear()
+    per_handler.clear()
+
+    proc = psutil.Process()
+    rss = RssSampler(proc)
+    rss.start()
+    cpu0, wall0 = proc.cpu_times(), time.perf_counter()
+    replay(updates[args.warmup:], args.rate)
+    wall = time.perf_counter() - wall0
+    cpu1 = proc.cpu_times()
+    rss.running = False
+
+    dp.stop()
+    scheduler.shutdown()
+    server.shutdown()
+    if ws_server:
+        ws_server.shutdown()
+
+    cpu = (cpu1.user - cpu0.user) + (cpu1.system - cpu0.system)
+    everything = [v for vals in latencies.values() for v in vals]
+    return {
+        "updates": args.updates,
+        "seed": args.seed,
+        "rate": args.rate,
+        "upstream_ms": args.upstream_ms,
+        "telegram_ms": args.telegram_ms,
+        "wall_s": round(wall, 3),
+        "msgs_per_sec": round(args.updates / wall, 1) if wall else None,
+        "cpu_s": round(cpu, 3),
+        "cpu_pct": round(cpu / wall * 100, 1) if wall else None,
+        "rss_peak_mb": round(rss.peak / 2**20, 1),
+        "latency_ms": summary(everything),
+        "scenarios": {s: dict(summary(v), service_p50=pct(service[s], 50), service_p95=pct(service[s], 95))
+                      for s, v in sorted(latencies.items())},
+        "handlers": {h: summary(v) for h, v in sorted(per_handler.items())},
+        "upstream_hits": dict(sorted(HITS.items())),
+    }
+
+
+# === REPORT ===
+def render(result):
+    lines = [
+        f"📊 {result['updates']} updates in {result['wall_s']}s → {result['msgs_per_sec']} msgs/s "
+        f"(seed {result['seed']}, rate {result['rate'] or 'max'}, upstream {result['upstream_ms']} ms)",
+        f"🧮 CPU {result['cpu_s']}s ({result['cpu_pct']}%) • peak RSS {result['rss_peak_mb']} MB",
+        "",
+        f"{'scenario':<24}{'count':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}",
+    ]
+    rows = list(result["scenarios"].items()) + [("ALL", result["latency_ms"])]
+    for name, s in rows:
+        lines.append(f"{name:<24}{s['count']:>7}{s['p50']:>9}{s['p95']:>9}{s['p99']:>9}{s['max']:>9}")
+    lines += ["", f"{'handler':<40}{'calls':>7}{'p50':>9}{'p95':>9}{'p99':>9}"]
+    for name, s in sorted(result["handlers"].items(), key=lambda kv: -kv[1]["count"]):
+        lines.append(f"{name[:39]:<40}{s['count']:>7}{s['p50']:>9}{s['p95']:>9}{s['p99']:>9}")
+    lines += ["", "🌐 " + ", ".join(f"{h} {n}" for h, n in result["upstream_hits"].items())]
+    return "\n".join(lines)
+
+
+def compare(result, baseline, max_regress, min_ms):
+    """Regressions vs a previous --json run: throughput drop or p95 rise above max_regress %."""
+    problems, limit = [], max_regress / 100
+    old = baseline.get("msgs_per_sec")
+    if old and result["msgs_per_sec"] < old * (1 - limit):
+        problems.append(f"throughput {old} → {result['msgs_per_sec']} msgs/s")
+    for scope in ("scenarios", "handlers"):
+        for name, s in result[scope].items():
+            before = baseline.get(scope, {}).get(name, {}).get("p95")
+            now = s.get("p95")
+            if before is not None and now is not None and now > before * (1 + limit) and now - before > min_ms:
+                problems.append(f"{scope[:-1]} {name} p95 {before} → {now} ms")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay synthetic Telegram traffic through the real dispatcher")
+    parser.add_argument("--updates", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=50, help="updates replayed before measuring")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), help="only this scenario (default: mix)")
+    parser.add_argument("--rate", type=float, default=0, help="updates/s, 0 = as fast as possible")
+    parser.add_argument("--upstream-ms", type=float, default=0, help="stub latency for HTTP upstreams")
+    parser.add_argument("--telegram-ms", type=float, default=0, help="stub latency for Bot API calls")
+    parser.add_argument("--timeout", type=float, default=60, help="seconds to wait for one update")
+    parser.add_argument("--no-setup", action="store_true", help="skip deferred plugin setup hooks")
+    parser.add_argument("--no-stream", action="store_true", help="no Binance WebSocket stub (REST prices only)")
+    parser.add_argument("--json", help="write the result here")
+    parser.add_argument("--baseline", help="previous --json result to compare against")
+    parser.add_argument("--max-regress", type=float, default=25, help="allowed regression in %%")
+    parser.add_argument("--min-ms", type=float, default=5, help="ignore p95 rises smaller than this")
+    parser.add_argument("--verbose", action="store_true", help="show bot output")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    out_path = os.path.abspath(args.json) if args.json else None
+
+    # The bot writes data/, logs/, backups/ relative to cwd — keep them out of the checkout
+    workdir = tempfile.mkdtemp(prefix="wenbnb_load_")
+    os.chdir(workdir)
+    sys.path.insert(0, ROOT)
+    os.environ.update(TELEGRAM_TOKEN=TOKEN, OPENAI_API_KEY="sk-load-test", S3_ENABLED="false",
+                      AI_PROXY_URL="")
+    log(f"🧪 Workdir {workdir}")
+
+    if args.verbose:
+        result = run(args)
+    else:
+        import logging
+        with open(os.path.join(workdir, "bot.log"), "w", encoding="utf-8") as sink, redirect_stdout(sink):
+            logging.basicConfig(stream=sink, force=True)
+            logging.disable(logging.WARNING)
+            result = run(args)
+
+    print(render(result))
+    if out_path:
+        with open(out_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        log(f"💾 Result → {out_path}")
+    if baseline:
+        problems = compare(result, baseline, args.max_regress, args.min_ms)
+        for p in problems:
+            log(f"❌ Regression: {p}")
+        if problems:
+            return 1
+        log(f"✅ Within {args.max_regress:.0f}% of baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,60 @@
 # dashboard/dashboard.py
 import os
+import json
 import time
-import queue
+import itertools
 import threading
-from flask import Flask, render_template, jsonify, request, Response, abort
+from collections import deque
+from flask import Flask, render_template, jsonify, request, Response, abort, stream_with_context
 from datetime import datetime
 
-# Simple in-memory event queue for streaming logs
-log_queue = queue.Queue()
+LOG_BUFFER = int(os.getenv("DASHBOARD_LOG_BUFFER", "1000"))   # lines kept for replay
+SSE_HEARTBEAT = 15      # seconds between keep-alive comments
+SSE_REPLAY = 50         # lines a fresh viewer gets before going live
+
+class LogBus:
+    """
+    Fan-out log buffer: a fixed ring of (seq, payload) with monotonically
+    increasing ids. Every subscriber keeps its own cursor, so all viewers
+    see every line; waiters are woken by a Condition, not by polling.
+    """
+
+    def __init__(self, capacity=LOG_BUFFER):
+        self._items = deque(maxlen=capacity)
+        self._seq = 0
+        self._cond = threading.Condition()
+
+    @property
+    def last_id(self):
+        return self._seq
+
+    def publish(self, payload):
+        with self._cond:
+            self._seq += 1
+            payload["id"] = self._seq
+            self._items.append((self._seq, payload))
+            self._cond.notify_all()
+            return self._seq
+
+    def since(self, cursor, limit=None):
+        """Entries with id > cursor (oldest first); older ones fall off the ring."""
+        with self._cond:
+            if not self._items or cursor >= self._seq:
+                return []
+            start = max(cursor + 1 - self._items[0][0], 0)
+            stop = None if limit is None else start + limit
+            return list(itertools.islice(self._items, start, stop))
+
+    def wait(self, cursor, timeout):
+        """Block until something newer than cursor is published (or timeout)."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq > cursor, timeout)
+        return self.since(cursor)
+
+    def recent(self, n):
+        return self.since(max(self._seq - n, 0))
+
+log_bus = LogBus()
 
 def push_log(level, msg):
     payload = {
@@ -15,7 +62,7 @@ def push_log(level, msg):
         "level": level,
         "message": msg
     }
-    log_queue.put(payload)
+    return log_bus.publish(payload)
 
 # Example: Some startup logs
 push_log("info", "WENBNB Dashboard initializing...")
@@ -56,28 +103,104 @@ def update_status():
         abort(401)
 
     data = request.get_json() or {}
+    previous = status_state.get("status")
     # Update only allowed keys
-    for k in ("status", "uptime", "users"):
+    for k in ("status", "uptime", "users", "rates"):
         if k in data:
             status_state[k] = data[k]
-    push_log("info", f"Status updated via bot: {data}")
-    return jsonify({"ok": True})
+    in_sync = apply_metrics(data) if "metrics" in data else True
+    # periodic metric pushes would flood the feed — log status changes only
+    if status_state.get("status") != previous:
+        push_log("info", f"Bot status → {status_state.get('status')}")
+    return jsonify({"ok": True, "resync": not in_sync})
+
+# Bot metrics, folded from the deltas plugins/metrics_exporter.py pushes
+metrics_state = {"boot": None, "buckets": [], "counters": {}, "histograms": {}, "gauges": {}, "updated": None}
+_metrics_lock = threading.Lock()
+
+def apply_metrics(data):
+    """Fold one push into metrics_state. False → unknown bot boot, ask for a full resend."""
+    m = data.get("metrics") or {}
+    with _metrics_lock:
+        if data.get("full"):
+            metrics_state.update(boot=data.get("boot"), counters={}, histograms={})
+        elif data.get("boot") != metrics_state["boot"]:
+            return False
+        metrics_state["buckets"] = data.get("buckets") or metrics_state["buckets"]
+        for name, labels, d in m.get("c", []):
+            k = (name, tuple(sorted(labels.items())))
+            metrics_state["counters"][k] = metrics_state["counters"].get(k, 0) + d
+        for name, labels, d in m.get("h", []):
+            k = (name, tuple(sorted(labels.items())))
+            h = metrics_state["histograms"].setdefault(k, [0] * len(d))
+            metrics_state["histograms"][k] = [a + b for a, b in zip(h, d)]
+        metrics_state["gauges"] = {(n, tuple(sorted(l.items()))): v for n, l, v in m.get("g", [])}
+        metrics_state["updated"] = time.time()
+    return True
+
+def _prom_labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ""
+    body = ",".join('{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in pairs)
+    return "{" + body + "}"
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Prometheus text exposition of the bot's pushed metrics."""
+    lines, typed = [], set()
+    def type_line(name, kind):
+        if name not in typed:
+            typed.add(name)
+            lines.append(f"# TYPE {name} {kind}")
+    with _metrics_lock:
+        buckets = metrics_state["buckets"]
+        for (name, labels), v in sorted(metrics_state["counters"].items()):
+            type_line(f"wenbnb_{name}_total", "counter")
+            lines.append(f"wenbnb_{name}_total{_prom_labels(labels)} {v}")
+        for (name, labels), h in sorted(metrics_state["histograms"].items()):
+            metric = f"wenbnb_{name}"
+            type_line(metric, "histogram")
+            running = 0
+            for bound, count in zip(list(buckets) + ["+Inf"], h[:-1]):
+                running += count
+                lines.append(f"{metric}_bucket{_prom_labels(labels, le=bound)} {running}")
+            lines.append(f"{metric}_sum{_prom_labels(labels)} {round(h[-1], 3)}")
+            lines.append(f"{metric}_count{_prom_labels(labels)} {running}")
+        for (name, labels), v in sorted(metrics_state["gauges"].items()):
+            type_line(f"wenbnb_{name}", "gauge")
+            lines.append(f"wenbnb_{name}{_prom_labels(labels)} {v}")
+        if metrics_state["updated"]:
+            type_line("wenbnb_metrics_age_seconds", "gauge")
+            lines.append(f"wenbnb_metrics_age_seconds {round(time.time() - metrics_state['updated'], 1)}")
+    return Response("\n".join(lines) + "\n", mimetype="text/plain; version=0.0.4")
 
 # SSE stream for logs
-def event_stream():
-    # long-polling: yield queued logs as Server-Sent Events
+def event_stream(cursor):
+    # per-viewer cursor over the shared bus; ids let the browser resume
+    yield "retry: 3000\n\n"
     while True:
-        try:
-            item = log_queue.get(timeout=0.5)
-            yield f"data: {item}\\n\\n"
-        except queue.Empty:
-            # heartbeat to keep connection alive
-            yield "data: {\"heartbeat\": true}\\n\\n"
-            time.sleep(0.5)
+        items = log_bus.wait(cursor, SSE_HEARTBEAT)
+        if not items:
+            yield ": heartbeat\n\n"   # comment line keeps proxies from closing us
+            continue
+        for seq, payload in items:
+            yield f"id: {seq}\ndata: {json.dumps(payload)}\n\n"
+            cursor = seq
+
+def _stream_cursor():
+    # EventSource resends Last-Event-ID on reconnect → replay exactly the gap
+    last_id = request.headers.get("Last-Event-ID") or request.args.get("since")
+    try:
+        return min(int(last_id), log_bus.last_id)
+    except (TypeError, ValueError):
+        return max(log_bus.last_id - SSE_REPLAY, 0)
 
 @app.route("/stream")
 def stream():
-    return Response(event_stream(), mimetype="text/event-stream")
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return Response(stream_with_context(event_stream(_stream_cursor())),
+                    mimetype="text/event-stream", headers=headers)
 
 # Admin action endpoint
 @app.route("/action", methods=["POST"])
@@ -114,17 +237,40 @@ def action():
 # Simple endpoint to fetch recent logs (non-stream)
 @app.route("/logs", methods=["GET"])
 def logs():
-    # For demo: return last N logs — in production you would read from a persistent log
-    logs_list = []
-    while not log_queue.empty():
-        try:
-            logs_list.append(log_queue.get_nowait())
-        except Exception:
-            break
-    # push them back so stream still continues (best-effort)
-    for item in logs_list:
-        log_queue.put(item)
-    return jsonify({"logs": logs_list})
+    # read-only view of the ring: ?since=<id> for incremental polling, else last ?limit lines
+    try:
+        limit = min(int(request.args.get("limit", 100)), LOG_BUFFER)
+        since = request.args.get("since")
+        items = log_bus.since(int(since), limit) if since is not None else log_bus.recent(limit)
+    except ValueError:
+        return jsonify({"error": "since/limit must be integers"}), 400
+    return jsonify({"logs": [payload for _, payload in items], "last_id": log_bus.last_id})
+
+# System metrics snapshot written by the bot (plugins/metrics_sampler.py)
+SYSTEM_METRICS_FILE = os.path.join("data", "system_metrics.json")
+
+@app.route("/system_metrics", methods=["GET"])
+def system_metrics():
+    try:
+        with open(SYSTEM_METRICS_FILE, "r") as f:
+            return jsonify(json.load(f))
+    except FileNotFoundError:
+        return jsonify({"error": "no metrics yet"}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# Remote backup catalog (one cached manifest object, not a bucket listing)
+@app.route("/backups", methods=["GET"])
+def backups():
+    from plugins import r2_dashboard_sync  # deferred: boto3 only when R2 is used
+    try:
+        limit = min(int(request.args.get("limit", 20)), 200)
+    except ValueError:
+        limit = 20
+    result = r2_dashboard_sync.list_backups(limit)
+    if "error" in result:
+        return jsonify(result), 503
+    return jsonify(result)
 
 # Health route (used by healthchecks)
 @app.route("/healthz")
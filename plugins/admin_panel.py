@@ -1,14 +1,15 @@
 import os, psutil, time
 from telegram import Update, ParseMode
-from telegram.ext import CallbackContext, CommandHandler
+from telegram.ext import CallbackContext
+from plugins import metrics_sampler
 
 ALLOWED_ADMINS = [5698007588]
 ENGINE_VERSION = "v8.6.5-ProStable"
 BRAND_SIGNATURE = "🚀 Powered by WENBNB Neural Engine — Emotional Intelligence 24×7 ⚡"
 
 def get_system_status():
-    cpu = psutil.cpu_percent(interval=1)
-    mem = psutil.virtual_memory().percent
+    m = metrics_sampler.latest()
+    cpu, mem = round(m["cpu"], 1), round(m["ram"], 1)
     uptime = time.time() - psutil.boot_time()
     uptime_str = time.strftime("%Hh %Mm %Ss", time.gmtime(uptime))
     return f"🧠 System: {cpu}% CPU | {mem}% RAM | Uptime: {uptime_str}"
@@ -38,8 +39,10 @@ def admin_broadcast(update: Update, context: CallbackContext):
     msg = " ".join(context.args)
     update.message.reply_text(f"📢 Broadcast message queued:\n{msg}")
 
-def register(dp):
-    dp.add_handler(CommandHandler("admin", admin_status), group=-1)
-    dp.add_handler(CommandHandler("broadcast", admin_broadcast), group=-1)
-    dp.add_handler(CommandHandler("reboot", admin_reboot), group=-1)
-    print("✅ Admin Panel initialized — /admin /broadcast /reboot active.")
+PLUGIN_MANIFEST = {
+    "commands": {
+        "admin": "admin_status",
+        "broadcast": "admin_broadcast",
+        "reboot": "admin_reboot",
+    },
+}
@@ -9,15 +9,18 @@ WENBNB AI Auto-Context v9.1 — Global Human Vibe Engine 🌍❤️
 
 import json, os, time
 from telegram import Update
-from telegram.ext import MessageHandler, Filters, CallbackContext
+from telegram.ext import CallbackContext
+from plugins import perf_trace
 
 CTX_FILE = "ctx_state.json"
 
+@perf_trace.traced("io")
 def load_state():
     if not os.path.exists(CTX_FILE): return {}
     try: return json.load(open(CTX_FILE, "r"))
     except: return {}
 
+@perf_trace.traced("io")
 def save_state(data):
     json.dump(data, open(CTX_FILE, "w"), indent=2, ensure_ascii=False)
 
@@ -67,6 +70,8 @@ def ai_auto_context(update: Update, context: CallbackContext):
     update_context(uid, text)
 
 # Wire as silent middleware
-def register_handlers(dp):
-    dp.add_handler(MessageHandler(Filters.text & ~Filters.command, ai_auto_context))
-    print("✅ Loaded context module v9.1 — vibe enhancer mode")
+# Disabled by default (see wenbot.py) — flip "enabled" to wire it back in.
+PLUGIN_MANIFEST = {
+    "messages": [{"stage": "context", "callback": "ai_auto_context"}],
+    "enabled": False,
+}
@@ -7,23 +7,26 @@ Tone tuned:
 • Real human flow — remembers last thread vibes
 """
 
-import os, json, random, requests, traceback, re
+import os, json, random, requests, traceback, re, time
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from telegram import Update, ParseMode
 from telegram.ext import CallbackContext
+from plugins import lexicon, metrics_exporter, perf_trace
 
 AI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 AI_PROXY_URL = os.getenv("AI_PROXY_URL", "")
 MEMORY_FILE = "user_memory.json"
 
 # ---------------- MEMORY ----------------
+@perf_trace.traced("io")
 def load_memory():
     if os.path.exists(MEMORY_FILE):
         try: return json.load(open(MEMORY_FILE,"r",encoding="utf-8"))
         except: return {}
     return {}
 
+@perf_trace.traced("io")
 def save_memory(d):
     json.dump(d,open(MEMORY_FILE,"w",encoding="utf-8"),indent=2,ensure_ascii=False)
 
@@ -46,11 +49,13 @@ def display_handle(u):
     return f"@{u.username}" if getattr(u,"username",None) else (u.first_name or "friend")
 
 # ---------------- HINGLISH DETECT ----------------
-def contains_dev(t): return any("\u0900"<=c<="\u097F" for c in t)
-HING = ["bhai","yaar","kya","accha","acha","nahi","haan","bolo","kise","chal","kuch","kar","ho","tips","bata","scene"]
+DEV=re.compile("[\u0900-\u097F]")
+def contains_dev(t): return DEV.search(t) is not None
+HING = ["bhai","yaar","kya","accha","acha","nahi","haan","bolo","kise","chal","kuch","kar","ho","tips","bata","scene",
+        "hai","kaisa","karo","karna","raha","rahi","mujhe","aaj"]
+lexicon.register("hinglish",{"hinglish":HING})
 def is_hinglish(t): 
-    t=t.lower()
-    return contains_dev(t) or any(x in t for x in HING)
+    return contains_dev(t) or lexicon.has("hinglish",t)
 
 # --------------- TOPICS ----------------------
 TOP = {
@@ -61,11 +66,9 @@ TOP = {
     "web3":["wallet","connect","metamask","gas","contract","deploy","bot","stake","dex"],
     "travel":["travel","trip","itinerary","flight","hotel","tour"]
 }
+lexicon.register("topic",TOP)
 def detect_topic(txt):
-    t=txt.lower()
-    for k,v in TOP.items():
-        if any(x in t for x in v): return k
-    return "general"
+    return lexicon.first("topic",txt,"general")
 
 # --------------- SIGNATURE ---------------------
 def signature(m):
@@ -160,10 +163,13 @@ def call_ai(txt,name,m,h,rec,ct):
     hdr={"Content-Type":"application/json"}
     if not AI_PROXY_URL: hdr["Authorization"]=f"Bearer {AI_API_KEY}"
 
+    t0=time.time()
     try:
         r=requests.post(url,json=body,headers=hdr,timeout=20).json()
+        metrics_exporter.record_llm("ai_auto_reply",t0,r)
         return r.get("choices",[{}])[0].get("message",{}).get("content")
     except:
+        metrics_exporter.record_llm("ai_auto_reply",t0,error=True)
         return None
 
 # ---------- FALLBACK ------------------------
@@ -221,6 +227,7 @@ def ai_auto_chat(update:Update, context:CallbackContext):
     try: msg.reply_text(final,parse_mode=ParseMode.HTML)
     except: msg.reply_text(final)
 
-def register_handlers(dp,config=None):
-    from telegram.ext import MessageHandler, Filters
-    dp.add_handler(MessageHandler(Filters.text & ~Filters.command, ai_auto_chat))
+PLUGIN_MANIFEST = {
+    "messages": [{"stage": "reply", "callback": "ai_auto_chat"}],
+    "priority": 10,
+}
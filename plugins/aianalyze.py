@@ -1,28 +1,31 @@
 """
 WENBNB AI Analyzer v8.6.4-ProStable++ — EmotionSync + MemoryView Edition
 ───────────────────────────────────────────────────────────────────────────────
-• Emotion Detection (TextBlob engine)
+• Emotion Detection (plugins/sentiment — VADER-style lexicon)
 • Memory Persistence + /memory + /forget commands
-• Adaptive Human Tone — conversational fallback
+• Adaptive Human Tone — conversational fallback (/aianalyze replies;
+  passive chat replies are ai_auto_reply's)
 • AutoRecovery for OpenAI timeouts
 """
 
 import os, json, time, random, requests, traceback
-from textblob import TextBlob
 from telegram import Update
-from telegram.ext import CommandHandler, MessageHandler, Filters, CallbackContext
+from telegram.ext import CallbackContext
+from plugins import metrics_exporter, perf_trace, sentiment
 
 AI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 MEMORY_FILE = "user_memory.json"
 BRAND_FOOTER = "🚀 Powered by WENBNB Neural Engine — Emotional Intelligence 24×7"
 
 # === Memory Helpers ===
+@perf_trace.traced("io")
 def load_memory():
     if os.path.exists(MEMORY_FILE):
         with open(MEMORY_FILE, "r", encoding="utf-8") as f:
             return json.load(f)
     return {}
 
+@perf_trace.traced("io")
 def save_memory(data):
     with open(MEMORY_FILE, "w", encoding="utf-8") as f:
         json.dump(data, f, indent=2)
@@ -41,18 +44,19 @@ def update_memory(user_id, message, mood):
     save_memory(memory)
 
 # === Emotion Detection ===
+MOOD_LINES = {
+    "Positive": "🌞 Mood vibe detected → Positive",
+    "Reflective": "🌧 Mood vibe detected → Reflective",
+    "Balanced": "🌙 Mood vibe detected → Calm & Balanced",
+}
+
 def analyze_emotion(text):
-    blob = TextBlob(text)
-    p = blob.sentiment.polarity
-    if p > 0.35:
-        return "Positive", "🌞 Mood vibe detected → Positive"
-    elif p < -0.35:
-        return "Reflective", "🌧 Mood vibe detected → Reflective"
-    else:
-        return "Balanced", "🌙 Mood vibe detected → Calm & Balanced"
+    mood = sentiment.mood(text, 0.35, -0.35, ("Positive", "Reflective", "Balanced"))
+    return mood, MOOD_LINES[mood]
 
 # === OpenAI Call ===
 def call_openai(prompt, emotion_hint):
+    started, data = time.time(), None
     try:
         base_prompt = (
             "You are WENBNB AI — a warm, emotionally aware crypto companion. "
@@ -71,6 +75,7 @@ def call_openai(prompt, emotion_hint):
             timeout=20,
         )
         data = r.json()
+        metrics_exporter.record_llm("aianalyze", started, data)
         if "choices" in data:
             return data["choices"][0]["message"]["content"].strip()
         elif "error" in data:
@@ -78,6 +83,8 @@ def call_openai(prompt, emotion_hint):
         else:
             raise RuntimeError("Unexpected OpenAI response")
     except Exception as e:
+        if data is None:  # never got a response body
+            metrics_exporter.record_llm("aianalyze", started, error=True)
         print(f"[AI ERROR] {e}")
         return None
 
@@ -146,25 +153,12 @@ def forget_cmd(update: Update, context: CallbackContext):
     else:
         update.message.reply_text("⚙️ No emotional data found to forget.", parse_mode="HTML")
 
-# === Auto Chat (Passive Emotion Sync) ===
-def auto_ai_chat(update: Update, context: CallbackContext):
-    msg = update.message.text
-    if msg.startswith("/"):
-        return
-    context.bot.send_chat_action(chat_id=update.effective_chat.id, action="typing")
-    time.sleep(random.uniform(1.0, 1.6))
-    mood, mood_line = analyze_emotion(msg)
-    ai_reply = ai_chat_response(msg, mood)
-    update_memory(update.effective_user.id, msg, mood)
-    update.message.reply_text(
-        f"{mood_line}\n\n{ai_reply}\n\n{BRAND_FOOTER}",
-        parse_mode="HTML"
-    )
-
 # === Register ===
-def register_handlers(dp):
-    dp.add_handler(CommandHandler("aianalyze", aianalyze_cmd))
-    dp.add_handler(CommandHandler("memory", memory_cmd))
-    dp.add_handler(CommandHandler("forget", forget_cmd))
-    dp.add_handler(MessageHandler(Filters.text & ~Filters.command, auto_ai_chat))
-    print("✅ Loaded plugin: aianalyze.py v8.6.4-ProStable++ (EmotionSync + MemoryView Edition)")
+PLUGIN_MANIFEST = {
+    "commands": {
+        "aianalyze": "aianalyze_cmd",
+        "memory": "memory_cmd",
+        "forget": "forget_cmd",
+    },
+    "priority": 5,
+}
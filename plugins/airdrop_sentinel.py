@@ -12,6 +12,9 @@ Commands:
  - /airdropremove <name>                       (admin remove)
  - /airdropset <threshold>                     (admin: set alert threshold %)
 
+Wallet scores come from the local on-chain index (plugins/wallet_indexer):
+nonce, BEP-20 transfers, active days and protocol interactions.
+
 Requires: ADMIN_ID or ADMIN_CHAT_ID env var for admin notifications.
 """
 
@@ -19,18 +22,18 @@ import os
 import time
 import json
 import math
-import random
-import requests
 import traceback
 from datetime import datetime
 from typing import Optional, Dict, Any
 from telegram import Update
-from telegram.ext import CommandHandler, CallbackContext, JobQueue
+from telegram.ext import CallbackContext
+
+from plugins import token_resolver, wallet_indexer
+from plugins.market_models import PairQuote
 
 # ==== CONFIG ====
 ADMIN_ID = int(os.getenv("ADMIN_ID", os.getenv("ADMIN_CHAT_ID", "0")))
 ADMIN_CHAT_ID = int(os.getenv("ADMIN_CHAT_ID", os.getenv("ADMIN_ID", "0")))
-DEX_SEARCH = "https://api.dexscreener.io/latest/dex/search?q={q}"
 WATCHLIST_FILE = "data/airdrop_watchlist.json"
 TELEMETRY_FILE = "data/airdrop_telemetry.json"
 DEFAULT_INTERVAL_MINUTES = int(os.getenv("ALERT_INTERVAL_MINUTES", "10"))
@@ -98,23 +101,14 @@ def record_telemetry(event: str, data: Dict[str, Any]):
     _save_json(TELEMETRY_FILE, t)
 
 # ==== Dex probe & probability model ====
-def probe_dexscreener(query: str, timeout=8) -> Optional[dict]:
+def find_best_pair(query: str) -> Optional[PairQuote]:
+    # Local symbol/contract index first; DexScreener search only for unseen queries
     try:
-        r = requests.get(DEX_SEARCH.format(q=query), timeout=timeout)
-        return r.json()
+        return token_resolver.find_pair(query)
     except Exception as e:
         print(f"[AirdropSentinel] Dex probe error: {e}")
         return None
 
-def find_best_pair(query: str) -> Optional[dict]:
-    data = probe_dexscreener(query)
-    if not data:
-        return None
-    pairs = data.get("pairs", [])
-    if not pairs:
-        return None
-    return pairs[0]
-
 def estimate_airdrop_probability(liquidity_usd: float, volume24_usd: float, pair_age_days: float = 0.0) -> float:
     L = max(1.0, float(liquidity_usd or 0))
     V = max(1.0, float(volume24_usd or 0))
@@ -128,24 +122,17 @@ def estimate_airdrop_probability(liquidity_usd: float, volume24_usd: float, pair
     return float(max(0, min(prob, 100)))
 
 # ==== Reporting builders ====
-def token_report_from_pair(pair: dict) -> Dict[str, Any]:
-    base = pair.get("baseToken", {}) or {}
-    token_name = base.get("name", "Unknown Token")
-    token_symbol = base.get("symbol", "")
-    dex = pair.get("dexId", "DEX").capitalize()
-    liquidity = float(pair.get("liquidity", {}).get("usd") or 0)
-    volume24 = float(pair.get("volume", {}).get("h24") or 0)
-    price = pair.get("priceUsd", "N/A")
-    prob = estimate_airdrop_probability(liquidity, volume24, 0.0)
+def token_report_from_pair(pair: PairQuote) -> Dict[str, Any]:
+    prob = estimate_airdrop_probability(pair.liquidity, pair.volume24, 0.0)
     return {
-        "name": token_name,
-        "symbol": token_symbol,
-        "dex": dex,
-        "liquidity": liquidity,
-        "volume24": volume24,
-        "price": price,
+        "name": pair.name or "Unknown Token",
+        "symbol": pair.symbol,
+        "dex": pair.dex_label,
+        "liquidity": pair.liquidity,
+        "volume24": pair.volume24,
+        "price": f"{pair.price:.8g}" if pair.price is not None else "N/A",
         "prob": prob,
-        "raw_pair": pair
+        "contract": pair.contract,
     }
 
 def format_token_report(info: Dict[str, Any]) -> str:
@@ -165,6 +152,23 @@ def format_token_report(info: Dict[str, Any]) -> str:
         f"{BRAND_TAG}"
     )
 
+def format_wallet_report(address: str, f: Dict[str, Any]) -> str:
+    score = wallet_indexer.score(f)
+    rank = "A+" if score > 95 else "A" if score > 85 else "B" if score > 70 else "C" if score > 55 else "D"
+    eligibility = "✅ Eligible" if score >= 80 else "⚠️ Borderline" if score >= 55 else "❌ Not Eligible"
+    protocols = ", ".join(f"{name} ×{n}" for name, n in sorted(f["protocols"].items(), key=lambda kv: -kv[1]))
+    return (
+        f"💎 <b>Wallet Scan Report</b>\n"
+        f"🔷 Wallet: <code>{address[:8]}...{address[-6:]}</code>\n"
+        f"{eligibility} for upcoming airdrops  |  <b>Rank: {rank}</b>\n"
+        f"🧠 Neural Score: {score}/100\n"
+        f"📤 Transactions sent: {f['nonce']:,}\n"
+        f"🔁 Token transfers: {f['transfers']:,} across {f['tokens']} tokens\n"
+        f"📅 Active days: {f['active_days']} of last {f['window_days']}\n"
+        f"🔗 DeFi Protocols: {len(f['protocols'])}" + (f" — {protocols}" if protocols else "") + "\n\n"
+        f"{BRAND_TAG}"
+    )
+
 # ==== Safe reply helper ====
 def safe_reply(update: Update, text: str, parse_mode="HTML", **kwargs):
     try:
@@ -182,13 +186,13 @@ def is_admin(user_id: int) -> bool:
 # ==== Auto-learn logic ====
 LEARN_THRESHOLD = DEFAULT_THRESHOLD
 
-def maybe_autolearn(pair: dict, name_hint: str = ""):
+def maybe_autolearn(pair: PairQuote, name_hint: str = ""):
     try:
         info = token_report_from_pair(pair)
         prob = info.get("prob", 0)
         if prob >= LEARN_THRESHOLD:
             name = info.get("symbol") or info.get("name") or name_hint or f"tok{int(time.time())}"
-            contract = info.get("raw_pair", {}).get("baseToken", {}).get("address") or ""
+            contract = info.get("contract") or ""
             if not contract:
                 return None
             wl = load_watchlist()
@@ -211,13 +215,9 @@ def maybe_autolearn(pair: dict, name_hint: str = ""):
 # ==== Scanner job ====
 def scan_token_contract(contract: str) -> Optional[Dict[str, Any]]:
     try:
-        data = probe_dexscreener(contract)
-        if not data:
-            return None
-        pairs = data.get("pairs", [])
-        if not pairs:
+        pair = find_best_pair(contract)
+        if not pair:
             return None
-        pair = pairs[0]
         info = token_report_from_pair(pair)
         return info
     except Exception as e:
@@ -284,22 +284,17 @@ def airdropcheck_cmd(update: Update, context: CallbackContext):
             except Exception:
                 pass
         return
-    if query.lower().startswith("0x") and len(query) >= 40:
-        s = sum((ord(c) * (i + 1)) for i, c in enumerate(query[-12:])) & 0xFFFFFFFF
-        rnd = random.Random(s)
-        score = int((rnd.random() * 80) + 10)
-        protocols = 1 + (s % 8)
-        rank = "A+" if score > 95 else "A" if score > 85 else "B" if score > 70 else "C" if score > 55 else "D"
-        eligibility = "✅ Eligible" if score >= 80 else "⚠️ Borderline" if score >= 55 else "❌ Not Eligible"
-        msg = (
-            f"💎 <b>Wallet Scan Report</b>\n"
-            f"🔷 Wallet: <code>{query[:8]}...{query[-6:]}</code>\n"
-            f"{eligibility} for upcoming airdrops  |  <b>Rank: {rank}</b>\n"
-            f"🧠 Neural Score: {score}/100\n"
-            f"🔗 DeFi Protocols Detected (est.): {protocols}\n\n"
-            f"{BRAND_TAG}"
-        )
-        safe_reply(update, msg)
+    if query.lower().startswith("0x") and len(query) == 42:
+        try:
+            features = wallet_indexer.lookup(query)   # None while the background index runs
+        except Exception as e:
+            print(f"[AirdropSentinel] wallet index error: {e}")
+            safe_reply(update, "⚠️ Could not read on-chain activity right now — try again shortly.")
+            return
+        if features is None:
+            safe_reply(update, "⏳ Indexing this wallet's on-chain activity — try /airdropcheck again shortly.")
+            return
+        safe_reply(update, format_wallet_report(query, features))
         return
     safe_reply(update, "⚠️ Could not detect token on DEX and input is not a valid 0x wallet address.")
 
@@ -368,25 +363,20 @@ def airdropset_cmd(update: Update, context: CallbackContext):
         safe_reply(update, "⚠️ Use integer percent, e.g. /airdropset 70")
 
 # ==== Register plugin & job ====
-def register(dispatcher):
-    dispatcher.add_handler(CommandHandler("airdropcheck", airdropcheck_cmd))
-    dispatcher.add_handler(CommandHandler("airdropalert", airdropalert_cmd))
-    dispatcher.add_handler(CommandHandler("airdropwatchlist", airdropwatchlist_cmd))
-    dispatcher.add_handler(CommandHandler("airdropadd", airdropadd_cmd))
-    dispatcher.add_handler(CommandHandler("airdropremove", airdropremove_cmd))
-    dispatcher.add_handler(CommandHandler("airdropset", airdropset_cmd))
-
-    jq = getattr(dispatcher, "job_queue", None)
-    if isinstance(jq, JobQueue):
-        try:
-            jq.run_repeating(job_scan_watchlist, interval=DEFAULT_INTERVAL_MINUTES * 60, first=20)
-            print(f"🎯 Airdrop Sentinel v5.1 active — scanning every {DEFAULT_INTERVAL_MINUTES} minutes.")
-        except Exception as e:
-            print(f"[AirdropSentinel] job schedule failed: {e}")
-        else:
-            print("⚠️ JobQueue not found; sentinel scanning requires dispatcher.job_queue.")
-
-        print("🎯 Loaded plugin: airdrop_sentinel.py — fully initialized ✅")
-        print(f"👑 Admin bound to ID: {ADMIN_ID or ADMIN_CHAT_ID}")
-        print(f"🧠 Threshold: {DEFAULT_THRESHOLD}% | Interval: {DEFAULT_INTERVAL_MINUTES} min")
-        print("---------------------------------------------------------------")
+PLUGIN_MANIFEST = {
+    "commands": {
+        "airdropcheck": "airdropcheck_cmd",
+        "airdropalert": "airdropalert_cmd",
+        "airdropwatchlist": "airdropwatchlist_cmd",
+        "airdropadd": "airdropadd_cmd",
+        "airdropremove": "airdropremove_cmd",
+        "airdropset": "airdropset_cmd",
+    },
+    "jobs": [{
+        "callback": "job_scan_watchlist",
+        "interval": 600,
+        "env": "ALERT_INTERVAL_MINUTES",
+        "scale": 60,
+        "first": 20,
+    }],
+}
@@ -1,20 +1,27 @@
 """
-WENBNB Auto-Backup & Error Log Archiver v1.0
+WENBNB Auto-Backup & Error Log Archiver v2.0
 Backs up system logs, user data, and critical AI memory daily
+• Incremental, deduplicated snapshots via backup_engine (only changed
+  chunks are stored) — includes the root state files (user_memory.json,
+  giveaway_data.json, emotion_*.db …)
+• Daily snapshot is streamed to R2 (multipart, resumable) when S3_ENABLED
+• /backup — snapshot now + send it as a ZIP
+• /snapshots — list snapshots · /restore <id | YYYY-mm-dd HH:MM> — point-in-time restore
 🚀 Powered by WENBNB Neural Engine — Data Integrity Layer 24×7
 """
 
-import os, time, threading, zipfile, shutil, traceback
-from datetime import datetime
+import os, glob, traceback
 from telegram import Update
-from telegram.ext import CommandHandler, CallbackContext
+from telegram.ext import CallbackContext
+from plugins import scheduler, backup_engine, r2_sync
 
 # === CONFIG ===
 ADMIN_IDS = [123456789]  # Replace with your Telegram ID
-BACKUP_DIR = "backups"
+BACKUP_DIR = backup_engine.BACKUP_DIR
 LOGS_DIR = "logs"
 DATA_DIR = "data"
 CHECK_INTERVAL = 86400  # 24 hours
+RECENT_WINDOW = 3600    # a reboot loop shouldn't snapshot on every start
 BRAND_TAG = "🚀 Powered by WENBNB Neural Engine — Data Integrity Layer 24×7"
 
 
@@ -25,55 +32,56 @@ for d in [BACKUP_DIR, LOGS_DIR, DATA_DIR]:
 
 
 def create_backup_archive():
-    """Create timestamped ZIP archive of logs + data"""
+    """Take an incremental snapshot and export it as a ZIP (for /backup)"""
     try:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_name = os.path.join(BACKUP_DIR, f"WENBNB_Backup_{timestamp}.zip")
-        with zipfile.ZipFile(backup_name, "w", zipfile.ZIP_DEFLATED) as backup_zip:
-            for folder in [LOGS_DIR, DATA_DIR]:
-                for root, _, files in os.walk(folder):
-                    for file in files:
-                        path = os.path.join(root, file)
-                        arcname = os.path.relpath(path, start=os.getcwd())
-                        backup_zip.write(path, arcname)
-        print(f"[Backup] Created archive: {backup_name}")
-        return backup_name
+        snap = backup_engine.create_snapshot("manual")
+        archive = backup_engine.export_zip(snap["id"])
+        print(f"[Backup] Exported snapshot {snap['id']}: {archive}")
+        return archive
     except Exception as e:
         print(f"[Backup Error] {e}")
         return None
 
 
-def cleanup_old_backups(max_keep=5):
-    """Keep only the newest 5 backups"""
+def cleanup_old_backups(max_keep=1):
+    """Prune snapshots (engine retention) and keep only the newest exported ZIP"""
     try:
-        files = sorted([os.path.join(BACKUP_DIR, f) for f in os.listdir(BACKUP_DIR)], key=os.path.getmtime)
-        if len(files) > max_keep:
-            for old_file in files[:-max_keep]:
-                os.remove(old_file)
-                print(f"[Cleanup] Removed old backup: {old_file}")
+        backup_engine.prune()
+        files = sorted(glob.glob(os.path.join(BACKUP_DIR, "WENBNB_Backup_*.zip")), key=os.path.getmtime)
+        for old_file in files[:-max_keep] if max_keep else files:
+            os.remove(old_file)
+            print(f"[Cleanup] Removed old backup: {old_file}")
     except Exception as e:
         print(f"[Cleanup Error] {e}")
 
 
-def backup_thread(bot):
-    """Thread that runs continuous backup every 24h"""
-    while True:
-        try:
-            archive = create_backup_archive()
-            cleanup_old_backups()
-            if archive:
-                for admin_id in ADMIN_IDS:
-                    bot.send_message(
-                        admin_id,
-                        f"✅ Daily Backup Completed\n🗂️ File: <b>{os.path.basename(archive)}</b>\n\n{BRAND_TAG}",
-                        parse_mode="HTML"
-                    )
-        except Exception as e:
-            error_log = traceback.format_exc()
-            print(f"[Backup Thread Error] {error_log}")
-            for admin_id in ADMIN_IDS:
-                bot.send_message(admin_id, f"⚠️ Backup Error:\n<code>{e}</code>", parse_mode="HTML")
-        time.sleep(CHECK_INTERVAL)
+def _fmt_size(n):
+    return f"{n / 1048576:.2f} MB" if n >= 1048576 else f"{n / 1024:.1f} KB"
+
+
+def backup_task(bot):
+    """Scheduled daily snapshot (every CHECK_INTERVAL)"""
+    try:
+        snap = backup_engine.ensure_recent(RECENT_WINDOW, label="daily")
+        cleanup_old_backups()
+        if r2_sync.S3_ENABLED:
+            r2_sync.upload_snapshot(snap["id"])
+        st = snap["stats"]
+        for admin_id in ADMIN_IDS:
+            bot.send_message(
+                admin_id,
+                f"✅ Daily Backup Completed\n"
+                f"🗂️ Snapshot: <b>{snap['id']}</b>\n"
+                f"📁 {st['files']} files · {_fmt_size(st['bytes'])}\n"
+                f"🧩 New data: {st['new_chunks']} chunks · {_fmt_size(st['stored_bytes'])}\n\n"
+                f"{BRAND_TAG}",
+                parse_mode="HTML"
+            )
+    except Exception as e:
+        error_log = traceback.format_exc()
+        print(f"[Backup Task Error] {error_log}")
+        for admin_id in ADMIN_IDS:
+            bot.send_message(admin_id, f"⚠️ Backup Error:\n<code>{e}</code>", parse_mode="HTML")
 
 
 # === Manual Command ===
@@ -91,8 +99,70 @@ def backup_now(update: Update, context: CallbackContext):
         update.message.reply_text("⚠️ Backup failed. Check logs.")
 
 
+def list_snapshots(update: Update, context: CallbackContext):
+    if update.effective_user.id not in ADMIN_IDS:
+        update.message.reply_text("🚫 Only admin can view snapshots.")
+        return
+    ids = backup_engine.list_snapshots()
+    if not ids:
+        update.message.reply_text("📭 No snapshots yet.")
+        return
+    lines = []
+    for sid in ids[-10:][::-1]:
+        snap = backup_engine.load_snapshot(sid) or {}
+        st = snap.get("stats", {})
+        lines.append(f"• <code>{sid}</code> — {st.get('files', '?')} files, "
+                     f"+{_fmt_size(st.get('stored_bytes', 0))} ({snap.get('label', '?')})")
+    store = backup_engine.store_stats()
+    update.message.reply_text(
+        f"🗂️ <b>Snapshots</b> ({store['snapshots']} kept, store {_fmt_size(store['stored_bytes'])})\n\n"
+        + "\n".join(lines) + f"\n\n{BRAND_TAG}",
+        parse_mode="HTML"
+    )
+
+
+def restore_snapshot(update: Update, context: CallbackContext):
+    """/restore <snapshot_id | YYYY-mm-dd HH:MM> — restores in place after a safety snapshot"""
+    if update.effective_user.id not in ADMIN_IDS:
+        update.message.reply_text("🚫 Only admin can restore backups.")
+        return
+    if not context.args:
+        update.message.reply_text("💡 Usage: /restore <snapshot_id> or /restore YYYY-mm-dd HH:MM")
+        return
+    arg = " ".join(context.args)
+    try:
+        if arg in backup_engine.list_snapshots():
+            target = {"snapshot_id": arg}
+        else:
+            target = {"at": arg}
+        safety = backup_engine.create_snapshot("pre-restore")
+        sid, count = backup_engine.restore(**target)
+        update.message.reply_text(
+            f"♻️ Restored <b>{count}</b> files from <code>{sid}</code>\n"
+            f"🛟 Previous state kept as <code>{safety['id']}</code>\n"
+            f"🔁 Reload affected plugins (/reload all) to pick it up.\n\n{BRAND_TAG}",
+            parse_mode="HTML"
+        )
+    except ValueError as e:
+        update.message.reply_text(f"⚠️ Restore failed: {e}")
+    except Exception as e:
+        print(f"[Restore Error] {traceback.format_exc()}")
+        update.message.reply_text(f"⚠️ Restore failed: {e}")
+
+
 # === Register Handlers ===
-def register_handlers(dp):
-    dp.add_handler(CommandHandler("backup", backup_now))
-    threading.Thread(target=backup_thread, args=(dp.bot,), daemon=True).start()
-    print("💾 Auto-Backup thread started.")
+def start_backup_thread(dp):
+    scheduler.every("auto_backup.daily", backup_task, CHECK_INTERVAL, first=0,
+                    args=(dp.bot,), owner="auto_backup")
+    print("💾 Auto-Backup task scheduled.")
+
+
+PLUGIN_MANIFEST = {
+    "commands": {
+        "backup": "backup_now",
+        "snapshots": "list_snapshots",
+        "restore": "restore_snapshot",
+    },
+    "setup": "start_backup_thread",
+    "priority": 5,
+}
@@ -0,0 +1,444 @@
+"""
+WENBNB Backup Engine v1.0 — Incremental, Deduplicating Snapshots
+──────────────────────────────────────────────────────────────────────────────
+• Content-defined chunking (windowed gear hash, vectorised with NumPy):
+  an edit only changes the chunks around it, not the whole file
+• Chunks are content-addressed (sha256) and stored once, zlib-compressed,
+  under backups/chunks/ — identical data across files/snapshots is free
+• Unchanged files (same size + mtime) are not even read: their chunk list
+  comes from the file index cache
+• Live SQLite databases are copied through the sqlite3 backup API first
+  (a consistent image with the WAL folded in); -wal / -shm sidecars are
+  never copied raw
+• One JSON manifest per snapshot → point-in-time restore of any snapshot
+• prune() keeps the newest N + one per day, gc() sweeps unreferenced chunks
+
+Covers logs/, data/ and the state files bots write in the working
+directory (user_memory.json, giveaway_data.json, emotion_*.db …).
+Backup cost scales with churn, not with total size.
+"""
+
+import glob, hashlib, json, os, sqlite3, threading, time, zipfile, zlib
+from datetime import datetime
+import numpy as np
+
+BACKUP_DIR = "backups"
+CHUNK_DIR = os.path.join(BACKUP_DIR, "chunks")
+SNAPSHOT_DIR = os.path.join(BACKUP_DIR, "snapshots")
+INDEX_FILE = os.path.join(BACKUP_DIR, "file_index.json")
+
+SOURCE_DIRS = ["data", "logs"]
+STATE_FILES = [
+    "user_memory.json", "giveaway_data.json", "claimed_rewards.json",
+    "ctx_state.json", "memory_data.db", "emotion_*.db",
+]
+EXCLUDE_SUFFIXES = (".tmp", ".lock", "-wal", "-shm", "-journal")
+SQLITE_MAGIC = b"SQLite format 3\x00"
+SQLITE_COPY = os.path.join(BACKUP_DIR, "sqlite_copy.tmp")
+
+KEEP_LAST = int(os.getenv("BACKUP_KEEP_LAST", "10"))
+KEEP_DAILY = int(os.getenv("BACKUP_KEEP_DAILY", "14"))
+
+# Chunking: ~8 KB average, 2–64 KB bounds, 64-byte rolling window
+MIN_CHUNK = 2 * 1024
+MAX_CHUNK = 64 * 1024
+CUT_MASK = (1 << 13) - 1
+WINDOW = 64
+READ_BLOCK = 4 * 1024 * 1024
+_GEAR = np.random.default_rng(0x57E4B).integers(0, 2 ** 63, 256, dtype=np.uint64)
+
+_lock = threading.RLock()   # auto_backup + maintenance_pro may race at boot
+
+
+def log(msg):
+    print(f"[BackupEngine] {msg}")
+
+
+# === CHUNKING ===
+def _cut_points(buf):
+    """End offsets of content-defined chunks in buf (last one is len(buf))."""
+    n = len(buf)
+    if n <= MIN_CHUNK:
+        return [n]
+    g = _GEAR[np.frombuffer(buf, dtype=np.uint8)]
+    c = np.cumsum(g)                      # wraps mod 2^64 — fine for hashing
+    h = c.copy()
+    h[WINDOW:] -= c[:-WINDOW]             # hash of the last WINDOW bytes
+    candidates = np.flatnonzero((h & CUT_MASK) == 0) + 1
+
+    cuts, last = [], 0
+    for pos in candidates.tolist():
+        if pos - last < MIN_CHUNK:
+            continue
+        while pos - last > MAX_CHUNK:
+            last += MAX_CHUNK
+            cuts.append(last)
+        cuts.append(pos)
+        last = pos
+    while n - last > MAX_CHUNK:
+        last += MAX_CHUNK
+        cuts.append(last)
+    if last < n:
+        cuts.append(n)
+    return cuts
+
+
+def iter_chunks(path):
+    """Yield content-defined chunks of a file, streaming in READ_BLOCK pieces."""
+    carry = b""
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(READ_BLOCK)
+            buf = carry + block
+            if not buf:
+                return
+            cuts = _cut_points(buf)
+            if block:
+                cuts = cuts[:-1]          # tail may continue in the next block
+            start = 0
+            for end in cuts:
+                yield buf[start:end]
+                start = end
+            carry = buf[start:]
+            if not block:
+                return
+
+
+# === CHUNK STORE ===
+def _chunk_path(cid):
+    return os.path.join(CHUNK_DIR, cid[:2], cid)
+
+
+def put_chunk(data):
+    """Store a chunk if new. Returns (chunk_id, stored_bytes)."""
+    cid = hashlib.sha256(data).hexdigest()
+    path = _chunk_path(cid)
+    if os.path.exists(path):
+        return cid, 0
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    packed = zlib.compress(data, 6)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(packed)
+    os.replace(tmp, path)
+    return cid, len(packed)
+
+
+def get_chunk(cid):
+    with open(_chunk_path(cid), "rb") as f:
+        data = zlib.decompress(f.read())
+    if hashlib.sha256(data).hexdigest() != cid:
+        raise IOError(f"chunk {cid[:12]} is corrupt")
+    return data
+
+
+# === JSON HELPERS ===
+def _load_json(path, default):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return default
+
+
+def _save_json(path, data):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+# === SOURCES ===
+def source_files():
+    files = set()
+    for d in SOURCE_DIRS:
+        for root, _, names in os.walk(d):
+            for name in names:
+                files.add(os.path.normpath(os.path.join(root, name)))
+    for pattern in STATE_FILES:
+        files.update(os.path.normpath(p) for p in glob.glob(pattern))
+    return sorted(f for f in files if not f.endswith(EXCLUDE_SUFFIXES) and os.path.isfile(f))
+
+
+def _is_sqlite(path):
+    try:
+        with open(path, "rb") as f:
+            return f.read(16) == SQLITE_MAGIC
+    except OSError:
+        return False
+
+
+def _wal_sig(path):
+    try:
+        st = os.stat(f"{path}-wal")
+        return [st.st_size, st.st_mtime_ns]
+    except OSError:
+        return None
+
+
+def _sqlite_copy(path):
+    """Consistent image of a live database (WAL changes included) → SQLITE_COPY."""
+    os.makedirs(BACKUP_DIR, exist_ok=True)
+    if os.path.exists(SQLITE_COPY):
+        os.remove(SQLITE_COPY)
+    src = sqlite3.connect(path, timeout=30)
+    try:
+        dst = sqlite3.connect(SQLITE_COPY)
+        try:
+            src.backup(dst)
+        finally:
+            dst.close()
+    finally:
+        src.close()
+    return SQLITE_COPY
+
+
+# === SNAPSHOTS ===
+def _new_snapshot_id():
+    base = datetime.now().strftime("%Y%m%d_%H%M%S")
+    sid, n = base, 1
+    while os.path.exists(os.path.join(SNAPSHOT_DIR, f"{sid}.json")):
+        n += 1
+        sid = f"{base}_{n}"
+    return sid
+
+
+def create_snapshot(label="auto"):
+    """Snapshot every source file; only new chunks hit the disk. Returns manifest."""
+    with _lock:
+        started = time.time()
+        index = _load_json(INDEX_FILE, {})
+        files, new_index = {}, {}
+        stats = {"files": 0, "bytes": 0, "read_bytes": 0, "reused_files": 0,
+                 "new_chunks": 0, "stored_bytes": 0}
+
+        for path in source_files():
+            try:
+                st = os.stat(path)
+                is_db = _is_sqlite(path)
+                # A WAL database can change without touching the main file
+                wal = _wal_sig(path) if is_db else None
+                cached = index.get(path)
+                if (cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns
+                        and (cached[3] if len(cached) > 3 else None) == wal):
+                    chunks, size = cached[2], cached[4] if len(cached) > 4 else st.st_size
+                    stats["reused_files"] += 1
+                else:
+                    source = _sqlite_copy(path) if is_db else path
+                    chunks, size = [], 0
+                    for data in iter_chunks(source):
+                        cid, stored = put_chunk(data)
+                        chunks.append(cid)
+                        size += len(data)
+                        stats["read_bytes"] += len(data)
+                        if stored:
+                            stats["new_chunks"] += 1
+                            stats["stored_bytes"] += stored
+            except (OSError, sqlite3.Error) as e:
+                log(f"⚠️ Skipped {path}: {e}")
+                continue
+            files[path] = {"size": size, "mtime": st.st_mtime, "chunks": chunks}
+            if is_db:
+                files[path]["sqlite"] = True
+            new_index[path] = [st.st_size, st.st_mtime_ns, chunks, wal, size]
+            stats["files"] += 1
+            stats["bytes"] += size
+        if os.path.exists(SQLITE_COPY):
+            os.remove(SQLITE_COPY)
+
+        stats["ms"] = round((time.time() - started) * 1000, 1)
+        manifest = {
+            "id": _new_snapshot_id(),
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "label": label,
+            "files": files,
+            "stats": stats,
+        }
+        _save_json(os.path.join(SNAPSHOT_DIR, f"{manifest['id']}.json"), manifest)
+        _save_json(INDEX_FILE, new_index)
+
+    log(f"💾 Snapshot {manifest['id']}: {stats['files']} files, "
+        f"{stats['new_chunks']} new chunks ({stats['stored_bytes'] / 1024:.1f} KB), "
+        f"{stats['reused_files']} unchanged, {stats['ms']:.0f} ms")
+    return manifest
+
+
+def list_snapshots():
+    """Snapshot ids, oldest first."""
+    if not os.path.isdir(SNAPSHOT_DIR):
+        return []
+    return sorted(f[:-5] for f in os.listdir(SNAPSHOT_DIR) if f.endswith(".json"))
+
+
+def load_snapshot(snapshot_id):
+    return _load_json(os.path.join(SNAPSHOT_DIR, f"{snapshot_id}.json"), None)
+
+
+def latest_snapshot():
+    ids = list_snapshots()
+    return load_snapshot(ids[-1]) if ids else None
+
+
+def ensure_recent(max_age, label="auto"):
+    """Reuse the newest snapshot if younger than max_age seconds, else take one."""
+    with _lock:
+        last = latest_snapshot()
+        if last:
+            age = (datetime.now() - datetime.fromisoformat(last["created"])).total_seconds()
+            if age < max_age:
+                return last
+        return create_snapshot(label)
+
+
+def find_snapshot(at):
+    """Newest snapshot taken at or before `at` (datetime or ISO / 'YYYY-mm-dd HH:MM')."""
+    if isinstance(at, str):
+        at = datetime.fromisoformat(at.strip().replace(" ", "T"))
+    chosen = None
+    for sid in list_snapshots():
+        snap = load_snapshot(sid)
+        if snap and datetime.fromisoformat(snap["created"]) <= at:
+            chosen = snap
+    return chosen
+
+
+# === RESTORE ===
+def restore(snapshot_id=None, at=None, target=".", paths=None):
+    """
+    Rebuild files from a snapshot (by id, or the newest at/before `at`).
+    Files are written atomically; `paths` limits the restore to those files.
+    Returns (snapshot_id, files_restored).
+    """
+    snap = find_snapshot(at) if at is not None else (
+        load_snapshot(snapshot_id) if snapshot_id else latest_snapshot())
+    if not snap:
+        raise ValueError("no matching snapshot")
+
+    restored = 0
+    with _lock:
+        for path, meta in snap["files"].items():
+            if paths and path not in paths:
+                continue
+            dest = os.path.join(target, path)
+            os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+            tmp = f"{dest}.restore.tmp"
+            with open(tmp, "wb") as f:
+                for cid in meta["chunks"]:
+                    f.write(get_chunk(cid))
+            os.replace(tmp, dest)
+            if meta.get("sqlite"):
+                # Sidecars belong to the database that was just replaced — replaying
+                # its WAL over the restored image would corrupt it
+                for suffix in ("-wal", "-shm"):
+                    if os.path.exists(dest + suffix):
+                        os.remove(dest + suffix)
+            restored += 1
+    log(f"♻️ Restored {restored} files from {snap['id']} → {target}")
+    return snap["id"], restored
+
+
+class _Spool:
+    """Write-only, non-seekable sink for ZipFile; the generator drains it."""
+
+    def __init__(self):
+        self.buf = bytearray()
+        self.pos = 0
+
+    def write(self, data):
+        self.buf += data
+        self.pos += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.pos
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        out = bytes(self.buf)
+        self.buf.clear()
+        return out
+
+
+def stream_zip(snapshot_id=None, flush_at=1024 * 1024):
+    """
+    Yield a snapshot as ZIP bytes, chunk by chunk — no temp file, memory
+    bounded by ~flush_at + one chunk. Output is deterministic per snapshot.
+    """
+    snap = load_snapshot(snapshot_id) if snapshot_id else latest_snapshot()
+    if not snap:
+        raise ValueError("no snapshot to export")
+    spool = _Spool()
+    with zipfile.ZipFile(spool, "w", zipfile.ZIP_DEFLATED) as z:
+        for path, meta in sorted(snap["files"].items()):
+            info = zipfile.ZipInfo(path, time.localtime(meta["mtime"])[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with z.open(info, "w", force_zip64=meta["size"] > 0x7FFFFFFF) as entry:
+                for cid in meta["chunks"]:
+                    entry.write(get_chunk(cid))
+                    if len(spool.buf) >= flush_at:
+                        yield spool.drain()
+    tail = spool.drain()
+    if tail:
+        yield tail
+
+
+def export_zip(snapshot_id=None, dest=None):
+    """Materialise a snapshot as a ZIP (for sending via Telegram)."""
+    sid = snapshot_id or (list_snapshots() or [None])[-1]
+    if not sid:
+        raise ValueError("no snapshot to export")
+    dest = dest or os.path.join(BACKUP_DIR, f"WENBNB_Backup_{sid}.zip")
+    with open(dest, "wb") as f:
+        for data in stream_zip(sid):
+            f.write(data)
+    return dest
+
+
+# === RETENTION ===
+def prune(keep_last=KEEP_LAST, keep_daily=KEEP_DAILY):
+    """Drop snapshots beyond the newest `keep_last` + newest-per-day for `keep_daily` days."""
+    ids = list_snapshots()
+    keep = set(ids[-keep_last:]) if keep_last else set()
+    days = {}
+    for sid in ids:
+        days[sid[:8]] = sid                   # newest snapshot of each day
+    keep.update(sorted(days.values())[-keep_daily:] if keep_daily else [])
+    dropped = [sid for sid in ids if sid not in keep]
+    for sid in dropped:
+        os.remove(os.path.join(SNAPSHOT_DIR, f"{sid}.json"))
+    removed_chunks = gc() if dropped else 0
+    if dropped:
+        log(f"🧹 Pruned {len(dropped)} snapshots, {removed_chunks} chunks")
+    return dropped
+
+
+def gc():
+    """Delete chunks no snapshot references; drop stale index entries."""
+    with _lock:
+        live = set()
+        for sid in list_snapshots():
+            snap = load_snapshot(sid) or {}
+            for meta in snap.get("files", {}).values():
+                live.update(meta["chunks"])
+        removed = 0
+        for root, _, names in os.walk(CHUNK_DIR):
+            for name in names:
+                if name not in live:
+                    os.remove(os.path.join(root, name))
+                    removed += 1
+        index = _load_json(INDEX_FILE, {})
+        index = {p: e for p, e in index.items() if all(c in live for c in e[2])}
+        _save_json(INDEX_FILE, index)
+    return removed
+
+
+def store_stats():
+    chunks = size = 0
+    for root, _, names in os.walk(CHUNK_DIR):
+        for name in names:
+            chunks += 1
+            size += os.path.getsize(os.path.join(root, name))
+    return {"snapshots": len(list_snapshots()), "chunks": chunks, "stored_bytes": size}
@@ -0,0 +1,216 @@
+"""
+WENBNB Binance Stream v1.0 — Live WebSocket Prices, No REST Polling
+──────────────────────────────────────────────────────────────────────────────
+• One combined-stream WebSocket to Binance keeps PRICES (pair → last
+  price) current for the hot symbols: price_tracker.KNOWN_TOKENS,
+  web3_connect.ALIASES, price-alert symbols and anything a REST lookup
+  found on Binance (track() subscribes on the open socket)
+• BINANCE_STREAM=hot (default) → <pair>@miniTicker streams for hot pairs
+  BINANCE_STREAM=all           → !miniTicker@arr, every pair (≈1 MB/s)
+  BINANCE_STREAM=off           → disabled; callers fall back to REST
+• price(pair) answers from memory: any tick while the socket is up (no
+  tick = no change), or one younger than STALE_AFTER after a drop
+• Ticks of hot pairs feed plugins/price_history (and through it, alerts)
+• Reconnects with exponential backoff + jitter; stops on the registry's
+  stop event (teardown joins the thread, so /reload never runs two)
+• BINANCE_WS_URL points it at a local stub (benchmarks/load_test.py runs one)
+
+    binance_stream.price("BNBUSDT")      # → 612.4 or None (use REST)
+"""
+
+import html, json, os, random, re, threading, time
+from telegram import Update
+from telegram.ext import CallbackContext
+
+from plugins import metrics_exporter, plugin_registry, price_history
+
+MODE = os.getenv("BINANCE_STREAM", "hot").lower()
+STREAM_URL = os.getenv("BINANCE_WS_URL", "wss://stream.binance.com:9443/stream")
+STALE_AFTER = 30              # seconds a tick is trusted once the socket is down
+MAX_STREAMS = 200             # Binance allows 1024 per connection; stay well under
+SUBSCRIBE_BATCH = 50
+BACKOFF_MAX = 60
+RECV_TIMEOUT = 1.0            # recv wake-up to flush pending SUBSCRIBEs
+ADMIN_IDS = [5698007588]
+PAIR_RE = re.compile(r"^[A-Z0-9]{2,20}USDT$")
+BRAND_TAG = "💫 Powered by <b>WENBNB Neural Engine</b> — Neural Market Feed ⚡"
+
+PLUGIN_MANIFEST = {
+    "setup": "start_stream",
+    "teardown": "stop_stream",
+    "commands": {"stream": "stream_status"},
+}
+
+# === STATE ===
+PRICES = {}                   # "BNBUSDT" -> (price, tick time)
+HOT = set()                   # pairs subscribed (or to subscribe)
+STATS = {"ticks": 0, "reconnects": 0, "connected_since": None, "down_since": None, "last_error": ""}
+_pending = set()              # tracked while connected, not yet subscribed
+_lock = threading.Lock()
+_thread = None
+_stop = None                  # this instance's stop event (the registry forgets it on teardown)
+
+
+def log(msg):
+    print(f"[BinanceStream] {msg}")
+
+
+# === LOOKUP ===
+def price(pair):
+    """Last streamed price for a Binance pair, or None when the caller should use REST."""
+    rec = PRICES.get(pair)
+    if rec is None:
+        return None
+    live = STATS["connected_since"] is not None and (MODE == "all" or pair in HOT)
+    if live or time.time() - rec[1] < STALE_AFTER:
+        metrics_exporter.cache_hit("binance_stream", True)
+        return rec[0]
+    return None
+
+
+def track(pair):
+    """Mark a pair hot — subscribed on the open socket, and on every reconnect."""
+    pair = (pair or "").upper()
+    if MODE == "off" or not PAIR_RE.match(pair):
+        return
+    with _lock:
+        if pair in HOT or len(HOT) >= MAX_STREAMS:
+            return
+        HOT.add(pair)
+        _pending.add(pair)
+
+
+def _seed():
+    from plugins import price_alerts, price_tracker, web3_connect
+    pairs = os.getenv("BINANCE_STREAM_SYMBOLS", "")
+    if pairs:
+        return [p.strip().upper() for p in pairs.split(",")]
+    pairs = list(price_tracker.KNOWN_TOKENS.values())
+    pairs += [binance for binance, _, _ in web3_connect.ALIASES.values() if binance]
+    price_alerts.load()
+    pairs += [a["symbol"] + "USDT" for a in list(price_alerts.ALERTS.values())]
+    return pairs
+
+
+# === STREAM ===
+def _url():
+    if MODE == "all":
+        return f"{STREAM_URL}?streams=!miniTicker@arr"
+    with _lock:
+        _pending.clear()
+        streams = "/".join(f"{p.lower()}@miniTicker" for p in sorted(HOT))
+    return f"{STREAM_URL}?streams={streams}"
+
+
+def _on_message(raw):
+    msg = json.loads(raw)
+    data = msg.get("data", msg) if isinstance(msg, dict) else msg
+    if isinstance(data, dict) and "s" not in data:     # SUBSCRIBE ack: {"result": null, "id": n}
+        return
+    now = time.time()
+    for t in data if isinstance(data, list) else [data]:
+        pair, p = t.get("s"), float(t.get("c") or 0)
+        if not pair or p <= 0:
+            continue
+        PRICES[pair] = (p, now)
+        if pair in HOT and pair.endswith("USDT"):
+            price_history.record(pair[:-4], p, ts=now, source="binance-ws")
+        STATS["ticks"] += 1
+
+
+def _subscribe(ws, sub_id):
+    with _lock:
+        pairs = sorted(_pending)
+        _pending.clear()
+    for i in range(0, len(pairs), SUBSCRIBE_BATCH):
+        params = [f"{p.lower()}@miniTicker" for p in pairs[i:i + SUBSCRIBE_BATCH]]
+        ws.send(json.dumps({"method": "SUBSCRIBE", "params": params, "id": sub_id + i}))
+    if pairs:
+        log(f"➕ Subscribed {len(pairs)} pair(s)")
+
+
+def _run(stop):
+    from websockets.sync.client import connect
+    attempt = 0
+    while not stop.is_set():
+        try:
+            with connect(_url(), open_timeout=10, max_size=8 * 2 ** 20) as ws:
+                STATS["connected_since"], STATS["down_since"] = time.time(), None
+                log(f"🟢 Connected ({'all pairs' if MODE == 'all' else f'{len(HOT)} pairs'})")
+                sub_id = 1
+                while not stop.is_set():
+                    if _pending and MODE != "all":
+                        _subscribe(ws, sub_id)
+                        sub_id += SUBSCRIBE_BATCH
+                    try:
+                        raw = ws.recv(timeout=RECV_TIMEOUT)
+                    except TimeoutError:
+                        continue
+                    _on_message(raw)
+                    attempt = 0                      # healthy again — reset the backoff
+        except Exception as e:
+            STATS["last_error"] = f"{type(e).__name__}: {e}"[:200]
+        if STATS["connected_since"] is not None:
+            STATS["connected_since"], STATS["down_since"] = None, time.time()
+        if stop.is_set():
+            break
+        STATS["reconnects"] += 1
+        delay = min(BACKOFF_MAX, 2 ** attempt) * random.uniform(0.5, 1.0)
+        attempt += 1
+        log(f"🔴 Disconnected ({STATS['last_error']}) — retry in {delay:.1f}s")
+        stop.wait(delay)
+    log("⏹️ Stream stopped")
+
+
+def start_stream(dispatcher):
+    global _thread, _stop
+    if MODE == "off" or _thread is not None:
+        return
+    try:
+        import websockets  # noqa: F401 — optional dependency, only needed here
+    except ImportError:
+        log("⚠️ websockets not installed — streaming disabled, REST only")
+        return
+    for pair in _seed():
+        track(pair)
+    metrics_exporter.gauge("binance_stream_connected", lambda: int(STATS["connected_since"] is not None))
+    metrics_exporter.gauge("binance_stream_ticks", lambda: STATS["ticks"])
+    _stop = plugin_registry.stop_event("binance_stream")
+    STATS["down_since"] = time.time()                # /stream counts from here until the first connect
+    _thread = threading.Thread(target=_run, args=(_stop,), name="wenbnb-binance-stream", daemon=True)
+    _thread.start()
+
+
+def stop_stream(dispatcher):
+    """Teardown: stop the socket loop and wait for it, so a reload starts exactly one."""
+    global _thread
+    if _thread is None:
+        return
+    _stop.set()
+    _thread.join(timeout=RECV_TIMEOUT + 5)
+    if _thread.is_alive():
+        log("⚠️ Stream thread still closing")
+    _thread = None
+    STATS["connected_since"] = None
+
+
+# === ADMIN ===
+def stream_status(update: Update, context: CallbackContext):
+    if update.effective_user.id not in ADMIN_IDS:
+        return update.message.reply_text("🚫 Only admin can view the Binance stream.")
+
+    now = time.time()
+    if MODE == "off" or _thread is None:
+        state = "⚪ disabled (REST only)"
+    elif STATS["connected_since"] is not None:
+        state = f"🟢 up {now - STATS['connected_since']:.0f}s"
+    else:
+        state = f"🔴 down {now - (STATS['down_since'] or now):.0f}s"
+    fresh = sum(1 for _, ts in list(PRICES.values()) if now - ts < STALE_AFTER)
+    text = (f"📡 <b>WENBNB Binance Stream</b> — {state}\n\n"
+            f"Mode: <b>{MODE}</b> | hot pairs {len(HOT)}\n"
+            f"Prices: {len(PRICES)} ({fresh} ticked in {STALE_AFTER}s)\n"
+            f"Ticks: {STATS['ticks']:,} | reconnects {STATS['reconnects']}\n")
+    if STATS["last_error"]:
+        text += f"Last error: <code>{html.escape(STATS['last_error'][:80])}</code>\n"
+    update.message.reply_text(text + f"\n{BRAND_TAG}", parse_mode="HTML")
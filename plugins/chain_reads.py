@@ -0,0 +1,256 @@
+"""
+WENBNB Chain Reads v1.0 — Batched JSON-RPC + Multicall3 Reads for BSC
+──────────────────────────────────────────────────────────────────────────────
+• read_many([(target, fn, *args), …]) packs every read into Multicall3
+  aggregate3 (allowFailure=true) — native balances go through
+  getEthBalance, so a wallet + dozens of tokens is ONE eth_call
+• More calls than MULTICALL_CHUNK → several aggregate3 eth_calls sent as
+  one JSON-RPC batch: still one HTTP round trip
+• No Multicall3 on the endpoint → falls back to a JSON-RPC batch of plain
+  eth_call / eth_getBalance requests
+• Requests go through plugins/rpc_pool — lowest-latency healthy BSC node,
+  failover to another node on timeouts / rate limits
+• Hand-rolled ABI for the handful of shapes we need (uint256, string /
+  bytes32, aggregate3) — web3.py is not imported on this path
+• Token metadata (symbol / decimals / name) never changes and is cached,
+  so repeat lookups only read balances
+
+    chain_reads.portfolio("0xabc…", WALLET_TOKENS)
+    chain_reads.token_info("0xdef…")   # totalSupply + decimals + symbol, one call
+"""
+
+import os, re, threading
+import requests
+
+from plugins import metrics_exporter, rpc_pool
+
+MULTICALL3 = os.getenv("MULTICALL3_ADDRESS", "0xcA11bde05977b3631167028862bE2a173976CA11")
+MULTICALL_CHUNK = 300        # calls per aggregate3 — well inside eth_call gas limits
+
+SELECTORS = {
+    "balanceOf": "70a08231",
+    "totalSupply": "18160ddd",
+    "decimals": "313ce567",
+    "symbol": "95d89b41",
+    "name": "06fdde03",
+    "getEthBalance": "4d2301cc",   # Multicall3 helper: native balance of an address
+}
+STRING_FNS = {"symbol", "name"}
+AGGREGATE3 = "82ad56cb"
+ADDRESS_RE = re.compile(r"^0x[0-9a-fA-F]{40}$")
+
+# === STATE ===
+META = {}                    # contract (lower) -> {"symbol", "decimals", "name"}
+_ids = iter(range(1, 1 << 62))
+_lock = threading.Lock()
+
+
+class RpcError(Exception):
+    def __init__(self, message, code=None):
+        super().__init__(message)
+        self.code = code
+
+
+def log(msg):
+    print(f"[ChainReads] {msg}")
+
+
+def is_address(value):
+    return bool(ADDRESS_RE.match(value or ""))
+
+
+# === JSON-RPC ===
+def rpc_batch(calls, url=None):
+    """[(method, params)] → [result | RpcError] in order, over ONE HTTP request.
+
+    Goes through the RPC pool unless a specific `url` is given."""
+    if not calls:
+        return []
+    with _lock:
+        ids = [next(_ids) for _ in calls]
+    payload = [{"jsonrpc": "2.0", "id": i, "method": m, "params": p} for i, (m, p) in zip(ids, calls)]
+    metrics_exporter.inc("rpc_round_trips", kind="batch" if len(calls) > 1 else "single")
+    body = payload if len(payload) > 1 else payload[0]
+    if url:
+        r = requests.post(url, json=body, timeout=rpc_pool.RPC_TIMEOUT)
+        r.raise_for_status()
+        body = r.json()
+    else:
+        body = rpc_pool.post(body)
+    replies = {x.get("id"): x for x in (body if isinstance(body, list) else [body])}
+    out = []
+    for i in ids:
+        reply = replies.get(i)
+        if reply is None:
+            out.append(RpcError("missing reply"))
+        elif "error" in reply:
+            err = reply["error"]
+            out.append(RpcError(err.get("message", str(err)), err.get("code")) if isinstance(err, dict)
+                       else RpcError(str(err)))
+        else:
+            out.append(reply.get("result"))
+    return out
+
+
+def rpc(method, params, url=None):
+    result = rpc_batch([(method, params)], url)[0]
+    if isinstance(result, RpcError):
+        raise result
+    return result
+
+
+# === ABI ===
+def _word(n):
+    return n.to_bytes(32, "big")
+
+
+def _address_word(address):
+    return bytes(12) + bytes.fromhex(address[2:])
+
+
+def _int(data, at=0):
+    return int.from_bytes(data[at:at + 32], "big")
+
+
+def calldata(fn, *args):
+    return bytes.fromhex(SELECTORS[fn]) + b"".join(_address_word(a) for a in args)
+
+
+def encode_aggregate3(calls):
+    """aggregate3((address target, bool allowFailure, bytes callData)[])"""
+    tuples = []
+    for target, data in calls:
+        pad = bytes(-len(data) % 32)
+        tuples.append(_address_word(target) + _word(1) + _word(96) + _word(len(data)) + data + pad)
+    offsets, at = [], 32 * len(tuples)
+    for t in tuples:
+        offsets.append(_word(at))
+        at += len(t)
+    return (bytes.fromhex(AGGREGATE3) + _word(32) + _word(len(tuples))
+            + b"".join(offsets) + b"".join(tuples))
+
+
+def decode_aggregate3(raw):
+    """→ [(success, returnData)] from (bool success, bytes returnData)[]"""
+    base = _int(raw)
+    n, start = _int(raw, base), base + 32
+    out = []
+    for i in range(n):
+        at = start + _int(raw, start + 32 * i)
+        data_at = at + _int(raw, at + 32)
+        size = _int(raw, data_at)
+        out.append((_int(raw, at) != 0, raw[data_at + 32:data_at + 32 + size]))
+    return out
+
+
+def decode(fn, data):
+    if not data:
+        return None
+    if fn not in STRING_FNS:
+        return _int(data)
+    if len(data) >= 64 and _int(data) == 32:                  # ABI string
+        size = _int(data, 32)
+        return data[64:64 + size].decode("utf-8", "replace")
+    return data[:32].rstrip(b"\0").decode("utf-8", "replace")   # legacy bytes32 (MKR-style)
+
+
+def _hex(data):
+    return "0x" + data.hex()
+
+
+def _unhex(value):
+    return bytes.fromhex((value or "0x")[2:])
+
+
+# === READS ===
+def read_many(reads, block="latest"):
+    """[(target, fn, *args)] → decoded values in order (None where a read failed)."""
+    if not reads:
+        return []
+    chunks = [reads[i:i + MULTICALL_CHUNK] for i in range(0, len(reads), MULTICALL_CHUNK)]
+    calls = [("eth_call", [{"to": MULTICALL3, "data": _hex(encode_aggregate3(
+        [(target, calldata(fn, *args)) for target, fn, *args in chunk]))}, block])
+        for chunk in chunks]
+    try:
+        results = rpc_batch(calls)
+        if any(isinstance(r, RpcError) for r in results):
+            raise RpcError(next(str(r) for r in results if isinstance(r, RpcError)))
+        out = []
+        for chunk, result in zip(chunks, results):
+            decoded = decode_aggregate3(_unhex(result))
+            if len(decoded) != len(chunk):          # "0x" — no Multicall3 deployed here
+                raise ValueError("short aggregate3 reply")
+            for (target, fn, *args), (ok, data) in zip(chunk, decoded):
+                out.append(decode(fn, data) if ok else None)
+        metrics_exporter.inc("chain_reads", len(reads), mode="multicall")
+        return out
+    except (RpcError, ValueError, IndexError) as e:
+        log(f"⚠️ Multicall3 unavailable ({e}) — falling back to a JSON-RPC batch")
+    return _read_plain(reads, block)
+
+
+def _read_plain(reads, block):
+    calls = []
+    for target, fn, *args in reads:
+        if fn == "getEthBalance":
+            calls.append(("eth_getBalance", [args[0], block]))
+        else:
+            calls.append(("eth_call", [{"to": target, "data": _hex(calldata(fn, *args))}, block]))
+    out = []
+    for (target, fn, *args), result in zip(reads, rpc_batch(calls)):
+        if isinstance(result, RpcError) or result is None:
+            out.append(None)
+        elif fn == "getEthBalance":
+            out.append(int(result, 16))
+        else:
+            out.append(decode(fn, _unhex(result)))
+    metrics_exporter.inc("chain_reads", len(reads), mode="batch")
+    return out
+
+
+def _meta_reads(contracts):
+    missing = [c for c in dict.fromkeys(c.lower() for c in contracts) if c not in META]
+    return missing, [(c, fn) for c in missing for fn in ("symbol", "decimals", "name")]
+
+
+def _store_meta(missing, values):
+    for i, c in enumerate(missing):
+        symbol, decimals, name = values[3 * i:3 * i + 3]
+        if decimals is not None:                  # only cache what really is an ERC-20
+            META[c] = {"symbol": symbol or "?", "decimals": decimals, "name": name or symbol or "?"}
+
+
+# === HIGH LEVEL ===
+def token_info(contract):
+    """{"symbol", "decimals", "name", "total_supply", "supply"} in one round trip."""
+    missing, meta_reads = _meta_reads([contract])
+    values = read_many([(contract, "totalSupply")] + meta_reads)
+    _store_meta(missing, values[1:])
+    meta = META.get(contract.lower())
+    if values[0] is None or meta is None:
+        return None
+    return dict(meta, total_supply=values[0], supply=values[0] / 10 ** meta["decimals"])
+
+
+def portfolio(holder, tokens):
+    """Native + ERC-20 balances of `holder` for every token — one round trip.
+
+    Returns {"native": float, "tokens": [{"contract", "symbol", "name", "decimals",
+    "raw", "balance"}]} with zero balances dropped, largest first.
+    """
+    tokens = list(dict.fromkeys(t.lower() for t in tokens))
+    missing, meta_reads = _meta_reads(tokens)
+    reads = ([(MULTICALL3, "getEthBalance", holder)]
+             + [(t, "balanceOf", holder) for t in tokens] + meta_reads)
+    values = read_many(reads)
+    _store_meta(missing, values[1 + len(tokens):])
+    if values[0] is None:
+        raise RpcError("native balance unavailable")
+
+    held = []
+    for contract, raw in zip(tokens, values[1:1 + len(tokens)]):
+        meta = META.get(contract)
+        if raw and meta:
+            held.append(dict(meta, contract=contract, raw=raw, balance=raw / 10 ** meta["decimals"]))
+    held.sort(key=lambda t: t["balance"], reverse=True)
+    return {"native": values[0] / 1e18, "tokens": held}
@@ -9,7 +9,6 @@ WENBNB Emotion AI v8.4-Pro — Unified Emotion Engine
 
 import json, os, random
 from datetime import datetime, timedelta
-from telegram.ext import CommandHandler
 from telegram import Update
 from telegram.ext import CallbackContext
 
@@ -142,6 +141,6 @@ def emotionai_test(update: Update, context: CallbackContext):
     emoji, label = sync_emotion(update.effective_user.id, update.message.text)
     update.message.reply_text(f"🧠 Emotion AI synced: {emoji} → {label}")
 
-def register(dispatcher):
-    dispatcher.add_handler(CommandHandler("emotionai", emotionai_test))
-    print("🧠 Emotion AI Engine v8.4-Pro registered successfully.")
+PLUGIN_MANIFEST = {
+    "commands": {"emotionai": "emotionai_test"},
+}
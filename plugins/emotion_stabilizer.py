@@ -12,9 +12,9 @@ File: emotion_stabilizer.db
 
 import json, os, re, random
 from datetime import datetime, timedelta
-from telegram.ext import CommandHandler
 from telegram import Update
 from telegram.ext import CallbackContext
+from plugins import lexicon
 
 MEMORY_FILE = "emotion_stabilizer.db"
 
@@ -37,28 +37,26 @@ def _save(data):
 
 
 # === Core Text Tone Analyzer ===
+# Checked in this order — first hit wins
+TONE_WORDS = {
+    "positive": ["great", "win", "moon", "love", "pumped", "bull", "happy", "🔥", "🚀"],
+    "negative": ["bad", "lose", "sad", "dump", "bear", "angry", "red", "😭"],
+    "hype": ["meme", "crazy", "ai", "trend", "viral", "moon", "lit"],
+    "calm": ["ok", "fine", "slow", "chill", "peace", "hodl", "neutral"],
+}
+TONE_SCORE = {"positive": +2, "negative": -2, "hype": +1, "calm": 0}
+lexicon.register("tone", TONE_WORDS)
+
+
 def _text_tone_score(text):
     """
     Quick tone estimation based on message content.
     Returns an integer adjustment (-2 to +2)
     """
-    text = text.lower()
-
-    positive = ["great", "win", "moon", "love", "pumped", "bull", "happy", "🔥", "🚀"]
-    negative = ["bad", "lose", "sad", "dump", "bear", "angry", "red", "😭"]
-    calm = ["ok", "fine", "slow", "chill", "peace", "hodl", "neutral"]
-    hype = ["meme", "crazy", "ai", "trend", "viral", "moon", "lit"]
-
-    if any(w in text for w in positive):
-        return +2
-    elif any(w in text for w in negative):
-        return -2
-    elif any(w in text for w in hype):
-        return +1
-    elif any(w in text for w in calm):
-        return 0
-    else:
+    tone = lexicon.first("tone", text)
+    if tone is None:
         return random.choice([-1, 0, 1])  # small natural jitter
+    return TONE_SCORE[tone]
 
 
 # === Core Stabilizer ===
@@ -135,6 +133,6 @@ def emotion_stable_test(update: Update, context: CallbackContext):
     label = stabilize_emotion(update.effective_user.id, update.message.text)
     update.message.reply_text(f"💫 Stabilized Emotion: {label}")
 
-def register(dispatcher):
-    dispatcher.add_handler(CommandHandler("emotionstable", emotion_stable_test))
-    print("💫 Emotion Stabilizer v8.3-Pro registered successfully.")
+PLUGIN_MANIFEST = {
+    "commands": {"emotionstable": "emotion_stable_test"},
+}
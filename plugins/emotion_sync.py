@@ -12,14 +12,15 @@ Build: v8.3-Full (Pro Mode Ready)
 
 import json, os, random
 from datetime import datetime
-from telegram.ext import CommandHandler
 from telegram import Update
 from telegram.ext import CallbackContext
+from plugins import lexicon, perf_trace
 
 # === File Configuration ===
 MEMORY_FILE = "emotion_sync.db"
 
 # === File I/O ===
+@perf_trace.traced("io")
 def load_emotion_context():
     if not os.path.exists(MEMORY_FILE):
         with open(MEMORY_FILE, "w") as f:
@@ -30,6 +31,7 @@ def load_emotion_context():
     except Exception:
         return {}
 
+@perf_trace.traced("io")
 def save_emotion_context(data):
     try:
         with open(MEMORY_FILE, "w") as f:
@@ -94,33 +96,29 @@ def get_emotion_prefix(user_id, user_message):
 # 🌈 Emotion Label Engine — v8.3 Add-On
 # ============================================================
 
+# Checked in this order — first hit wins
+SENTIMENT_WORDS = {
+    "bullish": ["moon", "pump", "up", "gain", "win", "green", "bull", "profit", "surge"],
+    "bearish": ["down", "dump", "red", "lose", "loss", "pain", "bear", "crash"],
+    "hype": ["ai", "meme", "trend", "viral", "crazy", "lit", "energy", "pump it"],
+    "calm": ["chill", "relax", "peace", "hodl", "slow", "steady", "patience"],
+}
+SENTIMENT_LABELS = {
+    "bullish": ("Bullish 🟢", "#BullVibes #HODL #CryptoLife"),
+    "bearish": ("Bearish 🔴", "#BearMood #MarketFeels #StayStrong"),
+    "hype": ("Hyped 💥", "#AIEnergy #MemeDrop #CryptoBuzz"),
+    "calm": ("Calm 🌙", "#ZenMode #StayBased #CryptoPeace"),
+    None: ("Neutral 😐", "#StayBased #CryptoFeels"),
+}
+lexicon.register("sentiment", SENTIMENT_WORDS)
+
+
 def analyze_sentiment(text):
     """
     Lightweight sentiment + context labeler.
     Returns: dict -> { sentiment, tags, mood }
     """
-
-    text_lower = text.lower()
-    sentiment = "Neutral 😐"
-    tags = "#StayBased #CryptoFeels"
-
-    bullish_words = ["moon", "pump", "up", "gain", "win", "green", "bull", "profit", "surge"]
-    bearish_words = ["down", "dump", "red", "lose", "loss", "pain", "bear", "crash"]
-    hype_words = ["ai", "meme", "trend", "viral", "crazy", "lit", "energy", "pump it"]
-    calm_words = ["chill", "relax", "peace", "hodl", "slow", "steady", "patience"]
-
-    if any(w in text_lower for w in bullish_words):
-        sentiment = "Bullish 🟢"
-        tags = "#BullVibes #HODL #CryptoLife"
-    elif any(w in text_lower for w in bearish_words):
-        sentiment = "Bearish 🔴"
-        tags = "#BearMood #MarketFeels #StayStrong"
-    elif any(w in text_lower for w in hype_words):
-        sentiment = "Hyped 💥"
-        tags = "#AIEnergy #MemeDrop #CryptoBuzz"
-    elif any(w in text_lower for w in calm_words):
-        sentiment = "Calm 🌙"
-        tags = "#ZenMode #StayBased #CryptoPeace"
+    sentiment, tags = SENTIMENT_LABELS[lexicon.first("sentiment", text)]
 
     mood_emojis = random.choice(["😎", "🤓", "🥱", "🤔", "💫", "😏", "🫡", "🔥"])
 
@@ -140,6 +138,6 @@ def emotion_test(update: Update, context: CallbackContext):
     emojis = sync_emotion(update.effective_user.id, update.message.text)
     update.message.reply_text(f"Emotion synced: {emojis}")
 
-def register(dispatcher):
-    dispatcher.add_handler(CommandHandler("emotiontest", emotion_test))
-    print("💫 Emotion Sync Engine v8.3 registered successfully.")
+PLUGIN_MANIFEST = {
+    "commands": {"emotiontest": "emotion_test"},
+}
@@ -16,14 +16,14 @@ Features:
 
 import os
 import json
-import time
 import random
-import threading
 import datetime
 from typing import Dict, Any, List
 
 from telegram import Update, Bot
-from telegram.ext import CommandHandler, CallbackContext
+from telegram.ext import CallbackContext
+
+from plugins import scheduler, perf_trace
 
 # -----------------------
 # Config / Files
@@ -44,10 +44,12 @@ _ensure_file(CLAIMED_FILE, [])
 # -----------------------
 # Utility Helpers
 # -----------------------
+@perf_trace.traced("io")
 def load_json(path: str):
     with open(path, "r") as f:
         return json.load(f)
 
+@perf_trace.traced("io")
 def save_json(path: str, data):
     with open(path, "w") as f:
         json.dump(data, f, indent=2)
@@ -138,8 +140,8 @@ def giveaway_start(update: Update, context: CallbackContext):
     )
     update.message.reply_text(text, parse_mode="HTML")
 
-    # start background thread for rounds (Render-safe)
-    threading.Thread(target=_run_rounds_thread, args=(context.bot, update.effective_chat.id), daemon=True).start()
+    # rounds run as scheduler steps (Render-safe, no sleeping thread)
+    _schedule_step(_open_round, 0, context.bot, update.effective_chat.id, 1)
 
 # -----------------------
 # Join Giveaway
@@ -196,10 +198,11 @@ def giveaway_end(update: Update, context: CallbackContext):
         update.message.reply_text("❌ No active giveaway to end.")
         return
 
-    # set active false — background thread checks this frequently
+    # set active false, then run the pending round step now so it wraps up
     data["active"] = False
     save_data(data)
     update.message.reply_text("🧊 Giveaway force-ended by admin.", parse_mode="HTML")
+    _fire_pending_step()
 
     # If all winners already claimed, clear claim list to keep clean
     claimed = load_claimed()
@@ -213,122 +216,124 @@ def giveaway_end(update: Update, context: CallbackContext):
                 pass
 
 # -----------------------
-# Wait helper (interruptible)
+# Round Logic (scheduler state machine)
 # -----------------------
-def _wait_with_active_check(seconds: int) -> bool:
-    """Sleep in 1s steps and return False early if giveaway was force-ended."""
-    for _ in range(seconds):
-        data = load_data()
-        if not data.get("active"):
-            return False
-        time.sleep(1)
+# Each step is a one-shot scheduler task that queues the next one:
+#   _open_round → (round_time) → _close_round → (break) → _open_round … → _finish
+# No thread sits sleeping through a round; /giveaway_end fires the pending
+# step immediately so the stop is reported at once.
+ROUND_TASK = "giveaway_ai.rounds"
+BREAK_SECONDS = 10
+
+def _schedule_step(step, delay: int, bot: Bot, chat_id: int, current_round: int):
+    scheduler.once(ROUND_TASK, step, delay, args=(bot, chat_id, current_round), owner="giveaway_ai")
+
+def _fire_pending_step():
+    task = scheduler.TASKS.get(ROUND_TASK)
+    if task is not None:
+        scheduler.once(ROUND_TASK, task.fn, 0, args=task.args, owner="giveaway_ai")
+
+def _stopped(bot: Bot, chat_id: int, text: str) -> bool:
+    """True (after telling the chat and finalizing) if an admin ended the giveaway."""
+    if load_data().get("active"):
+        return False
+    try:
+        bot.send_message(chat_id, text, parse_mode="HTML")
+    except:
+        pass
+    _finish(bot, chat_id)
     return True
 
-# -----------------------
-# Round Logic (background)
-# -----------------------
-def _run_rounds_thread(bot: Bot, chat_id: int):
-    # load fresh data each loop so admin updates are respected
+def _open_round(bot: Bot, chat_id: int, current_round: int):
+    stop_text = (
+        "🛑 Giveaway stopped by admin during inter-round break. Aborting."
+        if current_round > 1 else
+        "🛑 Giveaway stopped by admin. Cancelling remaining rounds."
+    )
+    if _stopped(bot, chat_id, stop_text):
+        return
+
+    # update round number (fresh data so admin updates are respected)
     data = load_data()
+    data["round"] = current_round
+    save_data(data)
+
     total = data.get("total_rounds", 1)
     reward = data.get("reward", "N/A")
     emoji = get_reward_emoji(reward)
+    round_time = data.get("round_time", 60)
+    bot.send_message(chat_id, f"🔥 <b>Round {current_round} of {total} started!</b>\n💎 Reward: {emoji} {bold(reward)}\n💬 /join to enter now!\n⏳ Closing in {round_time} seconds...", parse_mode="HTML")
 
-    for current_round in range(1, total + 1):
-        # reload and check active before starting
-        data = load_data()
-        if not data.get("active"):
-            # giveaway was aborted
-            try:
-                bot.send_message(chat_id, "🛑 Giveaway stopped by admin. Cancelling remaining rounds.", parse_mode="HTML")
-            except:
-                pass
-            break
+    _schedule_step(_close_round, round_time, bot, chat_id, current_round)
 
-        # update round number
-        data["round"] = current_round
-        save_data(data)
-
-        round_time = data.get("round_time", 60)
-        bot.send_message(chat_id, f"🔥 <b>Round {current_round} of {total} started!</b>\n💎 Reward: {emoji} {bold(reward)}\n💬 /join to enter now!\n⏳ Closing in {round_time} seconds...", parse_mode="HTML")
+def _close_round(bot: Bot, chat_id: int, current_round: int):
+    if _stopped(bot, chat_id, "🛑 Giveaway stopped by admin during a round. Aborting."):
+        return
 
-        # wait but allow admin to interrupt
-        still_active = _wait_with_active_check(round_time)
-        if not still_active:
-            # admin killed giveaway during waiting
-            try:
-                bot.send_message(chat_id, "🛑 Giveaway stopped by admin during a round. Aborting.", parse_mode="HTML")
-            except:
-                pass
-            break
+    # reload participants and data
+    data = load_data()
+    total = data.get("total_rounds", 1)
+    reward = data.get("reward", "N/A")
+    emoji = get_reward_emoji(reward)
 
-        # reload participants and data
+    participants = data.get("participants", []) or []
+    if participants:
+        winner = random.choice(participants)
+        winner_id = int(winner.get("id"))
+        winner_username = winner.get("username") or str(winner_id)
+        winner_entry = {
+            "round": current_round,
+            "id": winner_id,
+            "username": winner_username,
+            "timestamp": datetime.datetime.utcnow().isoformat(),
+            "reward": reward,
+            "claimed": False
+        }
+
+        # append to winners and clear participants
         data = load_data()
-        # it might have been deactivated while we processed
-        if not data.get("active"):
-            try:
-                bot.send_message(chat_id, "🛑 Giveaway was ended by admin. Stopping rounds.", parse_mode="HTML")
-            except:
-                pass
-            break
-
-        participants = data.get("participants", []) or []
-        if participants:
-            winner = random.choice(participants)
-            winner_id = int(winner.get("id"))
-            winner_username = winner.get("username") or str(winner_id)
-            winner_entry = {
+        winners = data.get("winners", [])
+        winners.append(winner_entry)
+        data["winners"] = winners
+        data["participants"] = []
+        save_data(data)
+
+        # announce
+        bot.send_message(chat_id, f"🏆 <b>Round {current_round} Winner:</b> @{winner_username}\n🎁 Reward: {emoji} {bold(reward)}\nWinner must DM /claim_reward.", parse_mode="HTML")
+
+        # try to DM and register pending claim
+        try:
+            dm_text = (
+                f"🎉 Congratulations @{winner_username}! You were selected as the winner of Round {current_round}.\n\n"
+                f"🎁 Prize: {emoji} {bold(reward)}\n"
+                f"To claim, send /claim_reward in this chat.\n\n"
+                f"{BRAND_FOOTER}"
+            )
+            bot.send_message(chat_id=winner_id, text=dm_text, parse_mode="HTML")
+            claimed = load_claimed()
+            claimed.append({
                 "round": current_round,
                 "id": winner_id,
                 "username": winner_username,
-                "timestamp": datetime.datetime.utcnow().isoformat(),
                 "reward": reward,
-                "claimed": False
-            }
-
-            # append to winners and clear participants
-            data = load_data()
-            winners = data.get("winners", [])
-            winners.append(winner_entry)
-            data["winners"] = winners
-            data["participants"] = []
-            save_data(data)
-
-            # announce
-            bot.send_message(chat_id, f"🏆 <b>Round {current_round} Winner:</b> @{winner_username}\n🎁 Reward: {emoji} {bold(reward)}\nWinner must DM /claim_reward.", parse_mode="HTML")
-
-            # try to DM and register pending claim
-            try:
-                dm_text = (
-                    f"🎉 Congratulations @{winner_username}! You were selected as the winner of Round {current_round}.\n\n"
-                    f"🎁 Prize: {emoji} {bold(reward)}\n"
-                    f"To claim, send /claim_reward in this chat.\n\n"
-                    f"{BRAND_FOOTER}"
-                )
-                bot.send_message(chat_id=winner_id, text=dm_text, parse_mode="HTML")
-                claimed = load_claimed()
-                claimed.append({
-                    "round": current_round,
-                    "id": winner_id,
-                    "username": winner_username,
-                    "reward": reward,
-                    "claimed": False,
-                    "announced_at": datetime.datetime.utcnow().isoformat(),
-                    "claimed_at": None
-                })
-                save_claimed(claimed)
-            except Exception:
-                bot.send_message(chat_id, f"⚠️ Could not DM @{winner_username}. They must DM the bot to claim.", parse_mode="HTML")
-        else:
-            bot.send_message(chat_id, f"😅 No participants in Round {current_round}.", parse_mode="HTML")
-
-        # short break before next round (if any). Also allow admin kill during break.
-        if current_round != total:
-            bot.send_message(chat_id, "🕒 Next round begins in 10 seconds...", parse_mode="HTML")
-            if not _wait_with_active_check(10):
-                bot.send_message(chat_id, "🛑 Giveaway stopped by admin during inter-round break. Aborting.", parse_mode="HTML")
-                break
-
+                "claimed": False,
+                "announced_at": datetime.datetime.utcnow().isoformat(),
+                "claimed_at": None
+            })
+            save_claimed(claimed)
+        except Exception:
+            bot.send_message(chat_id, f"⚠️ Could not DM @{winner_username}. They must DM the bot to claim.", parse_mode="HTML")
+    else:
+        bot.send_message(chat_id, f"😅 No participants in Round {current_round}.", parse_mode="HTML")
+
+    # short break before next round (if any); admin can still end it
+    if current_round < total:
+        bot.send_message(chat_id, f"🕒 Next round begins in {BREAK_SECONDS} seconds...", parse_mode="HTML")
+        _schedule_step(_open_round, BREAK_SECONDS, bot, chat_id, current_round + 1)
+    else:
+        _finish(bot, chat_id)
+
+def _finish(bot: Bot, chat_id: int):
     # finalize: set active false and publish summary
     data = load_data()
     data["active"] = False
@@ -424,12 +429,14 @@ def clear_claims(update: Update, context: CallbackContext):
 # -----------------------
 # Register Handlers
 # -----------------------
-def register_handlers(dp):
-    dp.add_handler(CommandHandler("giveaway_start", giveaway_start))
-    dp.add_handler(CommandHandler("join", join_giveaway))
-    dp.add_handler(CommandHandler("giveaway_end", giveaway_end))
-    dp.add_handler(CommandHandler("giveaway_info", giveaway_info))
-    dp.add_handler(CommandHandler("claim_reward", claim_reward))
-    dp.add_handler(CommandHandler("claimed_list", claimed_list))
-    dp.add_handler(CommandHandler("clear_claims", clear_claims))
-    print("✅ Loaded plugin: giveaway_ai.py v3.3-ProStable+ (EmotionClaim+ EmojiFix + ClearClaim Build)")
+PLUGIN_MANIFEST = {
+    "commands": {
+        "giveaway_start": "giveaway_start",
+        "join": "join_giveaway",
+        "giveaway_end": "giveaway_end",
+        "giveaway_info": "giveaway_info",
+        "claim_reward": "claim_reward",
+        "claimed_list": "claimed_list",
+        "clear_claims": "clear_claims",
+    },
+}
@@ -5,7 +5,7 @@ Locked & Approved — Emotion-Aware Context Mode
 """
 
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
-from telegram.ext import CommandHandler, CallbackQueryHandler, CallbackContext
+from telegram.ext import CallbackContext
 
 BRAND_FOOTER = "🚀 Powered by WENBNB Neural Engine — AI Core Intelligence 24×7"
 
@@ -125,6 +125,7 @@ def help_callback(update: Update, context: CallbackContext):
 
 # === REGISTRATION ===
 
-def register_handlers(dp):
-    dp.add_handler(CommandHandler("help", help_ai))
-    dp.add_handler(CallbackQueryHandler(help_callback, pattern="help_"))
+PLUGIN_MANIFEST = {
+    "commands": {"help": "help_ai"},
+    "callbacks": [{"pattern": "help_", "callback": "help_callback"}],
+}
@@ -0,0 +1,144 @@
+"""
+WENBNB Lexicon v1.0 — One-Pass Keyword Matcher for Topic / Tone / Sentiment
+──────────────────────────────────────────────────────────────────────────────
+• Plugins keep their own vocabularies and register them under a namespace:
+      lexicon.register("topic", TOP)    # {category: [words]}, order = priority
+• Every registered word compiles into ONE combined regex (a prefix-trie
+  alternation) with word boundaries — "ai" no longer fires inside "wait", "up" inside "support";
+  plain inflections (pump → pumps / pumped / pumping) still count
+• Each message is lower-cased and scanned once; the result (every category
+  hit in every namespace) is cached, so detect_topic, tone, sentiment and
+  the Hinglish check on the same text cost one scan between them
+• Emoji / symbol keywords (🔥 🚀 😭) match anywhere — no boundaries
+"""
+
+import re, threading
+from functools import lru_cache
+
+SUFFIXES = ("s", "es", "ed", "ing")   # inflections accepted after words of 3+ letters
+CACHE_SIZE = 1024
+
+# === STATE ===
+VOCABULARIES = {}    # namespace -> {category: [words]} in priority order
+_compiled = None     # (regex, {word: ((namespace, category), …)})
+_lock = threading.Lock()
+
+
+def log(msg):
+    print(f"[Lexicon] {msg}")
+
+
+# === REGISTRY ===
+def register(namespace, vocab):
+    """Add / replace a namespace. Safe to call again on plugin reload."""
+    global _compiled
+    vocab = {cat: [w.lower() for w in words] for cat, words in vocab.items()}
+    with _lock:
+        if VOCABULARIES.get(namespace) == vocab:
+            return
+        VOCABULARIES[namespace] = vocab
+        _compiled = None
+    scan.cache_clear()
+
+
+def _is_word(w):
+    return w[:1].isalnum() and w[-1:].isalnum()
+
+
+def _contains(outer, inner):
+    """Would `inner` match inside keyword `outer`? ("pump" in "pump it" / "pumped")"""
+    o, i = outer.split(), inner.split()
+    for start in range(len(o) - len(i) + 1):
+        head, last = o[start:start + len(i) - 1], o[start + len(i) - 1]
+        if head == i[:-1] and (last == i[-1] or len(i[-1]) >= 3 and last in [i[-1] + s for s in SUFFIXES]):
+            return True
+    return False
+
+
+def _trie(words):
+    """Alternation shaped as a prefix trie — the regex engine walks each word once
+    instead of retrying every keyword at every word start (≈2× faster than a flat a|b|c)."""
+    root = {}
+    for w in words:
+        node = root
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def pattern(node):
+        alts = [re.escape(ch) + pattern(sub) for ch, sub in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:%s)" % "|".join(alts)
+        return "(?:%s)?" % body if "" in node else body     # greedy: longest keyword first
+
+    return pattern(root)
+
+
+def _compile():
+    global _compiled
+    with _lock:
+        if _compiled is not None:
+            return _compiled
+        table = {}
+        for namespace, vocab in VOCABULARIES.items():
+            for cat, words in vocab.items():
+                for w in words:
+                    table.setdefault(w, []).append((namespace, cat))
+        # The regex reports one (longest) keyword per position — fold nested ones into it
+        for outer in table:
+            for inner in table:
+                if inner != outer and (_contains(outer, inner) if _is_word(inner) else inner in outer):
+                    table[outer] += [hit for hit in table[inner] if hit not in table[outer]]
+        # Longest match wins ("pump it" over "pump"); failed boundaries backtrack to shorter words
+        words = [w for w in table if _is_word(w)]
+        symbols = sorted((w for w in table if not _is_word(w)), key=len, reverse=True)
+        never = r"(?!x)x"
+        regex = re.compile(r"(?<!\w)(%s)(%s)?(?!\w)|(%s)" % (
+            _trie(words) or never,
+            "|".join(SUFFIXES),
+            "|".join(map(re.escape, symbols)) or never))
+        _compiled = (regex, {w: tuple(v) for w, v in table.items()})
+        log(f"🔤 Compiled {len(table)} keywords across {len(VOCABULARIES)} namespaces")
+        return _compiled
+
+
+# === MATCHING ===
+def match(text):
+    """Uncached scan: {namespace: frozenset(categories)} for every hit in `text`."""
+    regex, table = _compiled or _compile()
+    hits = {}
+    for m in regex.finditer((text or "").lower()):
+        word, suffix, symbol = m.groups()
+        if word is None:
+            word = symbol
+        elif suffix and len(word) < 3:
+            continue               # "ok" + "s" is not a hit for "ok"
+        for namespace, cat in table[word]:
+            hits.setdefault(namespace, set()).add(cat)
+    return {ns: frozenset(cats) for ns, cats in hits.items()}
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def scan(text):
+    """Cached match() — callers must treat the result as read-only."""
+    return match(text)
+
+
+def categories(namespace, text):
+    return scan(text).get(namespace, frozenset())
+
+
+def has(namespace, text, category=None):
+    cats = categories(namespace, text)
+    return category in cats if category else bool(cats)
+
+
+def first(namespace, text, default=None):
+    """Highest-priority category hit (vocabulary order), like the old if/elif chains."""
+    cats = categories(namespace, text)
+    if cats:
+        for cat in VOCABULARIES.get(namespace, ()):
+            if cat in cats:
+                return cat
+    return default
@@ -2,17 +2,18 @@
 WENBNB Maintenance Suite v8.1-Pro — Unified Self-Healing + Reboot Intelligence
 ───────────────────────────────────────────────────────────────────────────────
 Combines:
-• Full maintenance_core (telemetry, backup, S3 optional)
+• Full maintenance_core (telemetry, incremental snapshots, S3 optional)
 • Reboot monitor + uptime awareness
 • Integrated telemetry sync + admin DM alerts
 
 💫 Powered by WENBNB Neural Engine — Integrity, Resilience & Awareness 24×7 ⚡
 """
 
-import os, time, json, threading, zipfile, traceback, psutil, platform
+import os, json, traceback, psutil, platform
 from datetime import datetime
 from telegram import Update
-from telegram.ext import CallbackContext, CommandHandler
+from telegram.ext import CallbackContext
+from plugins import scheduler, metrics_sampler, backup_engine
 
 # === CONFIG ===
 ADMIN_IDS = [5698007588]      # ← your Telegram ID
@@ -64,7 +65,8 @@ def record_reboot_event(source="Render/Auto-Init"):
         os.makedirs(DATA_DIR, exist_ok=True)
         reboot_data = {
             "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "source": source
+            "source": source,
+            "pid": os.getpid()
         }
         with open(REBOOT_FILE, "w") as f:
             json.dump(reboot_data, f, indent=2)
@@ -89,31 +91,32 @@ def get_last_reboot():
 
 
 def uptime_watcher(bot):
-    """Background monitor that confirms uptime & logs if missing."""
-    while True:
-        try:
-            last = get_last_reboot()
-            if not last:
-                record_reboot_event("Initial Start")
-            else:
-                log(f"Heartbeat OK — last reboot at {last.get('timestamp')}")
-        except Exception as e:
-            log(f"[Uptime Watch Error] {e}")
-        time.sleep(UPTIME_CHECK_INTERVAL)
+    """Scheduled check that confirms uptime & logs if missing."""
+    try:
+        last = get_last_reboot()
+        if not last:
+            record_reboot_event("Initial Start")
+        else:
+            log(f"Heartbeat OK — last reboot at {last.get('timestamp')}")
+    except Exception as e:
+        log(f"[Uptime Watch Error] {e}")
 
 
 # === BACKUP ENGINE ===
+def ensure_snapshot():
+    """Daily report reuses auto_backup's snapshot when it is fresh — no second full copy."""
+    try:
+        return backup_engine.ensure_recent(CHECK_INTERVAL / 2, label="maintenance")
+    except Exception as e:
+        log(f"[Backup Error] {e}")
+        return None
+
+
 def create_backup_archive():
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    archive = os.path.join(BACKUP_DIR, f"WENBNB_Backup_{ts}.zip")
     try:
-        with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as z:
-            for folder in [LOGS_DIR, DATA_DIR]:
-                for root, _, files in os.walk(folder):
-                    for f in files:
-                        path = os.path.join(root, f)
-                        z.write(path, os.path.relpath(path, os.getcwd()))
-        log(f"💾 Created backup archive: {archive}")
+        snap = backup_engine.create_snapshot("manual")
+        archive = backup_engine.export_zip(snap["id"])
+        log(f"💾 Exported snapshot {snap['id']}: {archive}")
         return archive
     except Exception as e:
         log(f"[Backup Error] {e}")
@@ -123,9 +126,13 @@ def create_backup_archive():
 # === SYSTEM HEALTH REPORT ===
 def system_health_report():
     try:
+        m = metrics_sampler.summary(CHECK_INTERVAL)
+        last = metrics_sampler.latest()
         return {
-            "cpu": psutil.cpu_percent(interval=1),
-            "ram": psutil.virtual_memory().percent,
+            "cpu": round(last["cpu"], 1),
+            "cpu_p95": m.get("cpu", {}).get("p95"),
+            "ram": round(last["ram"], 1),
+            "rss_mb": round(last["rss_mb"], 1),
             "disk": psutil.disk_usage('/').percent,
             "platform": f"{platform.system()} {platform.release()}"
         }
@@ -133,33 +140,33 @@ def system_health_report():
         return {"error": str(e)}
 
 
-# === MAIN MAINTENANCE THREAD ===
+# === MAIN MAINTENANCE TASK ===
 def maintenance_daemon(bot):
-    while True:
-        try:
-            health = system_health_report()
-            record_telemetry("system_health", health)
-            archive = create_backup_archive()
-
-            msg = (
-                "🧠 <b>Maintenance Report</b>\n"
-                f"💾 Backup: {os.path.basename(archive) if archive else 'failed'}\n"
-                f"💻 CPU: {health.get('cpu', '?')}%\n"
-                f"📈 RAM: {health.get('ram', '?')}%\n"
-                f"💿 Disk: {health.get('disk', '?')}%\n"
-                f"⚙️ Platform: {health.get('platform', '?')}\n\n"
-                f"{BRAND_TAG}"
-            )
-
-            for admin in ADMIN_IDS:
-                bot.send_message(admin, msg, parse_mode="HTML")
+    try:
+        health = system_health_report()
+        record_telemetry("system_health", health)
+        snap = ensure_snapshot()
+
+        msg = (
+            "🧠 <b>Maintenance Report</b>\n"
+            f"💾 Backup: {snap['id'] if snap else 'failed'}\n"
+            f"💻 CPU: {health.get('cpu', '?')}%\n"
+            f"📈 RAM: {health.get('ram', '?')}%\n"
+            f"💿 Disk: {health.get('disk', '?')}%\n"
+            f"⚙️ Platform: {health.get('platform', '?')}\n\n"
+            f"{BRAND_TAG}"
+        )
+
+        for admin in ADMIN_IDS:
+            bot.send_message(admin, msg, parse_mode="HTML")
 
-        except Exception as e:
-            for admin in ADMIN_IDS:
+    except Exception as e:
+        log(f"[Maintenance Error] {traceback.format_exc()}")
+        for admin in ADMIN_IDS:
+            try:
                 bot.send_message(admin, f"⚠️ Maintenance Error: <code>{e}</code>", parse_mode="HTML")
-            log(f"[Maintenance Error] {traceback.format_exc()}")
-
-        time.sleep(CHECK_INTERVAL)
+            except Exception:
+                pass
 
 
 # === COMMANDS ===
@@ -206,14 +213,12 @@ def reboot_status(update: Update, context: CallbackContext):
     update.message.reply_text(msg, parse_mode="HTML")
 
 
-# === REGISTER HANDLERS ===
-def register_handlers(dp):
-    dp.add_handler(CommandHandler("backup", backup_now))
-    dp.add_handler(CommandHandler("telemetry", telemetry_report))
-    dp.add_handler(CommandHandler("rebootlog", reboot_status))
-
-    record = record_reboot_event("Render/Auto-Init")
-    for admin in ADMIN_IDS:
+# === STARTUP (reboot notice + daemons) ===
+def start_maintenance(dp):
+    # A hot reload re-runs this hook — only a new process counts as a reboot
+    last = get_last_reboot() or {}
+    record = None if last.get("pid") == os.getpid() else record_reboot_event("Render/Auto-Init")
+    for admin in (ADMIN_IDS if record else []):
         try:
             dp.bot.send_message(
                 admin,
@@ -226,6 +231,18 @@ def register_handlers(dp):
         except Exception as e:
             log(f"[Admin Notify Error] {e}")
 
-    threading.Thread(target=uptime_watcher, args=(dp.bot,), daemon=True).start()
-    threading.Thread(target=maintenance_daemon, args=(dp.bot,), daemon=True).start()
+    scheduler.every("maintenance_pro.uptime", uptime_watcher, UPTIME_CHECK_INTERVAL, first=0,
+                    args=(dp.bot,), owner="maintenance_pro")
+    scheduler.every("maintenance_pro.daily", maintenance_daemon, CHECK_INTERVAL, first=0,
+                    args=(dp.bot,), owner="maintenance_pro")
     log("💎 Maintenance Suite v8.1-Pro initialized — telemetry + reboot sync active.")
+
+
+PLUGIN_MANIFEST = {
+    "commands": {
+        "backup": "backup_now",
+        "telemetry": "telemetry_report",
+        "rebootlog": "reboot_status",
+    },
+    "setup": "start_maintenance",
+}
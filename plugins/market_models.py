@@ -0,0 +1,97 @@
+"""
+WENBNB Market Models v1.0 — Compact Pair Quote Shared by Market Plugins
+──────────────────────────────────────────────────────────────────────────────
+• PairQuote: one DexScreener pair as a __slots__ object with typed fields
+  (floats for price / liquidity / volume, ints for txns / timestamps)
+• Parsed once where the response enters the bot (token_resolver) — the
+  raw nested dict is dropped right after, so a cached quote holds about a
+  third of the memory (less still vs. real responses with socials /
+  priceChange blocks) and no plugin digs through pair["baseToken"]["symbol"]
+• tokeninfo, price_tracker and airdrop_sentinel all format from it
+
+    q = PairQuote.parse(pair)
+    q.symbol, q.price, q.liquidity, q.chain_label, q.age_days
+"""
+
+import time
+
+CHAIN_LABELS = {"bsc": "BSC", "ethereum": "Ethereum", "base": "Base", "arbitrum": "Arbitrum",
+                "solana": "Solana", "polygon": "Polygon"}
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class PairQuote:
+    """One DEX pair. price is None when DexScreener has no USD price for it."""
+
+    __slots__ = ("chain", "dex", "pair_address", "url", "contract", "symbol", "name",
+                 "quote_symbol", "price", "liquidity", "volume24", "buys24", "sells24",
+                 "created_ms", "fetched")
+
+    def __init__(self, chain="", dex="", pair_address="", url="", contract="", symbol="", name="",
+                 quote_symbol="", price=None, liquidity=0.0, volume24=0.0, buys24=0, sells24=0,
+                 created_ms=0, fetched=None):
+        self.chain = chain
+        self.dex = dex
+        self.pair_address = pair_address
+        self.url = url
+        self.contract = contract
+        self.symbol = symbol
+        self.name = name
+        self.quote_symbol = quote_symbol
+        self.price = price
+        self.liquidity = liquidity
+        self.volume24 = volume24
+        self.buys24 = buys24
+        self.sells24 = sells24
+        self.created_ms = created_ms
+        self.fetched = fetched if fetched is not None else time.time()
+
+    @classmethod
+    def parse(cls, pair):
+        base = pair.get("baseToken") or {}
+        txns = (pair.get("txns") or {}).get("h24") or {}
+        return cls(
+            chain=(pair.get("chainId") or "").lower(),
+            dex=pair.get("dexId") or "",
+            pair_address=pair.get("pairAddress") or "",
+            url=pair.get("url") or "",
+            contract=(base.get("address") or "").lower(),
+            symbol=base.get("symbol") or "",
+            name=base.get("name") or base.get("symbol") or "",
+            quote_symbol=(pair.get("quoteToken") or {}).get("symbol") or "",
+            price=_float(pair.get("priceUsd")),
+            liquidity=_float((pair.get("liquidity") or {}).get("usd")) or 0.0,
+            volume24=_float((pair.get("volume") or {}).get("h24")) or 0.0,
+            buys24=int(_float(txns.get("buys")) or 0),
+            sells24=int(_float(txns.get("sells")) or 0),
+            created_ms=int(_float(pair.get("pairCreatedAt")) or 0),
+        )
+
+    @property
+    def chain_label(self):
+        return CHAIN_LABELS.get(self.chain, self.chain.capitalize() or "Unknown")
+
+    @property
+    def dex_label(self):
+        return self.dex.capitalize() or "DEX"
+
+    @property
+    def age_days(self):
+        return (time.time() * 1000 - self.created_ms) / 86_400_000 if self.created_ms else 0.0
+
+    @property
+    def age(self):
+        """Seconds since this quote was fetched."""
+        return time.time() - self.fetched
+
+    def to_dict(self):
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    def __repr__(self):
+        return f"PairQuote({self.symbol} {self.price} on {self.chain}/{self.dex})"
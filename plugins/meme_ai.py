@@ -1,5 +1,4 @@
 from telegram import ParseMode
-from telegram.ext import CommandHandler
 import random, html
 
 # === WENBNB Meme Engine v8.7 ===
@@ -51,6 +50,6 @@ def meme_cmd(update, context):
             parse_mode=ParseMode.HTML
         )
 
-def register(dispatcher, core=None):
-    dispatcher.add_handler(CommandHandler("meme", meme_cmd))
-    print("✅ Loaded plugin: plugins.meme_ai (v8.7 Meme Drop Mode)")
+PLUGIN_MANIFEST = {
+    "commands": {"meme": "meme_cmd"},
+}
@@ -12,9 +12,9 @@ import os
 import json
 import time
 from datetime import datetime, timedelta
-from textblob import TextBlob
 from telegram import Update
-from telegram.ext import CommandHandler, CallbackContext
+from telegram.ext import CallbackContext
+from plugins import lexicon, perf_trace, sentiment
 
 # === Files ===
 MEMORY_FILE = "user_memory.json"
@@ -26,6 +26,7 @@ BRAND_TAG = "🚀 Powered by WENBNB Neural Engine — Emotional Intelligence 24
 # ============================================================
 #                     JSON helpers
 # ============================================================
+@perf_trace.traced("io")
 def _load_json(path, default=None):
     if not os.path.exists(path):
         return default or {}
@@ -35,6 +36,7 @@ def _load_json(path, default=None):
     except Exception:
         return default or {}
 
+@perf_trace.traced("io")
 def _save_json(path, data):
     try:
         with open(path, "w", encoding="utf-8") as f:
@@ -53,18 +55,10 @@ def save_memory(data):
 # ============================================================
 def analyze_emotion(text: str) -> str:
     """
-    Very simple polarity→mood mapping using TextBlob.
+    Very simple polarity→mood mapping (plugins/sentiment, cached per text).
     Positive > 0.3, Negative < -0.3, otherwise Balanced.
     """
-    try:
-        p = TextBlob(text).sentiment.polarity
-    except Exception:
-        p = 0.0
-    if p > 0.3:
-        return "Positive"
-    if p < -0.3:
-        return "Negative"
-    return "Balanced"
+    return sentiment.mood(text, 0.3, -0.3, ("Positive", "Negative", "Balanced"))
 
 # ============================================================
 #                External emotion merge (optional)
@@ -134,12 +128,10 @@ TOPIC_KEYS = {
     "fun": ["meme","joke","haha","lol","funny"],
     "travel": ["travel","trip","itinerary","flight","hotel","visa"]
 }
+lexicon.register("memory_topic", TOPIC_KEYS)
+
 def _guess_topic(text: str) -> str:
-    t = (text or "").lower()
-    for k, vocab in TOPIC_KEYS.items():
-        if any(word in t for word in vocab):
-            return k
-    return "general"
+    return lexicon.first("memory_topic", text or "", "general")
 
 # ============================================================
 #                 Entry cleanup (48 hours)
@@ -277,8 +269,10 @@ def reset_memory(update: Update, context: CallbackContext):
 # ============================================================
 #                    Register Handlers
 # ============================================================
-def register_handlers(dp):
-    dp.add_handler(CommandHandler("aianalyze", aianalyze))
-    dp.add_handler(CommandHandler("memory", show_memory))
-    dp.add_handler(CommandHandler("forget", reset_memory))
-    print("✅ Loaded plugin: memory_engine v9.1 (Pure Continuity Core)")
+PLUGIN_MANIFEST = {
+    "commands": {
+        "aianalyze": "aianalyze",
+        "memory": "show_memory",
+        "forget": "reset_memory",
+    },
+}
@@ -1,9 +1,14 @@
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
-from telegram.ext import CommandHandler, CallbackQueryHandler, CallbackContext
+from telegram.ext import CallbackContext
 
-def register(dispatcher, core=None):
-    dispatcher.add_handler(CommandHandler("menu", main_menu))
-    dispatcher.add_handler(CallbackQueryHandler(menu_callback))
+# Callback pattern covers only this menu's buttons (help_/verify_ belong to other plugins)
+PLUGIN_MANIFEST = {
+    "commands": {"menu": "main_menu"},
+    "callbacks": [{
+        "pattern": "^(price|tokeninfo|meme|aianalyze|airdropcheck|about)$",
+        "callback": "menu_callback",
+    }],
+}
 
 def main_menu(update: Update, context: CallbackContext):
     keyboard = [
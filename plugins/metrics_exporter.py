@@ -0,0 +1,225 @@
+"""
+WENBNB Metrics Exporter v1.0 — Live Bot Metrics → Dashboard
+──────────────────────────────────────────────────────────────────────────────
+• In-process counters, gauges and fixed-bucket latency histograms
+• Updates per second (by type), per-handler latency, LLM latency + tokens,
+  cache hit/miss, update-queue / scheduler depths, users seen in the last
+  ACTIVE_WINDOW seconds
+• Every PUSH_INTERVAL seconds a compact delta (only series that changed)
+  goes to the dashboard's POST /update_status; the dashboard folds the
+  deltas and serves them at GET /metrics in Prometheus text format
+
+    metrics_exporter.inc("cache_requests", cache="price", result="hit")
+    with metrics_exporter.timer("handler_ms", handler="price_tracker.price"):
+        ...
+"""
+
+import os, threading, time, uuid
+from contextlib import contextmanager
+import requests
+
+from plugins import scheduler
+
+DASHBOARD_URL = os.getenv("DASHBOARD_URL", "http://127.0.0.1:10000").rstrip("/")
+DASHBOARD_KEY = os.getenv("DASHBOARD_KEY", "")
+PUSH_INTERVAL = int(os.getenv("METRICS_PUSH_INTERVAL", "15"))   # seconds
+METRICS_GROUP = -100   # dispatcher group that sees every update first
+ACTIVE_WINDOW = int(os.getenv("METRICS_ACTIVE_SECONDS", "900"))  # "active user" = an update this recent
+
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+BOOT_ID = uuid.uuid4().hex[:12]   # lets the dashboard detect a bot restart
+STARTED = time.time()
+
+# === REGISTRY ===
+COUNTERS = {}     # (name, labels) -> float
+HISTOGRAMS = {}   # (name, labels) -> [bucket counts…, +Inf count, sum]
+GAUGES = {}       # (name, labels) -> callable returning a number
+USERS = {}        # user id -> last update time (pruned past ACTIVE_WINDOW on each push)
+_lock = threading.Lock()
+_pushed = {"counters": {}, "histograms": {}, "at": None}
+_push_failing = False
+
+
+def log(msg):
+    print(f"[MetricsExporter] {msg}")
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def inc(name, n=1, **labels):
+    k = _key(name, labels)
+    with _lock:
+        COUNTERS[k] = COUNTERS.get(k, 0) + n
+
+
+def observe(name, value, **labels):
+    k = _key(name, labels)
+    with _lock:
+        h = HISTOGRAMS.get(k)
+        if h is None:
+            h = HISTOGRAMS[k] = [0] * (len(BUCKETS_MS) + 2)
+        for i, bound in enumerate(BUCKETS_MS):
+            if value <= bound:
+                h[i] += 1
+                break
+        else:
+            h[len(BUCKETS_MS)] += 1
+        h[-1] += value
+
+
+def gauge(name, fn, **labels):
+    """Register a callable sampled at every push (queue depths etc.)."""
+    GAUGES[_key(name, labels)] = fn
+
+
+@contextmanager
+def timer(name, **labels):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, (time.perf_counter() - started) * 1000, **labels)
+
+
+def record_llm(source, started, response=None, error=None):
+    """One LLM round trip: latency, token usage from the OpenAI-style `usage` block, errors."""
+    observe("llm_latency_ms", (time.time() - started) * 1000, source=source)
+    usage = (response or {}).get("usage") if isinstance(response, dict) else None
+    if usage:
+        inc("llm_tokens", usage.get("prompt_tokens", 0), source=source, kind="prompt")
+        inc("llm_tokens", usage.get("completion_tokens", 0), source=source, kind="completion")
+    if error or not response or "error" in response:
+        inc("llm_errors", source=source)
+
+
+def cache_hit(cache, hit):
+    inc("cache_requests", cache=cache, result="hit" if hit else "miss")
+
+
+def percentile(name, q, **labels):
+    """Approximate percentile (bucket upper bound) of a histogram series."""
+    h = HISTOGRAMS.get(_key(name, labels))
+    if not h:
+        return None
+    total = sum(h[:-1])
+    if not total:
+        return None
+    rank, seen = total * q / 100.0, 0
+    for i, count in enumerate(h[:-1]):
+        seen += count
+        if seen >= rank:
+            return BUCKETS_MS[i] if i < len(BUCKETS_MS) else float("inf")
+    return float("inf")
+
+
+# === DISPATCHER HOOK ===
+def count_update(update, context):
+    if update.message and update.message.text and update.message.text.startswith("/"):
+        kind = "command"
+    elif update.message:
+        kind = "message"
+    elif update.callback_query:
+        kind = "callback"
+    else:
+        kind = "other"
+    inc("updates", type=kind)
+    if update.effective_user:
+        with _lock:
+            USERS[update.effective_user.id] = time.time()
+
+
+def active_users():
+    """Users seen within ACTIVE_WINDOW; forgets the rest so USERS stays bounded."""
+    cutoff = time.time() - ACTIVE_WINDOW
+    with _lock:
+        for uid in [u for u, seen in USERS.items() if seen < cutoff]:
+            del USERS[uid]
+        return len(USERS)
+
+
+def install(dispatcher):
+    """Count every update in a group ahead of all handlers; register queue gauges."""
+    from telegram import Update
+    from telegram.ext import TypeHandler
+    if not any(isinstance(h, TypeHandler) and h.callback is count_update
+               for h in dispatcher.handlers.get(METRICS_GROUP, [])):
+        dispatcher.add_handler(TypeHandler(Update, count_update), group=METRICS_GROUP)
+    gauge("queue_depth", lambda: dispatcher.update_queue.qsize(), queue="updates")
+    gauge("queue_depth", lambda: len(scheduler.TASKS), queue="scheduler_tasks")
+    gauge("scheduler_lag_ms", lambda: scheduler.STATS.get("lag_ms", 0.0))
+    gauge("active_users", active_users)
+
+
+def start():
+    if "metrics_exporter.push" not in scheduler.TASKS:
+        scheduler.every("metrics_exporter.push", push, PUSH_INTERVAL, owner="metrics_exporter")
+        log(f"📡 Pushing metrics to {DASHBOARD_URL} every {PUSH_INTERVAL}s")
+
+
+# === EXPORT ===
+def delta(full=False):
+    """Series changed since the last push (everything when full=True)."""
+    with _lock:
+        counters = dict(COUNTERS)
+        histograms = {k: list(v) for k, v in HISTOGRAMS.items()}
+    prev_c = {} if full else _pushed["counters"]
+    prev_h = {} if full else _pushed["histograms"]
+    out = {"c": [], "h": [], "g": []}
+    for k, v in counters.items():
+        d = v - prev_c.get(k, 0)
+        if d:
+            out["c"].append([k[0], dict(k[1]), d])
+    for k, v in histograms.items():
+        p = prev_h.get(k)
+        d = v if p is None else [a - b for a, b in zip(v, p)]
+        if any(d[:-1]):
+            out["h"].append([k[0], dict(k[1]), d])
+    for k, fn in list(GAUGES.items()):
+        try:
+            out["g"].append([k[0], dict(k[1]), float(fn())])
+        except Exception:
+            pass
+    return out, counters, histograms
+
+
+def _rate(series, counters, elapsed):
+    total = sum(v for k, v in counters.items() if k[0] == series)
+    before = sum(v for k, v in _pushed["counters"].items() if k[0] == series)
+    return round((total - before) / elapsed, 3) if elapsed else 0.0
+
+
+def push(full=False):
+    """POST the delta to the dashboard; resend everything if it asks for a resync."""
+    global _push_failing
+    now = time.time()
+    metrics, counters, histograms = delta(full)
+    elapsed = now - (_pushed["at"] or STARTED)
+    payload = {
+        "status": "online",
+        "uptime": f"{int(now - STARTED)}s",
+        "users": active_users(),
+        "boot": BOOT_ID,
+        "full": full or _pushed["at"] is None,
+        "buckets": BUCKETS_MS,
+        "rates": {"updates_per_sec": _rate("updates", counters, elapsed)},
+        "metrics": metrics,
+    }
+    headers = {"Authorization": f"Bearer {DASHBOARD_KEY}"} if DASHBOARD_KEY else {}
+    try:
+        r = requests.post(f"{DASHBOARD_URL}/update_status", json=payload, headers=headers, timeout=5)
+        r.raise_for_status()
+        reply = r.json()
+    except Exception as e:
+        if not _push_failing:
+            log(f"⚠️ Push failed ({e}) — will keep retrying quietly")
+        _push_failing = True
+        return False
+    if _push_failing:
+        log("✅ Push recovered")
+    _push_failing = False
+    _pushed.update(counters=counters, histograms=histograms, at=now)
+    if reply.get("resync") and not full:
+        return push(full=True)
+    return True
@@ -0,0 +1,164 @@
+"""
+WENBNB Metrics Sampler v1.0 — Non-Blocking System Telemetry
+──────────────────────────────────────────────────────────────────────────────
+• One scheduler task samples every SAMPLE_INTERVAL seconds
+• CPU uses psutil's non-blocking deltas (interval=None) — no 1s stalls
+• Records CPU (system + process), RAM, RSS, threads, open FDs and
+  scheduler lag into a fixed-size NumPy ring buffer
+• Percentile / trend queries for /status, /ai_status, /admin
+• Snapshot for the dashboard → data/system_metrics.json
+"""
+
+import json, os, threading, time
+import numpy as np
+import psutil
+
+from plugins import scheduler
+
+SAMPLE_INTERVAL = int(os.getenv("METRICS_INTERVAL", "5"))     # seconds
+CAPACITY = int(os.getenv("METRICS_HISTORY", "720"))           # 1h at 5s
+SNAPSHOT_FILE = "data/system_metrics.json"
+SNAPSHOT_EVERY = 6                                            # samples
+
+FIELDS = ("ts", "cpu", "proc_cpu", "ram", "rss_mb", "threads", "fds", "lag_ms")
+COL = {name: i for i, name in enumerate(FIELDS)}
+
+# === RING BUFFER ===
+_buf = np.zeros((CAPACITY, len(FIELDS)), dtype=np.float64)
+_head = 0        # next write slot
+_count = 0
+_lock = threading.Lock()
+_proc = psutil.Process()
+
+
+def log(msg):
+    print(f"[MetricsSampler] {msg}")
+
+
+def _open_fds():
+    try:
+        return _proc.num_fds()
+    except AttributeError:  # Windows
+        return _proc.num_handles()
+    except Exception:
+        return 0
+
+
+def sample():
+    """Take one sample (non-blocking) and append it to the ring buffer."""
+    global _head, _count
+    with _proc.oneshot():
+        row = (
+            time.time(),
+            psutil.cpu_percent(interval=None),
+            _proc.cpu_percent(interval=None),
+            psutil.virtual_memory().percent,
+            _proc.memory_info().rss / 1048576,
+            _proc.num_threads(),
+            _open_fds(),
+            scheduler.STATS.get("lag_ms", 0.0),
+        )
+    with _lock:
+        _buf[_head] = row
+        _head = (_head + 1) % CAPACITY
+        _count = min(_count + 1, CAPACITY)
+        n = _count
+    if n % SNAPSHOT_EVERY == 0:
+        write_snapshot()
+    return dict(zip(FIELDS, row))
+
+
+def start():
+    """Prime the CPU counters and schedule sampling (idempotent)."""
+    if "metrics_sampler.sample" in scheduler.TASKS:
+        return
+    psutil.cpu_percent(interval=None)   # first call only sets the baseline
+    _proc.cpu_percent(interval=None)
+    scheduler.every("metrics_sampler.sample", sample, SAMPLE_INTERVAL,
+                    first=SAMPLE_INTERVAL, owner="metrics_sampler")
+    log(f"📈 Sampling every {SAMPLE_INTERVAL}s ({CAPACITY} points kept)")
+
+
+# === QUERIES ===
+def history(window=None):
+    """Rows in time order, optionally only the last `window` seconds."""
+    with _lock:
+        if _count < CAPACITY:
+            rows = _buf[:_count].copy()
+        else:
+            rows = np.concatenate((_buf[_head:], _buf[:_head]))
+    if window and len(rows):
+        rows = rows[rows[:, 0] >= time.time() - window]
+    return rows
+
+
+def latest():
+    """Most recent sample; takes one now if the buffer is still empty."""
+    with _lock:
+        if _count:
+            return dict(zip(FIELDS, _buf[(_head - 1) % CAPACITY].tolist()))
+    return sample()
+
+
+def percentile(field, q, window=None):
+    rows = history(window)
+    if not len(rows):
+        return None
+    return float(np.percentile(rows[:, COL[field]], q))
+
+
+def trend(field, window=900):
+    """Least-squares slope of `field` per minute over the window (None if < 3 points)."""
+    rows = history(window)
+    if len(rows) < 3:
+        return None
+    t = (rows[:, 0] - rows[0, 0]) / 60.0
+    if not t[-1]:
+        return None
+    return float(np.polyfit(t, rows[:, COL[field]], 1)[0])
+
+
+def summary(window=900):
+    """{field: {"last", "p50", "p95", "max", "trend"}} for every metric."""
+    rows = history(window)
+    out = {"window": window, "samples": int(len(rows))}
+    if not len(rows):
+        return out
+    values = rows[:, 1:]
+    p50, p95 = np.percentile(values, [50, 95], axis=0)
+    peak = values.max(axis=0)
+    t = (rows[:, 0] - rows[0, 0]) / 60.0
+    slopes = np.polyfit(t, values, 1)[0] if len(rows) >= 3 and t[-1] else None
+    for i, field in enumerate(FIELDS[1:]):
+        out[field] = {
+            "last": round(float(values[-1, i]), 2),
+            "p50": round(float(p50[i]), 2),
+            "p95": round(float(p95[i]), 2),
+            "max": round(float(peak[i]), 2),
+            "trend": None if slopes is None else round(float(slopes[i]), 3),
+        }
+    return out
+
+
+def trend_arrow(slope, flat=0.05):
+    if slope is None or abs(slope) < flat:
+        return "→"
+    return "↗" if slope > 0 else "↘"
+
+
+def write_snapshot(path=SNAPSHOT_FILE):
+    """Compact summary + recent series for the dashboard process."""
+    try:
+        rows = history(900)
+        data = {
+            "updated": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "summary": summary(900),
+            "series": {f: np.round(rows[:, COL[f]], 2).tolist() for f in FIELDS},
+        }
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+    except Exception as e:
+        log(f"⚠️ Snapshot failed: {e}")
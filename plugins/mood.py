@@ -10,7 +10,7 @@ Purpose:
 import json, os, random
 from datetime import datetime
 from telegram import Update
-from telegram.ext import CommandHandler, CallbackContext
+from telegram.ext import CallbackContext
 from plugins.emotion_sync import get_emotion_prefix
 from plugins.emotion_stabilizer import get_stabilized_emotion
 
@@ -75,5 +75,6 @@ def mood_cmd(update: Update, context: CallbackContext):
 
     update.message.reply_text(msg, parse_mode="HTML")
 
-def register_handlers(dp):
-    dp.add_handler(CommandHandler("mood", mood_cmd))
+PLUGIN_MANIFEST = {
+    "commands": {"mood": "mood_cmd"},
+}
@@ -1,20 +1,20 @@
 """
 WENBNB Neural Chat Core v8.6-ProStable
 Unified REST AI + Emotion Sync Integration
-Default AI Mode ON + /ai_mode toggle + /ai_status monitor
+/ai_status monitor — chat replies themselves belong to the registry's
+"reply" stage owner (ai_auto_reply), shown in the status
 """
 
-import os, time, datetime, psutil, requests
+import os, time, datetime, requests
 from telegram import Update
-from telegram.ext import MessageHandler, Filters, CommandHandler, CallbackContext
+from telegram.ext import CallbackContext
+from plugins import lexicon, metrics_sampler, metrics_exporter, plugin_registry
 
 # === API & Config ===
 AI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 AI_MODEL = "gpt-4o-mini"
 
 BRAND_TAG = "🚀 Powered by WENBNB Neural Engine — Emotional Intelligence 24×7"
-AI_MODE = True
-ADMIN_IDS = [123456789]  # 🔧 replace with your Telegram ID
 conversation_memory = {}
 last_emotion = "neutral"
 start_time = datetime.datetime.now()
@@ -22,6 +22,7 @@ start_time = datetime.datetime.now()
 # === Helper: AI Generate ===
 def ai_generate(prompt, emotion_hint=None):
     """Universal AI call via REST (no SDK dependency)"""
+    started = time.time()
     try:
         prefix = (
             "You are WENBNB AI — an emotionally intelligent, crypto-aware assistant. "
@@ -45,23 +46,23 @@ def ai_generate(prompt, emotion_hint=None):
         )
 
         res = r.json()
+        metrics_exporter.record_llm("neural_chat_core", started, res)
         return res.get("choices", [{}])[0].get("message", {}).get("content", "⚡ Neural silence detected.")
     except Exception as e:
+        metrics_exporter.record_llm("neural_chat_core", started, error=True)
         return f"⚠️ Neural Core Error: {str(e)}"
 
 # === Emotion Detection (Light heuristic) ===
+EMOTION_WORDS = {   # checked in order — first hit wins
+    "happy": ["happy", "great", "love", "awesome", "amazing", "excited"],
+    "sad": ["sad", "bad", "depressed", "down", "tired"],
+    "angry": ["angry", "mad", "furious", "rage"],
+    "calm": ["calm", "peaceful", "okay", "fine"],
+}
+lexicon.register("emotion", EMOTION_WORDS)
+
 def detect_emotion(message):
-    msg = message.lower()
-    if any(x in msg for x in ["happy", "great", "love", "awesome", "amazing", "excited"]):
-        return "happy"
-    elif any(x in msg for x in ["sad", "bad", "depressed", "down", "tired"]):
-        return "sad"
-    elif any(x in msg for x in ["angry", "mad", "furious", "rage"]):
-        return "angry"
-    elif any(x in msg for x in ["calm", "peaceful", "okay", "fine"]):
-        return "calm"
-    else:
-        return "neutral"
+    return lexicon.first("emotion", message, "neutral")
 
 # === Generate Reply ===
 def generate_neural_reply(user_id, message):
@@ -86,66 +87,29 @@ def generate_neural_reply(user_id, message):
 
     return f"{emotion_icon} {ai_text}\n\n{BRAND_TAG}"
 
-# === Chat Handler ===
-def neural_chat_handler(update: Update, context: CallbackContext):
-    global AI_MODE
-    if not AI_MODE:
-        return
-
-    message = update.message.text.strip()
-    if message.startswith("/"):
-        return
-
-    user_id = update.effective_user.id
-    update.message.chat.send_action("typing")
-    time.sleep(1.2)
-
-    ai_reply = generate_neural_reply(user_id, message)
-    update.message.reply_text(ai_reply, parse_mode="HTML")
-
-# === Toggle Command ===
-def toggle_ai_mode(update: Update, context: CallbackContext):
-    global AI_MODE
-    user_id = update.effective_user.id
-    if user_id not in ADMIN_IDS:
-        update.message.reply_text("🚫 Only admin can toggle AI mode.")
-        return
-
-    args = context.args
-    if not args:
-        update.message.reply_text(f"🧠 AI Mode: {'ON ✅' if AI_MODE else 'OFF ❌'}")
-        return
-
-    if args[0].lower() == "on":
-        AI_MODE = True
-        update.message.reply_text("🔥 Neural Core activated.\n" + BRAND_TAG)
-    elif args[0].lower() == "off":
-        AI_MODE = False
-        update.message.reply_text("🧊 Neural Core paused. Command mode only.")
-    else:
-        update.message.reply_text("⚙️ Usage: /ai_mode on OR /ai_mode off")
-
 # === Status Command ===
 def ai_status(update: Update, context: CallbackContext):
     uptime = datetime.datetime.now() - start_time
-    mem_usage = sum(len(v) for v in conversation_memory.values())
-    cpu_usage = psutil.cpu_percent()
-    ram_usage = psutil.virtual_memory().percent
+    replier = plugin_registry.STAGE_OWNERS.get("reply", "none")
+    m = metrics_sampler.summary(900)
+    if m["samples"]:
+        load = (f"CPU {m['cpu']['last']:.0f}% (p95 {m['cpu']['p95']:.0f}%) | "
+                f"RAM {m['ram']['last']:.0f}% | RSS {m['rss_mb']['last']:.0f} MB")
+    else:
+        last = metrics_sampler.latest()
+        load = f"CPU {last['cpu']:.0f}% | RAM {last['ram']:.0f}%"
 
     status_msg = (
         "🧠 <b>WENBNB Neural Status</b>\n\n"
-        f"⚙️ Mode: {'<b>Active ✅</b>' if AI_MODE else '<b>Paused ❌</b>'}\n"
-        f"💫 Last Emotion: <b>{last_emotion}</b>\n"
-        f"📊 Memory Context: <b>{mem_usage} chars</b>\n"
+        f"💬 Chat Replies: <b>{replier}</b>\n"
         f"🕒 Uptime: <b>{str(uptime).split('.')[0]}</b>\n"
-        f"🧩 System Load: <b>CPU {cpu_usage}% | RAM {ram_usage}%</b>\n\n"
+        f"🧩 System Load: <b>{load}</b>\n\n"
         f"{BRAND_TAG}"
     )
 
     update.message.reply_text(status_msg, parse_mode="HTML")
 
 # === Register Handler ===
-def register_handlers(dp):
-    dp.add_handler(MessageHandler(Filters.text & ~Filters.command, neural_chat_handler))
-    dp.add_handler(CommandHandler("ai_mode", toggle_ai_mode))
-    dp.add_handler(CommandHandler("ai_status", ai_status))
+PLUGIN_MANIFEST = {
+    "commands": {"ai_status": "ai_status"},
+}
@@ -0,0 +1,107 @@
+"""
+WENBNB Pair Ranker v1.0 — Vectorised Best-Pair Selection for DexScreener
+──────────────────────────────────────────────────────────────────────────────
+• A DexScreener answer can hold dozens of pairs across chains and DEXes;
+  pairs[0] is often a thin pool with a bad price
+• Every pair's liquidity, 24h volume, 24h txns, age and chain are loaded
+  into NumPy arrays and scored in one pass:
+      score = Σ weight × feature   (log-scaled, saturating at FULL)
+  pools under MIN_LIQUIDITY or without a price are pushed to the bottom
+• Weights are configurable (WEIGHTS, or PAIR_WEIGHTS="liquidity=0.5,…")
+• best() / top() are shared by tokeninfo, price_tracker and
+  airdrop_sentinel through token_resolver.find_pair
+
+    pair_ranker.best(pairs, chain="bsc")
+    pair_ranker.top(pairs, 3)
+"""
+
+import os, time
+import numpy as np
+
+WEIGHTS = {"liquidity": 0.45, "volume": 0.25, "txns": 0.15, "age": 0.10, "chain": 0.05}
+for _kv in filter(None, os.getenv("PAIR_WEIGHTS", "").split(",")):
+    _k, _, _v = _kv.partition("=")
+    if _k.strip() in WEIGHTS:
+        WEIGHTS[_k.strip()] = float(_v)
+
+FULL = {"liquidity": 7.0, "volume": 7.0, "txns": 4.0}   # log10 value that scores 1.0 ($10M, 10k txns)
+FULL_AGE_DAYS = 30
+MIN_LIQUIDITY = 1000          # USD — below this a pool is a trap, whatever its volume
+CHAIN_SCORE = {"bsc": 1.0, "ethereum": 0.8, "base": 0.7, "arbitrum": 0.7, "solana": 0.6}
+OTHER_CHAIN = 0.5
+PENALTY = -10.0
+
+
+def _num(value):
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+_EMPTY = {}
+
+
+def _raw(pairs):
+    """One inline pass pulling the raw fields out of the dicts — no per-pair calls;
+    NumPy parses the numeric strings ("0.0042") when building the array."""
+    e = _EMPTY
+    rows = [((p.get("liquidity") or e).get("usd") or 0, (p.get("volume") or e).get("h24") or 0,
+             ((p.get("txns") or e).get("h24") or e).get("buys") or 0,
+             ((p.get("txns") or e).get("h24") or e).get("sells") or 0,
+             p.get("pairCreatedAt") or 0, p.get("priceUsd") or 0) for p in pairs]
+    try:
+        return np.array(rows, dtype=float)
+    except (TypeError, ValueError):           # a malformed field somewhere — slow, safe path
+        return np.array([[_num(v) for v in row] for row in rows])
+
+
+def features(pairs, chain=None):
+    """(n × 5) feature matrix + (n,) validity mask, column order as WEIGHTS."""
+    raw = _raw(pairs)
+    liq, vol, created = raw[:, 0], raw[:, 1], raw[:, 4]
+    txns = raw[:, 2] + raw[:, 3]
+    priced = raw[:, 5] > 0
+    chains = [(p.get("chainId") or "").lower() for p in pairs]
+    if chain:
+        chain_score = np.array([c == chain for c in chains], dtype=float)
+        chain_score[chain_score == 0] = OTHER_CHAIN
+    else:
+        chain_score = np.array([CHAIN_SCORE.get(c, OTHER_CHAIN) for c in chains])
+
+    age_days = np.where(created > 0, (time.time() * 1000 - created) / 86_400_000, 0.0)
+    matrix = np.column_stack([
+        np.minimum(np.log10(1 + liq) / FULL["liquidity"], 1.0),
+        np.minimum(np.log10(1 + vol) / FULL["volume"], 1.0),
+        np.minimum(np.log10(1 + txns) / FULL["txns"], 1.0),
+        np.clip(age_days / FULL_AGE_DAYS, 0.0, 1.0),
+        chain_score,
+    ])
+    return matrix, (liq >= MIN_LIQUIDITY) & priced
+
+
+def scores(pairs, weights=None, chain=None):
+    """One score per pair (higher is better)."""
+    if not pairs:
+        return np.zeros(0)
+    w = dict(WEIGHTS, **(weights or {}))
+    matrix, valid = features(pairs, chain)
+    s = matrix @ np.array([w[k] for k in WEIGHTS])
+    return np.where(valid, s, s + PENALTY)
+
+
+def top(pairs, k=3, weights=None, chain=None):
+    if len(pairs) <= 1:
+        return list(pairs)
+    s = scores(pairs, weights, chain)
+    # stable: equal scores keep DexScreener's own order
+    order = np.argsort(-s, kind="stable")[:k]
+    return [pairs[i] for i in order]
+
+
+def best(pairs, weights=None, chain=None):
+    if not pairs:
+        return None
+    if len(pairs) == 1:
+        return pairs[0]
+    return pairs[int(np.argmax(scores(pairs, weights, chain)))]
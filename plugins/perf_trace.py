@@ -0,0 +1,189 @@
+"""
+WENBNB Perf Trace v1.0 — Per-Handler Latency & Slow-Path Tracing
+──────────────────────────────────────────────────────────────────────────────
+• trace(): one root span per handler call — every registry handler runs
+  inside one (plugin_registry.LazyCallback)
+• span() / @traced: nested spans on a thread-local stack
+• install() hooks requests.Session.request and PTB's Request.post, so every
+  outbound HTTP / LLM / Telegram call becomes a span without touching
+  call sites; JSON state rewrites are wrapped with @traced("io")
+• Histograms per handler (handler_ms) and per upstream (upstream_ms) go
+  through metrics_exporter → dashboard /metrics
+• Slow traces (≥ PERF_SLOW_MS) plus a 1-in-PERF_SAMPLE sample are kept with
+  their span breakdown for the admin /perf view
+"""
+
+import functools, os, random, threading, time
+from collections import deque
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from plugins import metrics_exporter
+
+SLOW_MS = float(os.getenv("PERF_SLOW_MS", "1000"))
+SAMPLE_EVERY = int(os.getenv("PERF_SAMPLE", "100"))   # keep 1 in N normal traces
+KEEP_TRACES = 30
+MAX_SPANS = 64
+LLM_HOSTS = {"api.openai.com", urlsplit(os.getenv("AI_PROXY_URL", "")).hostname}
+
+# === STATE ===
+TRACES = deque(maxlen=KEEP_TRACES)   # slow + sampled traces, newest last
+BREAKDOWN = {}                        # handler -> {"calls", "total", kind -> ms}
+LISTENERS = []                        # fn(handler, total_ms) per finished trace (load tests)
+_local = threading.local()
+_lock = threading.Lock()
+_installed = False
+
+
+def log(msg):
+    print(f"[PerfTrace] {msg}")
+
+
+def current():
+    return getattr(_local, "trace", None)
+
+
+# === SPANS ===
+@contextmanager
+def trace(name):
+    """Root span for one handler call. Nested calls become plain spans."""
+    if current() is not None:
+        with span(name, "handler"):
+            yield current()
+        return
+    t = {"name": name, "wall": time.time(), "start": time.perf_counter(),
+         "spans": [], "depth": 0, "error": None}
+    _local.trace = t
+    try:
+        yield t
+    finally:
+        _local.trace = None
+        _finish(t)
+
+
+@contextmanager
+def span(name, kind="code", upstream=None):
+    t = current()
+    started = time.perf_counter()
+    if t is not None:
+        t["depth"] += 1
+    try:
+        yield
+    finally:
+        ms = (time.perf_counter() - started) * 1000
+        if upstream:
+            metrics_exporter.observe("upstream_ms", ms, upstream=upstream)
+        if t is not None:
+            t["depth"] -= 1
+            if len(t["spans"]) < MAX_SPANS:
+                t["spans"].append((name, kind, round((started - t["start"]) * 1000, 1),
+                                   round(ms, 1), t["depth"]))
+
+
+def traced(kind, name=None):
+    """Decorator: run the function as a span (upstream = its label)."""
+    def deco(fn):
+        label = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(label, kind, upstream=label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+def _finish(t):
+    total = (time.perf_counter() - t["start"]) * 1000
+    t["total_ms"] = round(total, 1)
+    metrics_exporter.observe("handler_ms", total, handler=t["name"])
+    for fn in LISTENERS:
+        fn(t["name"], total)
+
+    by_kind = {}
+    for _, kind, _, ms, depth in t["spans"]:
+        if depth == 0:                      # top-level only — no double counting
+            by_kind[kind] = by_kind.get(kind, 0.0) + ms
+    by_kind["code"] = max(total - sum(by_kind.values()), 0.0)
+
+    with _lock:
+        agg = BREAKDOWN.setdefault(t["name"], {"calls": 0, "total": 0.0})
+        agg["calls"] += 1
+        agg["total"] += total
+        for kind, ms in by_kind.items():
+            agg[kind] = agg.get(kind, 0.0) + ms
+        slow = total >= SLOW_MS
+        if slow or random.randrange(SAMPLE_EVERY) == 0:
+            t["slow"] = slow
+            del t["start"], t["depth"]
+            TRACES.append(t)
+    if slow:
+        top = max(t["spans"], key=lambda s: s[3], default=None)
+        log(f"🐢 {t['name']} took {total:.0f} ms"
+            + (f" — {top[0]} {top[3]:.0f} ms ({top[1]})" if top else ""))
+
+
+# === OUTBOUND HOOKS ===
+def install():
+    """Wrap requests + python-telegram-bot transport once (idempotent)."""
+    global _installed
+    if _installed:
+        return
+    _installed = True
+
+    import requests.sessions
+    session_request = requests.sessions.Session.request
+
+    def request(self, method, url, *args, **kwargs):
+        parts = urlsplit(str(url))
+        host = parts.hostname or "?"
+        kind = "llm" if host in LLM_HOSTS else "http"
+        with span(f"{str(method).upper()} {host}{parts.path[:40]}", kind, upstream=host):
+            return session_request(self, method, url, *args, **kwargs)
+
+    requests.sessions.Session.request = request
+
+    try:
+        from telegram.utils.request import Request
+        telegram_post = Request.post
+
+        def post(self, url, data, timeout=None):
+            method = url.rsplit("/", 1)[-1]
+            with span(f"telegram.{method}", "telegram", upstream=f"telegram.{method}"):
+                return telegram_post(self, url, data, timeout)
+
+        Request.post = post
+    except Exception as e:
+        log(f"⚠️ Telegram transport not traced: {e}")
+    log(f"🔭 Tracing on (slow ≥ {SLOW_MS:.0f} ms, sample 1/{SAMPLE_EVERY})")
+
+
+# === REPORTS ===
+def histogram_stats(name, label):
+    """[(label value, calls, p50, p95, avg)] per series of a metrics_exporter histogram."""
+    rows = []
+    for (series, labels), h in list(metrics_exporter.HISTOGRAMS.items()):
+        if series != name:
+            continue
+        value = dict(labels).get(label)
+        calls = sum(h[:-1])
+        rows.append((value, calls,
+                     metrics_exporter.percentile(name, 50, **dict(labels)),
+                     metrics_exporter.percentile(name, 95, **dict(labels)),
+                     h[-1] / calls if calls else 0.0))
+    return sorted(rows, key=lambda r: -r[4] * r[1])   # by total time spent
+
+
+def breakdown(name):
+    """{kind: share of time} for a handler across every traced call."""
+    with _lock:
+        agg = dict(BREAKDOWN.get(name, {}))
+    total = agg.pop("total", 0.0)
+    agg.pop("calls", None)
+    return {k: v / total for k, v in agg.items()} if total else {}
+
+
+def recent(slow_only=True, limit=5):
+    with _lock:
+        items = [t for t in TRACES if t.get("slow") or not slow_only]
+    return items[-limit:][::-1]
@@ -1,21 +1,33 @@
 """
-WENBNB Plugin Manager v8.7.8 — Self-Healing EmotionContext Edition
+WENBNB Plugin Manager v9.0 — Manifest Registry Edition
 ──────────────────────────────────────────────────────────────────────────────
-• Keeps ai_auto_reply active even after reload.
-• Rechecks aianalyze + emotion_sync modules automatically.
-• Adds final failsafe rebind layer to dispatcher root.
-• Works with both register() and register_handlers().
+• Plugins declare commands / message stages / jobs in PLUGIN_MANIFEST.
+• Loader (plugin_registry) skips legacy + disabled modules, detects conflicts.
+• Plugins import lazily on their first command — faster cold start.
+• One owner per command and one reply stage — no duplicate handlers.
+• /reload swaps handlers atomically (diffed, never stacked).
+• /jobs shows every scheduler task: next run, last duration, failures.
+• /perf shows handler + upstream latency and recent slow traces.
 """
 
-import importlib, os, sys, time
+import html, time
 from telegram import Update
-from telegram.ext import CommandHandler, MessageHandler, CallbackContext, Filters
+from telegram.ext import CallbackContext
+
+from plugins import plugin_registry, scheduler, perf_trace
 
-PLUGIN_DIR = "plugins"
-ACTIVE_PLUGINS, FAILED_PLUGINS = {}, {}
 ADMIN_IDS = [5698007588]
 BRAND_TAG = "💫 WENBNB Neural Engine — Modular Intelligence 24×7 ⚡"
 
+PLUGIN_MANIFEST = {
+    "commands": {"modules": "modules_status", "reload": "reload_plugins", "jobs": "jobs_status",
+                 "perf": "perf_status"},
+    "priority": 100,
+}
+
+# Views kept for older callers (system_monitor, dashboards)
+ACTIVE_PLUGINS, FAILED_PLUGINS = {}, {}
+
 # === COLOR LOGGING ===
 def color_text(text, code):
     return f"\033[{code}m{text}\033[0m"
@@ -25,153 +37,172 @@ def log(msg, status="INFO"):
     colors = {"OK": "92", "WARN": "93", "FAIL": "91", "INFO": "96"}
     print(color_text(f"[{ts}] {msg}", colors.get(status, "0")))
 
-# === AUTO REPAIR HOOK ===
-def ensure_auto_reply(dispatcher):
-    """Checks and restores ai_auto_reply handler if missing."""
-    try:
-        from telegram.ext import MessageHandler, Filters
-        from plugins import ai_auto_reply
-
-        existing = [str(h.callback) for h in dispatcher.handlers.get(0, [])]
-        if "ai_auto_reply.ai_auto_chat" not in str(existing):
-            dispatcher.add_handler(MessageHandler(Filters.text & ~Filters.command, ai_auto_reply.ai_auto_chat))
-            ACTIVE_PLUGINS["ai_auto_reply"] = "✅ Restored via ensure_auto_reply()"
-            log("💬 Auto-Reply handler restored (ensure_auto_reply).", "OK")
-        else:
-            log("💬 Auto-Reply handler verified active.", "INFO")
-    except Exception as e:
-        log(f"⚠️ ensure_auto_reply() failed: {e}", "WARN")
+def _refresh_views():
+    ACTIVE_PLUGINS.clear()
+    for name, info in plugin_registry.PLUGINS.items():
+        ACTIVE_PLUGINS[name] = info["status"]
+    FAILED_PLUGINS.clear()
+    FAILED_PLUGINS.update(plugin_registry.failed_plugins())
 
 # === LOAD ALL PLUGINS ===
-def load_all_plugins(dispatcher):
-    loaded, failed = [], []
-    log("🧠 Neural Plugin Loader initialized...", "INFO")
-
-    files = [f for f in os.listdir(PLUGIN_DIR) if f.endswith(".py") and not f.startswith("__")]
-    emotion_priority = ["aianalyze", "ai_auto_reply", "emotion_sync"]
-    files.sort(key=lambda x: (x[:-3] not in emotion_priority, x))
-
-    for file in files:
-        module_name = file[:-3]
-        module_path = f"{PLUGIN_DIR}.{module_name}"
-
-        try:
-            if module_path in sys.modules:
-                del sys.modules[module_path]
-            module = importlib.import_module(module_path)
-
-            if hasattr(module, "register_handlers"):
-                try:
-                    module.register_handlers(dispatcher, config=None)
-                    ACTIVE_PLUGINS[module_name] = "✅ Registered via register_handlers()"
-                except TypeError:
-                    module.register_handlers(dispatcher)
-                    ACTIVE_PLUGINS[module_name] = "✅ Registered (legacy mode)"
-            elif hasattr(module, "register"):
-                module.register(dispatcher)
-                ACTIVE_PLUGINS[module_name] = "✅ Registered via register()"
-            else:
-                ACTIVE_PLUGINS[module_name] = "⚠️ No register() function"
-                log(f"⚠️ {module_name}: No entry point found", "WARN")
-
-            loaded.append(module_name)
-            log(f"[OK] {module_name}.py — registered", "OK")
-
-        except Exception as e:
-            err = str(e).split("\n")[0]
-            FAILED_PLUGINS[module_name] = err
-            ACTIVE_PLUGINS[module_name] = f"❌ Error: {err}"
-            failed.append((module_name, err))
-            log(f"[FAIL] {module_name}.py — {err}", "FAIL")
-
-    validate_plugin_integrity()
-    recheck_emotion_plugins(dispatcher)
-    reattach_auto_reply(dispatcher)
-    ensure_auto_reply(dispatcher)
-
-    log(f"📦 Total Loaded: {len(loaded)} | ❌ Failed: {len(failed)}", "INFO")
+def load_all_plugins(dispatcher, reserved=(), defer_setup=False):
+    log("🧠 Neural Plugin Loader initialized (manifest mode)...", "INFO")
+    handlers = plugin_registry.load(dispatcher, reserved=reserved, defer_setup=defer_setup)
+    _refresh_views()
+
+    loaded = list(plugin_registry.PLUGINS)
+    failed = list(FAILED_PLUGINS.items())
+    log(f"📦 Plugins: {len(loaded)} | 🔗 Handlers: {len(handlers)} | "
+        f"❌ Failed: {len(failed)} | ⏭️ Skipped: {len(plugin_registry.SKIPPED)}", "INFO")
     if failed:
-        log(f"⚠️ Failed: {', '.join([x[0] for x in failed])}", "WARN")
-
+        log(f"⚠️ Failed: {', '.join(x[0] for x in failed)}", "WARN")
     return loaded, failed
 
-# === EMOTION MODULE RECHECK ===
-def recheck_emotion_plugins(dispatcher):
-    """Ensures Emotion Sync & aianalyze command remain attached."""
-    handlers = [h for h in dispatcher.handlers.get(0, []) if isinstance(h, CommandHandler)]
-    commands = [h.command for h in handlers]
-
-    if "aianalyze" not in str(commands):
-        try:
-            from plugins import aianalyze
-            dispatcher.add_handler(CommandHandler("aianalyze", aianalyze.aianalyze_cmd))
-            log("💫 /aianalyze reattached successfully.", "OK")
-        except Exception as e:
-            log(f"⚠️ Emotion analyzer reload failed: {e}", "WARN")
-
-# === AUTO-REPLY FAILSAFE ===
-def reattach_auto_reply(dispatcher):
-    """Ensures ai_auto_reply stays active after reload."""
-    try:
-        from telegram.ext import MessageHandler, Filters
-        from plugins import ai_auto_reply
-
-        existing = [str(h.callback) for h in dispatcher.handlers.get(0, [])]
-        if "ai_auto_reply.ai_auto_chat" in str(existing):
-            log("💬 Auto-Reply already active (skipping duplicate).", "INFO")
-            return
-
-        dispatcher.add_handler(MessageHandler(Filters.text & ~Filters.command, ai_auto_reply.ai_auto_chat))
-        ACTIVE_PLUGINS["ai_auto_reply"] = "✅ Auto-Reply Reattached"
-        log("💬 Auto-Reply linked successfully.", "OK")
-    except Exception as e:
-        log(f"⚠️ Auto-Reply reattach failed: {e}", "WARN")
-
-# === VALIDATION ===
-def validate_plugin_integrity():
-    for name in list(ACTIVE_PLUGINS.keys()):
-        path = f"{PLUGIN_DIR}.{name}"
-        module = sys.modules.get(path)
-        if not module:
-            ACTIVE_PLUGINS[name] = "⚠️ Missing from memory"
-        elif not any(hasattr(module, fn) for fn in ["register", "register_handlers"]):
-            ACTIVE_PLUGINS[name] = "⚠️ Invalid structure"
+# === DEFERRED SETUP (runs after polling starts) ===
+def run_deferred_setups(dispatcher):
+    started = time.time()
+    names = plugin_registry.run_pending_setups(dispatcher)
+    _refresh_views()
+    if names:
+        log(f"⚙️ Setup hooks done in {(time.time() - started) * 1000:.0f} ms: {', '.join(names)}", "OK")
+    return names
 
 # === /modules Command ===
 def modules_status(update: Update, context: CallbackContext):
     if update.effective_user.id not in ADMIN_IDS:
         return update.message.reply_text("🚫 Only admin can check module status.")
+    _refresh_views()
     text = "🧩 <b>WENBNB Plugin Status — Neural Edition</b>\n\n"
     for name, status in ACTIVE_PLUGINS.items():
         text += f"• <b>{name}</b>: {status}\n"
-    text += f"\n🧠 Neural Sync: <b>Stable</b>\n📦 Total Modules: <b>{len(ACTIVE_PLUGINS)}</b>\n\n{BRAND_TAG}"
+
+    if plugin_registry.CONFLICTS:
+        text += "\n🔀 <b>Resolved conflicts</b>\n"
+        for c in plugin_registry.CONFLICTS:
+            mark = "⚠️" if c["tie"] else "•"
+            text += f"{mark} {c['kind']} <code>{c['key']}</code>: {c['winner']} over {c['loser']}\n"
+
+    if plugin_registry.SKIPPED:
+        skipped = ", ".join(f"{n} ({r})" for n, r in plugin_registry.SKIPPED.items())
+        text += f"\n⏭️ <b>Skipped:</b> {skipped}\n"
+
+    text += (
+        f"\n🧠 Commands: <b>{len(plugin_registry.COMMANDS)}</b>"
+        f"\n📦 Total Modules: <b>{len(ACTIVE_PLUGINS)}</b>\n\n{BRAND_TAG}"
+    )
     update.message.reply_text(text, parse_mode="HTML")
 
 # === /reload Command ===
 def reload_plugins(update: Update, context: CallbackContext):
+    """
+    /reload            → re-import changed or failed plugins
+    /reload <plugin>   → force one plugin (repeatable: /reload a b)
+    /reload all        → force every imported plugin
+    Handlers are swapped atomically; nothing is stacked.
+    """
     if update.effective_user.id not in ADMIN_IDS:
         return update.message.reply_text("🚫 Only admin can reload modules.")
 
-    dp = context.dispatcher
-    ACTIVE_PLUGINS.clear()
-    FAILED_PLUGINS.clear()
-    update.message.reply_text("🔄 Reloading all plugins...", parse_mode="HTML")
-
-    loaded, failed = load_all_plugins(dp)
-
-    # === Final Failsafe: Ensure Text Listener Active ===
+    args = context.args or []
+    targets = "all" if args == ["all"] else (args or None)
+    update.message.reply_text("🔄 Reloading WENBNB plugins...", parse_mode="HTML")
     try:
-        from plugins import ai_auto_reply
-        dp.add_handler(MessageHandler(Filters.text & ~Filters.command, ai_auto_reply.ai_auto_chat))
-        log("💬 Final Failsafe: ai_auto_reply handler reattached after reload.", "OK")
+        r = plugin_registry.reload(context.dispatcher, targets)
     except Exception as e:
-        log(f"⚠️ Failsafe handler attach failed: {e}", "WARN")
-
-    summary = f"✅ Loaded: {len(loaded)} | ❌ Failed: {len(failed)}\n\n{BRAND_TAG}"
+        log(f"Reload failed: {e}", "FAIL")
+        return update.message.reply_text(f"❌ Reload failed: <code>{e}</code>", parse_mode="HTML")
+    _refresh_views()
+
+    reloaded = ", ".join(r["reloaded"]) or "none"
+    summary = (
+        f"♻️ <b>Reload complete</b>\n\n"
+        f"➕ Added: <b>{r['added']}</b> | ➖ Removed: <b>{r['removed']}</b>\n"
+        f"🔁 Replaced: <b>{r['replaced']}</b> | ✔️ Unchanged: <b>{r['unchanged']}</b>\n"
+        f"⏱️ Jobs: +{r['jobs_added']} / -{r['jobs_removed']}\n"
+        f"📦 Re-imported: {reloaded}\n"
+    )
+    if r["new"] or r["gone"]:
+        summary += f"🆕 New: {', '.join(r['new']) or '—'} | 🗑️ Gone: {', '.join(r['gone']) or '—'}\n"
+    if r["failed"]:
+        summary += f"❌ Failing: {', '.join(r['failed'])}\n"
+    summary += f"\n{BRAND_TAG}"
+    log(f"♻️ Reload → +{r['added']} -{r['removed']} ~{r['replaced']}", "OK")
     update.message.reply_text(summary, parse_mode="HTML")
 
-# === REGISTER ===
-def register_handlers(dp):
-    dp.add_handler(CommandHandler("modules", modules_status))
-    dp.add_handler(CommandHandler("reload", reload_plugins))
-    log("💫 PluginManager v8.7.8 Self-Healing Edition initialized.", "OK")
+# === /jobs Command ===
+def _fmt_secs(seconds):
+    seconds = int(max(seconds, 0))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m {seconds % 60}s"
+    return f"{seconds}s"
+
+def jobs_status(update: Update, context: CallbackContext):
+    if update.effective_user.id not in ADMIN_IDS:
+        return update.message.reply_text("🚫 Only admin can view scheduled jobs.")
+
+    now = time.time()
+    tasks = scheduler.tasks()
+    text = f"⏱️ <b>WENBNB Scheduler</b> — {len(tasks)} tasks\n\n"
+    for t in tasks:
+        every = f"every {_fmt_secs(t['interval'])}" if t["interval"] else "once"
+        nxt = "running" if t["running"] else (
+            f"in {_fmt_secs(t['next_run'] - now)}" if t["next_run"] else "—")
+        last = f"{t['last_ms']:.0f} ms" if t["last_ms"] is not None else "—"
+        text += (
+            f"• <b>{t['name']}</b> ({every})\n"
+            f"   next {nxt} | last {last} | runs {t['runs']}"
+        )
+        if t["failures"]:
+            text += f" | ❌ {t['failures']}"
+        if t["overruns"]:
+            text += f" | ⚠️ overruns {t['overruns']}"
+        if t["last_error"]:
+            text += f"\n   <code>{html.escape(t['last_error'][:80])}</code>"
+        text += "\n"
+
+    st = scheduler.STATS
+    text += (
+        f"\n🔔 Wakeups: <b>{st['wakeups']}</b> | 🚀 Dispatched: <b>{st['dispatched']}</b>\n"
+        f"🐢 Lag: {st['lag_ms']:.0f} ms (max {st['max_lag_ms']:.0f} ms) | "
+        f"⚠️ Overruns: {st['overruns']} | ❌ Failures: {st['failures']}\n\n{BRAND_TAG}"
+    )
+    update.message.reply_text(text, parse_mode="HTML")
+
+
+# === /perf (ADMIN) ===
+def _fmt_ms(ms):
+    if ms is None:
+        return "—"
+    if ms == float("inf"):
+        return ">30s"
+    return f"{ms / 1000:.1f}s" if ms >= 1000 else f"{ms:.0f}ms"
+
+def perf_status(update: Update, context: CallbackContext):
+    if update.effective_user.id not in ADMIN_IDS:
+        return update.message.reply_text("🚫 Only admin can view performance data.")
+
+    text = "⚡ <b>WENBNB Perf</b> — since boot (p50 / p95 are bucket bounds)\n\n<b>Handlers</b>\n"
+    for name, calls, p50, p95, avg in perf_trace.histogram_stats("handler_ms", "handler")[:8]:
+        split = perf_trace.breakdown(name)
+        parts = " ".join(f"{k} {v:.0%}" for k, v in sorted(split.items(), key=lambda kv: -kv[1]) if v >= 0.05)
+        text += (f"• <b>{html.escape(name)}</b> ×{calls} — avg {_fmt_ms(avg)}, "
+                 f"p50 ≤{_fmt_ms(p50)}, p95 ≤{_fmt_ms(p95)}\n")
+        if parts:
+            text += f"   {parts}\n"
+
+    text += "\n<b>Upstreams</b>\n"
+    for name, calls, p50, p95, avg in perf_trace.histogram_stats("upstream_ms", "upstream")[:8]:
+        text += f"• {html.escape(str(name))} ×{calls} — avg {_fmt_ms(avg)}, p95 ≤{_fmt_ms(p95)}\n"
+
+    slow = perf_trace.recent(slow_only=True, limit=3)
+    text += f"\n<b>Slow traces</b> (≥ {_fmt_ms(perf_trace.SLOW_MS)})\n" if slow else ""
+    for t in slow:
+        when = time.strftime("%H:%M:%S", time.localtime(t["wall"]))
+        text += f"• {when} <b>{html.escape(t['name'])}</b> {_fmt_ms(t['total_ms'])}"
+        text += f" ❌ <code>{html.escape(t['error'][:60])}</code>\n" if t.get("error") else "\n"
+        for name, kind, offset, ms, depth in sorted(t["spans"], key=lambda s: -s[3])[:4]:
+            text += f"   {'  ' * depth}└ {html.escape(name)} {_fmt_ms(ms)} ({kind}, +{offset:.0f}ms)\n"
+
+    update.message.reply_text(text + f"\n{BRAND_TAG}", parse_mode="HTML")
@@ -0,0 +1,594 @@
+"""
+WENBNB Plugin Registry v1.0 — Manifest + Lazy Loader Core
+──────────────────────────────────────────────────────────────────────────────
+• Reads every plugin's PLUGIN_MANIFEST straight from source (no import needed)
+• Skips legacy (*_old, *_oldbackup, old_*) and disabled modules
+• One owner per command / exclusive message stage — conflicts are detected,
+  resolved by manifest priority and reported in /modules
+• A plugin is imported only when its first command, message or job fires
+• Manifest jobs run on the shared scheduler (plugins/scheduler.py)
+• Setup hooks can be deferred until after polling starts (cold-start path)
+• Hot reload builds a new handler set off to the side, diffs it against the
+  live one and swaps it in atomically — no stacked duplicates
+
+Manifest format (module-level literal in each plugin):
+
+    PLUGIN_MANIFEST = {
+        "commands":  {"price": "price_cmd"},
+        "messages":  [{"stage": "reply", "callback": "ai_auto_chat"}],
+        "callbacks": [{"pattern": "^help_", "callback": "help_callback"}],
+        "jobs":      [{"callback": "job_scan", "interval": 600, "first": 20,
+                       "env": "SCAN_MINUTES", "scale": 60}],  # env overrides
+        "setup":     "start_monitor",     # eager hook, called with dispatcher
+        "teardown":  "stop_monitor",      # optional, called before a reload
+        "priority":  10,                  # higher wins a conflict
+        "enabled":   True,
+    }
+"""
+
+import ast, importlib, os, re, sys, threading, time
+from telegram.ext import (
+    CommandHandler, MessageHandler, CallbackQueryHandler, CallbackContext, Filters,
+    DispatcherHandlerStop,
+)
+
+from plugins import scheduler, startup_profiler, metrics_exporter, perf_trace
+
+PLUGIN_DIR = os.path.dirname(os.path.abspath(__file__))
+PACKAGE = "plugins"
+MANIFEST_NAME = "PLUGIN_MANIFEST"
+
+# Modules that live in plugins/ but are never treated as plugins
+LEGACY_PATTERN = re.compile(r"(^old_|_old$|_oldbackup$)")
+DISABLED_PLUGINS = {
+    p.strip() for p in os.getenv("DISABLED_PLUGINS", "").split(",") if p.strip()
+}
+
+# Message stages → dispatcher group + default filter.
+# Exclusive stages accept a single owner (only one handler per group ever runs).
+STAGES = {
+    "guard":   {"group": -1, "filter": "text", "exclusive": False},
+    "reply":   {"group": 0,  "filter": "text", "exclusive": True},
+    "context": {"group": 1,  "filter": "text", "exclusive": False},
+    "events":  {"group": 1,  "filter": "new_members", "exclusive": False},
+}
+COMMAND_GROUP = 0
+CALLBACK_GROUP = 0
+
+FILTERS = {
+    "text": Filters.text & ~Filters.command,
+    "new_members": Filters.status_update.new_chat_members,
+    "all": Filters.all,
+}
+
+# === REGISTRY STATE ===
+PLUGINS = {}      # name -> {"path", "manifest", "status", "module", "mtime", "error"}
+SKIPPED = {}      # name -> reason
+COMMANDS = {}     # command -> owning plugin
+STAGE_OWNERS = {} # exclusive stage -> owning plugin
+CONFLICTS = []    # {"kind", "key", "winner", "loser"}
+LIVE = {}         # handler key -> (group, handler) installed on the dispatcher
+JOBS = {}         # "plugin.callback" -> spec (task lives on the scheduler)
+_STOP_EVENTS = {} # plugin -> threading.Event for its background loops
+_RESERVED = ()    # core-owned commands, remembered for reloads
+_IMPORT_LOCK = threading.RLock()
+_SWAP_LOCK = threading.Lock()
+_MANIFEST_CACHE = {}  # path -> (mtime, manifest)
+_PENDING_SETUPS = []  # plugins whose setup hook waits for run_pending_setups()
+
+
+def log(msg):
+    print(f"[PluginRegistry] {msg}")
+
+
+# === MANIFEST DISCOVERY ===
+def read_manifest(path):
+    """Extract PLUGIN_MANIFEST from a module's source without executing it."""
+    try:
+        mtime = os.path.getmtime(path)
+        cached = _MANIFEST_CACHE.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        with open(path, "r", encoding="utf-8-sig") as f:
+            tree = ast.parse(f.read(), filename=path)
+        manifest = None
+        for node in tree.body:
+            if isinstance(node, ast.Assign) and any(
+                isinstance(t, ast.Name) and t.id == MANIFEST_NAME for t in node.targets
+            ):
+                manifest = ast.literal_eval(node.value)
+                break
+        _MANIFEST_CACHE[path] = (mtime, manifest)
+        return manifest
+    except Exception as e:
+        log(f"⚠️ Manifest unreadable in {os.path.basename(path)}: {e}")
+        return None
+
+
+def discover():
+    """Scan plugins/ and return ({name: plugin_info}, {name: skip_reason})."""
+    found, skipped = {}, {}
+    for file in sorted(os.listdir(PLUGIN_DIR)):
+        if not file.endswith(".py") or file.startswith("__"):
+            continue
+        name = file[:-3]
+        path = os.path.join(PLUGIN_DIR, file)
+        if LEGACY_PATTERN.search(name):
+            skipped[name] = "legacy"
+            continue
+        if name in DISABLED_PLUGINS:
+            skipped[name] = "disabled (env)"
+            continue
+        started = time.time()
+        manifest = read_manifest(path)
+        if manifest is None:
+            skipped[name] = "no manifest"
+            continue
+        if not manifest.get("enabled", True):
+            skipped[name] = "disabled (manifest)"
+            continue
+        found[name] = {"path": path, "manifest": manifest}
+        startup_profiler.record_plugin(name, "register_ms", startup_profiler.elapsed_ms(started))
+    return found, skipped
+
+
+# === CONFLICT RESOLUTION ===
+def _claim(table, kind, key, name, priority, order):
+    """Assign key to the highest-priority claimant; record every loser."""
+    current = table.get(key)
+    if current is None:
+        table[key] = (name, priority, order)
+        return
+    cur_name, cur_prio, cur_order = current
+    if (priority, -order) > (cur_prio, -cur_order):
+        table[key] = (name, priority, order)
+        winner, loser = name, cur_name
+    else:
+        winner, loser = cur_name, name
+    tie = priority == cur_prio
+    CONFLICTS.append({"kind": kind, "key": key, "winner": winner, "loser": loser, "tie": tie})
+    log(f"{'⚠️' if tie else '🔀'} {kind} '{key}': {winner} wins over {loser}"
+        + (" (tie — load order)" if tie else " (priority)"))
+
+
+CORE_OWNER = "core"
+
+
+def resolve(found, reserved=()):
+    """Resolve command and exclusive-stage ownership across all manifests."""
+    del CONFLICTS[:]
+    commands, stages = {}, {}
+    for cmd in reserved:
+        commands[cmd] = (CORE_OWNER, 1 << 30, -1)
+    for order, (name, info) in enumerate(found.items()):
+        m = info["manifest"]
+        prio = int(m.get("priority", 0))
+        for cmd in m.get("commands", {}):
+            _claim(commands, "command", cmd, name, prio, order)
+        for entry in m.get("messages", []):
+            stage = entry.get("stage", "reply")
+            if STAGES.get(stage, {}).get("exclusive"):
+                _claim(stages, "stage", stage, name, prio, order)
+    return ({k: v[0] for k, v in commands.items()},
+            {k: v[0] for k, v in stages.items()})
+
+
+# === LAZY IMPORT ===
+def load_module(name):
+    """Import a plugin on demand (thread-safe). Returns module or None."""
+    info = PLUGINS.get(name)
+    if info is None:
+        return None
+    if info.get("module") is not None:
+        return info["module"]
+    if info.get("error"):
+        return None  # stays failed until heal_failed() retries it
+    with _IMPORT_LOCK:
+        if info.get("module") is not None:
+            return info["module"]
+        started = time.time()
+        try:
+            module = importlib.import_module(f"{PACKAGE}.{name}")
+            ms = startup_profiler.elapsed_ms(started)
+            info["module"] = module
+            info["mtime"] = os.path.getmtime(info["path"])
+            info["error"] = None
+            info["status"] = f"✅ Imported ({ms:.0f} ms)"
+            startup_profiler.record_plugin(name, "import_ms", ms)
+            log(f"📦 {name} imported on first use")
+            return module
+        except Exception as e:
+            err = str(e).split("\n")[0]
+            info["error"] = err
+            info["status"] = f"❌ Error: {err}"
+            log(f"[FAIL] {name} — {err}")
+            return None
+
+
+def get_callback(name, attr):
+    module = load_module(name)
+    if module is None:
+        return None
+    fn = getattr(module, attr, None)
+    if fn is None:
+        log(f"⚠️ {name}.{attr} declared in manifest but not defined")
+    return fn
+
+
+class LazyCallback:
+    """Handler/job callback that imports its plugin on first invocation."""
+
+    def __init__(self, plugin, attr):
+        self.plugin = plugin
+        self.attr = attr
+        self.__name__ = f"{plugin}.{attr}"
+
+    def __call__(self, *args, **kwargs):
+        fn = get_callback(self.plugin, self.attr)
+        if fn is None:
+            return None
+        with perf_trace.trace(self.__name__) as t:   # records handler_ms
+            try:
+                return fn(*args, **kwargs)
+            except DispatcherHandlerStop:
+                raise
+            except Exception as e:
+                metrics_exporter.inc("handler_errors", handler=self.__name__)
+                t["error"] = str(e).split("\n")[0]
+                raise
+
+    def __repr__(self):
+        return f"<lazy {self.plugin}.{self.attr}>"
+
+
+# === HANDLER CONSTRUCTION ===
+def build_handlers(found, command_owners, stage_owners):
+    """
+    Build handlers for every resolved manifest entry.
+    Returns {key: (group, handler)} — key identifies the entry for diffing.
+    """
+    handlers = {}
+    for name, info in found.items():
+        started = time.time()
+        m = info["manifest"]
+        for cmd, attr in m.get("commands", {}).items():
+            if command_owners.get(cmd) != name:
+                continue
+            handlers[("command", cmd)] = (
+                COMMAND_GROUP, CommandHandler(cmd, LazyCallback(name, attr))
+            )
+        for i, entry in enumerate(m.get("messages", [])):
+            stage = entry.get("stage", "reply")
+            spec = STAGES.get(stage)
+            if spec is None:
+                log(f"⚠️ {name}: unknown stage '{stage}'")
+                continue
+            if spec["exclusive"] and stage_owners.get(stage) != name:
+                continue
+            flt = FILTERS[entry.get("filter", spec["filter"])]
+            handlers[("message", stage, name, i)] = (
+                spec["group"], MessageHandler(flt, LazyCallback(name, entry["callback"]))
+            )
+        for i, entry in enumerate(m.get("callbacks", [])):
+            handlers[("callback", name, i)] = (
+                CALLBACK_GROUP,
+                CallbackQueryHandler(LazyCallback(name, entry["callback"]),
+                                     pattern=entry.get("pattern")),
+            )
+        startup_profiler.record_plugin(name, "register_ms", startup_profiler.elapsed_ms(started))
+    return handlers
+
+
+def job_interval(entry):
+    """Job interval in seconds; "env" overrides it (value × "scale")."""
+    interval = entry.get("interval", 600)
+    env = entry.get("env")
+    if env and os.getenv(env):
+        try:
+            interval = int(os.getenv(env)) * entry.get("scale", 1)
+        except ValueError:
+            log(f"⚠️ Invalid {env}={os.getenv(env)!r} — using {interval}s")
+    return interval
+
+
+def _job_spec(entry):
+    interval = job_interval(entry)
+    return (entry["callback"], interval, entry.get("first", interval))
+
+
+def _run_job(dispatcher, callback):
+    # Manifest jobs keep the PTB job signature: callback(context)
+    callback(CallbackContext(dispatcher))
+
+
+def sync_jobs(dispatcher, found):
+    """
+    Bring manifest jobs on the scheduler in line with `found`: unchanged jobs
+    keep running, changed ones are rescheduled, orphans are removed.
+    Returns (added, removed) job names.
+    """
+    wanted = {}
+    for name, info in found.items():
+        for entry in info["manifest"].get("jobs", []):
+            wanted[f"{name}.{entry['callback']}"] = (name, entry)
+
+    removed = []
+    for job_name, spec in list(JOBS.items()):
+        if job_name not in wanted or _job_spec(wanted[job_name][1]) != spec:
+            scheduler.cancel(job_name)
+            del JOBS[job_name]
+            removed.append(job_name)
+
+    added = []
+    for job_name, (name, entry) in wanted.items():
+        if job_name in JOBS:
+            continue
+        spec = _job_spec(entry)
+        scheduler.every(
+            job_name, _run_job, interval=spec[1], first=spec[2],
+            args=(dispatcher, LazyCallback(name, entry["callback"])), owner=name,
+        )
+        JOBS[job_name] = spec
+        added.append(job_name)
+    return added, removed
+
+
+def run_setup(dispatcher, name):
+    """Run a plugin's eager setup hook (imports the plugin immediately)."""
+    attr = PLUGINS[name]["manifest"].get("setup")
+    if not attr:
+        return False
+    fn = get_callback(name, attr)
+    if fn is None:
+        return False
+    started = time.time()
+    try:
+        fn(dispatcher)
+        return True
+    except Exception as e:
+        err = str(e).split("\n")[0]
+        PLUGINS[name]["status"] = f"❌ Setup error: {err}"
+        PLUGINS[name]["error"] = err
+        log(f"[FAIL] {name}.{attr}() — {err}")
+        return False
+    finally:
+        startup_profiler.record_plugin(name, "setup_ms", startup_profiler.elapsed_ms(started))
+
+
+def run_pending_setups(dispatcher):
+    """Run setup hooks held back by load(defer_setup=True). Returns names run."""
+    pending, _PENDING_SETUPS[:] = list(_PENDING_SETUPS), []
+    for name in pending:
+        run_setup(dispatcher, name)
+    return pending
+
+
+# === LIFECYCLE ===
+def stop_event(name):
+    """
+    Stop flag for a plugin's background loops. Set on teardown; the next
+    call after a teardown hands out a fresh event for the new instance.
+    """
+    with _IMPORT_LOCK:
+        ev = _STOP_EVENTS.get(name)
+        if ev is None:
+            ev = _STOP_EVENTS[name] = threading.Event()
+        return ev
+
+
+def teardown(dispatcher, name):
+    """Stop a plugin's tasks/threads and forget its module (next use re-imports)."""
+    info = PLUGINS.get(name)
+    if info is None:
+        return
+    ev = _STOP_EVENTS.pop(name, None)
+    if ev is not None:
+        ev.set()
+
+    module, attr = info.get("module"), info["manifest"].get("teardown")
+    if module is not None and attr and hasattr(module, attr):
+        try:
+            getattr(module, attr)(dispatcher)
+        except Exception as e:
+            log(f"⚠️ {name}.{attr}() failed: {e}")
+
+    scheduler.cancel_owner(name)  # manifest jobs + any tasks the plugin started
+    for job_name in [j for j in JOBS if j.startswith(f"{name}.")]:
+        del JOBS[job_name]
+
+    sys.modules.pop(f"{PACKAGE}.{name}", None)
+    info.update({"module": None, "error": None, "mtime": None,
+                 "status": "💤 Lazy (not imported)"})
+
+
+def source_changed(name):
+    info = PLUGINS.get(name) or {}
+    if info.get("module") is None or not info.get("mtime"):
+        return False
+    try:
+        return os.path.getmtime(info["path"]) != info["mtime"]
+    except OSError:
+        return True
+
+
+# === ATOMIC HANDLER SWAP ===
+def handler_spec(group, handler):
+    """Comparable description of a handler — equal specs mean no swap needed."""
+    cb = handler.callback
+    match = (getattr(handler, "command", None)
+             or getattr(getattr(handler, "pattern", None), "pattern", None)
+             or getattr(handler, "filters", None))
+    return (group, type(handler).__name__,
+            getattr(cb, "plugin", None), getattr(cb, "attr", None), str(match))
+
+
+def diff_handlers(live, fresh):
+    """
+    Merge a freshly built handler set with the live one.
+    Unchanged entries keep their live handler object.
+    Returns (merged, added, removed, replaced) — the last three are key lists.
+    """
+    merged, added, replaced = {}, [], []
+    for key, entry in fresh.items():
+        old = live.get(key)
+        if old is None:
+            added.append(key)
+            merged[key] = entry
+        elif handler_spec(*old) != handler_spec(*entry):
+            replaced.append(key)
+            merged[key] = entry
+        else:
+            merged[key] = old
+    removed = [key for key in live if key not in fresh]
+    return merged, added, removed, replaced
+
+
+def swap_handlers(dispatcher, handlers):
+    """
+    Install `handlers` as the registry's handler set in one step per group.
+    Each group list is rebuilt off to the side and assigned by reference,
+    so an update being processed sees either the old list or the new one.
+    Handlers the registry does not own (wenbot core) keep their order, after
+    the plugin handlers.
+    """
+    with _SWAP_LOCK:
+        owned = {id(h) for _, h in LIVE.values()}
+        by_group = {}
+        for group, handler in handlers.values():
+            by_group.setdefault(group, []).append(handler)
+
+        for group in set(dispatcher.handlers) | set(by_group):
+            foreign = [h for h in dispatcher.handlers.get(group, []) if id(h) not in owned]
+            dispatcher.handlers[group] = by_group.get(group, []) + foreign
+        dispatcher.groups = sorted(g for g, hs in dispatcher.handlers.items() if hs)
+
+        LIVE.clear()
+        LIVE.update(handlers)
+
+
+def _sync_state(found, skipped, command_owners, stage_owners):
+    for name in [n for n in PLUGINS if n not in found]:
+        del PLUGINS[name]
+    for name, info in found.items():
+        entry = PLUGINS.get(name)
+        if entry is None:
+            prev = sys.modules.get(f"{PACKAGE}.{name}")
+            PLUGINS[name] = {
+                "path": info["path"],
+                "manifest": info["manifest"],
+                "module": prev,
+                "mtime": os.path.getmtime(info["path"]) if prev else None,
+                "error": None,
+                "status": "✅ Imported" if prev else "💤 Lazy (not imported)",
+            }
+        else:
+            entry["manifest"] = info["manifest"]
+    SKIPPED.clear()
+    SKIPPED.update(skipped)
+    COMMANDS.clear()
+    COMMANDS.update(command_owners)
+    STAGE_OWNERS.clear()
+    STAGE_OWNERS.update(stage_owners)
+
+
+# === PUBLIC API ===
+def load(dispatcher, reserved=(), defer_setup=False):
+    """
+    Discover manifests, resolve conflicts, install lazy handlers and jobs.
+    `reserved` commands belong to the core (wenbot) and are never handed out.
+    With defer_setup, setup hooks wait for run_pending_setups() so the bot
+    can start polling first.
+    """
+    global _RESERVED
+    _RESERVED = tuple(reserved)
+    found, skipped = discover()
+    command_owners, stage_owners = resolve(found, _RESERVED)
+
+    PLUGINS.clear()
+    _sync_state(found, skipped, command_owners, stage_owners)
+
+    handlers = build_handlers(found, command_owners, stage_owners)
+    swap_handlers(dispatcher, handlers)
+    sync_jobs(dispatcher, found)
+
+    _PENDING_SETUPS[:] = [n for n in found if found[n]["manifest"].get("setup")]
+    if not defer_setup:
+        run_pending_setups(dispatcher)
+
+    log(f"🧩 {len(found)} plugins | {len(handlers)} handlers | "
+        f"{len(CONFLICTS)} conflicts | {len(skipped)} skipped")
+    return handlers
+
+
+def reload(dispatcher, targets=None):
+    """
+    Hot reload without stacking handlers.
+
+    The new handler set is built off to the side from fresh manifests,
+    diffed against the live set and swapped in atomically. Plugins are
+    re-imported when named in `targets` ("all" = every imported plugin);
+    by default only plugins whose source changed or whose import failed.
+    Re-imported plugins are torn down first (stop event, teardown hook,
+    jobs) and their setup hook runs again.
+    """
+    found, skipped = discover()
+    command_owners, stage_owners = resolve(found, _RESERVED)
+
+    if targets == "all":
+        refresh = [n for n in found if n in PLUGINS and PLUGINS[n].get("module")]
+    elif targets:
+        refresh = [n for n in targets if n in found and n in PLUGINS]
+    else:
+        refresh = [n for n in found if n in PLUGINS
+                   and (PLUGINS[n].get("error") or source_changed(n))]
+    gone = [n for n in PLUGINS if n not in found]
+    new = [n for n in found if n not in PLUGINS]
+
+    fresh = build_handlers(found, command_owners, stage_owners)
+    merged, added, removed, replaced = diff_handlers(LIVE, fresh)
+
+    for name in gone + refresh:
+        teardown(dispatcher, name)
+    _sync_state(found, skipped, command_owners, stage_owners)
+    swap_handlers(dispatcher, merged)
+    jobs_added, jobs_removed = sync_jobs(dispatcher, found)
+
+    # Re-import eagerly so an admin sees broken code in the reload report
+    for name in refresh:
+        load_module(name)
+    for name in refresh + new:
+        if found[name]["manifest"].get("setup") and not PLUGINS[name].get("error"):
+            run_setup(dispatcher, name)
+
+    summary = {
+        "added": len(added),
+        "removed": len(removed),
+        "replaced": len(replaced),
+        "unchanged": len(merged) - len(added) - len(replaced),
+        "reloaded": refresh,
+        "new": new,
+        "gone": gone,
+        "jobs_added": len(jobs_added),
+        "jobs_removed": len(jobs_removed),
+        "failed": list(failed_plugins()),
+    }
+    log(f"♻️ Reload: +{summary['added']} -{summary['removed']} "
+        f"~{summary['replaced']} ={summary['unchanged']} | "
+        f"re-imported {len(refresh)} | failed {len(summary['failed'])}")
+    return summary
+
+
+def failed_plugins():
+    return {n: p["error"] for n, p in PLUGINS.items() if p.get("error")}
+
+
+def heal_failed():
+    """Retry every plugin whose import failed. Returns names recovered."""
+    recovered = []
+    for name in list(failed_plugins()):
+        PLUGINS[name]["module"] = None
+        PLUGINS[name]["error"] = None
+        sys.modules.pop(f"{PACKAGE}.{name}", None)
+        if load_module(name) is not None:
+            recovered.append(name)
+    return recovered
@@ -0,0 +1,248 @@
+"""
+WENBNB Price Alerts v1.0 — Threshold Subscriptions on the Live Price Feed
+──────────────────────────────────────────────────────────────────────────────
+• /alert <symbol> >|< <price> — ping me when BNB goes above / below a level
+• Per symbol, two sorted lists of (threshold, id): ABOVE and BELOW
+• Every price that reaches plugins/price_history (any fetch, any plugin)
+  is checked with two bisects — the fired alerts are a contiguous slice,
+  so a tick costs O(log n + k) however many alerts are waiting
+• Fired alerts go to an outbox drained by a job at SEND_PER_TICK messages
+  per second (Telegram's flood limits); alerts and outbox persist to
+  data/price_alerts.json, so neither is lost on restart
+
+    /alert bnb > 700      /alert cake < 1.8      /alerts      /unalert 12
+"""
+
+import bisect, json, os, re, threading, time
+from collections import deque
+from telegram import Update
+from telegram.error import RetryAfter, TelegramError, Unauthorized, BadRequest
+from telegram.ext import CallbackContext
+
+from plugins import binance_stream, price_history, scheduler
+
+ALERTS_FILE = "data/price_alerts.json"
+MAX_PER_USER = 20
+SEND_PER_TICK = 20            # outbox messages per delivery run (1 s)
+SAVE_DELAY = 5
+BRAND_TAG = "💫 Powered by <b>WENBNB Neural Engine</b> — Neural Market Feed ⚡"
+
+PLUGIN_MANIFEST = {
+    "setup": "start_alerts",
+    "teardown": "stop_alerts",
+    "commands": {"alert": "alert_cmd", "alerts": "alerts_cmd", "unalert": "unalert_cmd"},
+    "jobs": [{"callback": "deliver_job", "interval": 1, "env": "PRICE_ALERT_SEND_SECONDS"}],
+}
+
+# === STATE ===
+ALERTS = {}                   # id -> {"id", "chat", "user", "symbol", "op", "price", "created"}
+ABOVE = {}                    # symbol -> sorted [(threshold, id)] — fire when price >= threshold
+BELOW = {}                    # symbol -> sorted [(threshold, id)] — fire when price <= threshold
+OUTBOX = deque()              # (chat_id, text) waiting for delivery
+_next_id = 1
+_paused_until = 0.0           # Telegram flood control (RetryAfter)
+_loaded = False
+_lock = threading.RLock()
+
+
+def log(msg):
+    print(f"[PriceAlerts] {msg}")
+
+
+# === INDEX ===
+def _book(op):
+    return ABOVE if op == ">" else BELOW
+
+
+def _index(alert):
+    bisect.insort(_book(alert["op"]).setdefault(alert["symbol"], []), (alert["price"], alert["id"]))
+
+
+def add(chat, user, symbol, op, price):
+    global _next_id
+    load()
+    with _lock:
+        alert = {"id": _next_id, "chat": chat, "user": user, "symbol": price_history.norm(symbol),
+                 "op": op, "price": float(price), "created": time.time()}
+        _next_id += 1
+        ALERTS[alert["id"]] = alert
+        _index(alert)
+    binance_stream.track(alert["symbol"] + "USDT")     # live ticks for Binance-listed symbols
+    _save_later()
+    return alert
+
+
+def remove(alert_id):
+    with _lock:
+        alert = ALERTS.pop(alert_id, None)
+        if alert:
+            book = _book(alert["op"]).get(alert["symbol"], [])
+            i = bisect.bisect_left(book, (alert["price"], alert_id))
+            if i < len(book) and book[i] == (alert["price"], alert_id):
+                del book[i]
+    if alert:
+        _save_later()
+    return alert
+
+
+def user_alerts(user):
+    with _lock:
+        return sorted((a for a in ALERTS.values() if a["user"] == user), key=lambda a: a["id"])
+
+
+# === EVALUATION ===
+def check(symbol, price, source=""):
+    """price_history listener: fire every alert this price crosses."""
+    with _lock:
+        above, below = ABOVE.get(symbol), BELOW.get(symbol)
+        fired = []
+        if above and above[0][0] <= price:
+            i = bisect.bisect_right(above, (price, float("inf")))
+            fired += above[:i]
+            del above[:i]
+        if below and below[-1][0] >= price:
+            i = bisect.bisect_left(below, (price, -1))
+            fired += below[i:]
+            del below[i:]
+        if not fired:
+            return 0
+        for _, alert_id in fired:
+            alert = ALERTS.pop(alert_id)
+            word = "above" if alert["op"] == ">" else "below"
+            OUTBOX.append((alert["chat"], f"🚨 <b>{symbol}</b> is {word} ${alert['price']:,.8g} — "
+                                          f"now <b>${price:,.8g}</b>\n\n{BRAND_TAG}"))
+    log(f"🔔 {symbol} @ {price:,.8g}: {len(fired)} alert(s) fired")
+    _save_later()
+    return len(fired)
+
+
+def deliver_job(context: CallbackContext):
+    """Drain the outbox at SEND_PER_TICK messages per run."""
+    global _paused_until
+    if time.time() < _paused_until:
+        return
+    sent = 0
+    while sent < SEND_PER_TICK:
+        with _lock:
+            if not OUTBOX:
+                break
+            chat, text = OUTBOX.popleft()
+        try:
+            context.bot.send_message(chat_id=chat, text=text, parse_mode="HTML")
+            sent += 1
+        except RetryAfter as e:
+            with _lock:
+                OUTBOX.appendleft((chat, text))
+            _paused_until = time.time() + e.retry_after
+            log(f"⏳ Flood control — pausing {e.retry_after}s")
+            break
+        except (Unauthorized, BadRequest) as e:       # bot blocked / chat gone — drop it
+            log(f"⚠️ Dropped alert for {chat}: {e}")
+        except TelegramError as e:                    # network hiccup — retry next run
+            with _lock:
+                OUTBOX.appendleft((chat, text))
+            log(f"⚠️ Delivery failed: {e}")
+            break
+    if sent:
+        _save_later()
+
+
+# === PERSISTENCE ===
+def load():
+    global _loaded, _next_id
+    with _lock:
+        if _loaded:
+            return
+        _loaded = True
+        try:
+            with open(ALERTS_FILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            data = {}
+        for alert in data.get("alerts", []):
+            ALERTS[alert["id"]] = alert
+            _index(alert)
+        OUTBOX.extend(tuple(m) for m in data.get("outbox", []))
+        _next_id = max([data.get("next_id", 1)] + [i + 1 for i in ALERTS])
+    if ALERTS or OUTBOX:
+        log(f"📦 Loaded {len(ALERTS)} alerts, {len(OUTBOX)} undelivered")
+
+
+def save():
+    with _lock:
+        data = {"next_id": _next_id, "alerts": list(ALERTS.values()), "outbox": list(OUTBOX)}
+    os.makedirs(os.path.dirname(ALERTS_FILE), exist_ok=True)
+    tmp = f"{ALERTS_FILE}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, ALERTS_FILE)
+
+
+def _save_later():
+    # Don't push a queued save back — steady ticks would postpone it forever
+    if not scheduler.pending("price_alerts.save"):
+        scheduler.once("price_alerts.save", save, SAVE_DELAY, owner="price_alerts")
+
+
+def start_alerts(dispatcher):
+    load()
+    price_history.subscribe(check)
+
+
+def stop_alerts(dispatcher):
+    # Before a reload: this module's state must stop firing, and the pending
+    # debounced save is about to be cancelled with the rest of our tasks
+    price_history.unsubscribe(check)
+    if _loaded:
+        save()
+
+
+# === COMMANDS ===
+ALERT_RE = re.compile(r"^\$?([A-Za-z0-9]{1,20})\s*([<>])\s*\$?([0-9][0-9,]*\.?[0-9]*(?:e-?[0-9]+)?)$")
+
+
+def alert_cmd(update: Update, context: CallbackContext):
+    m = ALERT_RE.match(" ".join(context.args or []))
+    if not m:
+        update.message.reply_text("💡 Usage: /alert <symbol> >|< <price>\nExample: /alert bnb > 700")
+        return
+    symbol, op, price = m.group(1), m.group(2), float(m.group(3).replace(",", ""))
+    user = update.effective_user.id
+    if price <= 0:
+        update.message.reply_text("⚠️ Price must be above zero.")
+        return
+    if len(user_alerts(user)) >= MAX_PER_USER:
+        update.message.reply_text(f"⚠️ You already have {MAX_PER_USER} alerts — /unalert one first.")
+        return
+    alert = add(update.effective_chat.id, user, symbol, op, price)
+    last = price_history.last_price(alert["symbol"])
+    now = f"\n📊 Last seen: ${last[1]:,.8g}" if last else ""
+    update.message.reply_text(
+        f"✅ Alert #{alert['id']}: <b>{alert['symbol']}</b> {'above' if op == '>' else 'below'} "
+        f"${price:,.8g}{now}", parse_mode="HTML")
+
+
+def alerts_cmd(update: Update, context: CallbackContext):
+    alerts = user_alerts(update.effective_user.id)
+    if not alerts:
+        update.message.reply_text("📭 No active alerts — set one with /alert bnb > 700")
+        return
+    lines = [f"#{a['id']}  <b>{a['symbol']}</b> {a['op']} ${a['price']:,.8g}" for a in alerts]
+    update.message.reply_text("🔔 <b>Your alerts</b>\n" + "\n".join(lines), parse_mode="HTML")
+
+
+def unalert_cmd(update: Update, context: CallbackContext):
+    args = context.args or []
+    if not args or not args[0].lstrip("#").isdigit():
+        update.message.reply_text("💡 Usage: /unalert <id> — see /alerts")
+        return
+    alert_id = int(args[0].lstrip("#"))
+    with _lock:
+        alert = ALERTS.get(alert_id)
+        if not alert or alert["user"] != update.effective_user.id:
+            alert = None
+    if alert is None:
+        update.message.reply_text("⚠️ No such alert.")
+        return
+    remove(alert_id)
+    update.message.reply_text(f"🗑️ Alert #{alert_id} removed.")
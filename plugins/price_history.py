@@ -0,0 +1,300 @@
+"""
+WENBNB Price History v1.0 — Local Price Time-Series + /chart
+──────────────────────────────────────────────────────────────────────────────
+• record(symbol, price) is called from every price fetch (price_tracker,
+  tokeninfo, web3_connect, token_resolver quotes) — raw samples go into a
+  per-symbol NumPy ring buffer
+• Each sample rolls straight into 1m / 5m / 1h OHLC candles (update the
+  open candle or start the next one) — no rescans of the raw samples
+• Everything persists to one compressed data/price_history.npz
+• subscribe(fn) — fn(symbol, price, source) runs on every accepted sample
+  (price_alerts evaluates its thresholds there)
+• /chart <symbol> [1h|6h|24h|7d|30d] renders a PNG on a small worker pool
+  (matplotlib Agg, imported on first use); images are cached per
+  (symbol, window, last candle) so a repeat /chart is a dict lookup
+
+    price_history.record("BNB", 612.4, source="binance")
+    price_history.candles("BNB", 300, since=time.time() - 86400)
+"""
+
+import io, os, re, threading, time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from telegram import Update
+from telegram.ext import CallbackContext
+
+HISTORY_FILE = "data/price_history.npz"
+SAMPLE_CAPACITY = int(os.getenv("PRICE_HISTORY_SAMPLES", "2048"))   # raw samples per symbol
+CANDLE_CAPACITY = {60: 1440, 300: 2016, 3600: 720}                  # 1 day / 1 week / 30 days
+MIN_GAP = 1.0                 # seconds — repeat samples inside this are folded
+MAX_SYMBOLS = 500
+WINDOWS = {"1h": 3600, "6h": 6 * 3600, "24h": 86400, "7d": 7 * 86400, "30d": 30 * 86400}
+DEFAULT_WINDOW = "24h"
+MAX_BARS = 300                # pick the finest resolution that fits the window in this many bars
+CHART_WORKERS = 2
+IMAGE_CACHE = 64
+RENDER_TIMEOUT = 30
+BRAND_TAG = "💫 Powered by <b>WENBNB Neural Engine</b> — Neural Market Feed ⚡"
+
+PLUGIN_MANIFEST = {
+    "commands": {"chart": "chart_cmd"},
+    "jobs": [{"callback": "save_job", "interval": 300, "env": "PRICE_HISTORY_SAVE_SECONDS"}],
+}
+
+# === STATE ===
+SERIES = {}                   # symbol -> {"samples": Ring, 60: Ring, 300: Ring, 3600: Ring}
+LISTENERS = []                # fn(symbol, price, source) per accepted sample (copy-on-write)
+_images = OrderedDict()       # (symbol, window, last candle) -> png bytes
+_pool = None
+_lock = threading.Lock()
+_loaded = False
+_dirty = False
+
+
+def log(msg):
+    print(f"[PriceHistory] {msg}")
+
+
+class Ring:
+    """Fixed-size NumPy ring buffer of rows; oldest rows are overwritten."""
+
+    def __init__(self, capacity, width, data=None):
+        self.buf = np.zeros((capacity, width))
+        self.head = 0
+        self.count = 0
+        if data is not None and len(data):
+            data = data[-capacity:]
+            self.buf[:len(data)] = data
+            self.count = len(data)
+            self.head = self.count % capacity
+
+    def append(self, row):
+        self.buf[self.head] = row
+        self.head = (self.head + 1) % len(self.buf)
+        self.count = min(self.count + 1, len(self.buf))
+
+    def last(self):
+        return self.buf[self.head - 1] if self.count else None
+
+    def view(self):
+        """Rows oldest → newest (a copy)."""
+        if self.count < len(self.buf):
+            return self.buf[:self.count].copy()
+        return np.concatenate([self.buf[self.head:], self.buf[:self.head]])
+
+
+def norm(symbol):
+    return (symbol or "").strip().lstrip("$").upper()
+
+
+def _series(symbol):
+    s = SERIES.get(symbol)
+    if s is None:
+        if len(SERIES) >= MAX_SYMBOLS:
+            return None
+        s = SERIES[symbol] = {"samples": Ring(SAMPLE_CAPACITY, 2)}
+        for res, cap in CANDLE_CAPACITY.items():
+            s[res] = Ring(cap, 6)          # bucket ts, open, high, low, close, samples
+    return s
+
+
+# === RECORD ===
+def record(symbol, price, ts=None, source=""):
+    """Add one price sample and roll it into every candle resolution."""
+    global _dirty
+    try:
+        price = float(price)
+    except (TypeError, ValueError):
+        return
+    symbol = norm(symbol)
+    if not symbol or not price > 0:
+        return
+    ts = ts or time.time()
+    load()
+    with _lock:
+        s = _series(symbol)
+        if s is None:
+            return
+        last = s["samples"].last()
+        if last is not None and ts - last[0] < MIN_GAP and last[1] == price:
+            return
+        s["samples"].append((ts, price))
+        for res in CANDLE_CAPACITY:
+            ring, bucket = s[res], ts - ts % res
+            c = ring.last()
+            if c is not None and c[0] == bucket:       # still inside the open candle
+                c[2], c[3], c[4], c[5] = max(c[2], price), min(c[3], price), price, c[5] + 1
+            elif c is None or bucket > c[0]:
+                ring.append((bucket, price, price, price, price, 1))
+            # older than the open candle (late sample) → raw samples only
+        _dirty = True
+    for fn in LISTENERS:
+        try:
+            fn(symbol, price, source)
+        except Exception as e:
+            log(f"⚠️ Listener {fn.__module__}.{fn.__name__} failed: {e}")
+
+
+def _same(a, b):
+    return a is b or (a.__module__, a.__qualname__) == (b.__module__, b.__qualname__)
+
+
+def subscribe(fn):
+    """Add a listener; one from a reloaded module replaces its old copy."""
+    global LISTENERS
+    with _lock:
+        LISTENERS = [f for f in LISTENERS if not _same(f, fn)] + [fn]
+
+
+def unsubscribe(fn):
+    global LISTENERS
+    with _lock:
+        LISTENERS = [f for f in LISTENERS if not _same(f, fn)]
+
+
+def candles(symbol, res, since=0):
+    """(n × 6) array [ts, open, high, low, close, samples] for one resolution."""
+    load()
+    with _lock:
+        s = SERIES.get(norm(symbol))
+        rows = s[res].view() if s else np.zeros((0, 6))
+    return rows[rows[:, 0] >= since - res] if since else rows
+
+
+def last_price(symbol):
+    s = SERIES.get(norm(symbol))
+    row = s["samples"].last() if s else None
+    return None if row is None else (float(row[0]), float(row[1]))
+
+
+# === PERSISTENCE ===
+def load():
+    global _loaded
+    if _loaded:
+        return
+    with _lock:
+        if _loaded:
+            return
+        _loaded = True
+        try:
+            with np.load(HISTORY_FILE) as data:
+                for key in data.files:
+                    symbol, kind = key.rsplit("|", 1)
+                    s = _series(symbol)
+                    if s is None:
+                        continue
+                    if kind == "samples":
+                        s["samples"] = Ring(SAMPLE_CAPACITY, 2, data[key])
+                    elif int(kind) in CANDLE_CAPACITY:
+                        s[int(kind)] = Ring(CANDLE_CAPACITY[int(kind)], 6, data[key])
+        except (FileNotFoundError, OSError, ValueError):
+            pass
+    if SERIES:
+        log(f"📦 Loaded {len(SERIES)} symbols")
+
+
+def save():
+    global _dirty
+    with _lock:
+        arrays = {f"{symbol}|{kind}": ring.view() for symbol, s in SERIES.items() for kind, ring in s.items()}
+        _dirty = False
+    os.makedirs(os.path.dirname(HISTORY_FILE), exist_ok=True)
+    tmp = f"{HISTORY_FILE}.tmp.npz"
+    np.savez_compressed(tmp, **arrays)
+    os.replace(tmp, HISTORY_FILE)
+
+
+def save_job(context: CallbackContext):
+    if _dirty:
+        save()
+
+
+# === CHART ===
+def pick_resolution(seconds):
+    for res in sorted(CANDLE_CAPACITY):
+        if seconds / res <= MAX_BARS and seconds <= res * CANDLE_CAPACITY[res]:
+            return res
+    return max(CANDLE_CAPACITY)
+
+
+def render(symbol, window, rows, res):
+    """PNG bytes — OO matplotlib API (no pyplot state), safe on worker threads."""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=(8, 4), dpi=100, facecolor="#0e1117")
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111, facecolor="#0e1117")
+    x = np.arange(len(rows))
+    up = rows[:, 4] >= rows[:, 1]
+    for mask, color in ((up, "#16c784"), (~up, "#ea3943")):
+        ax.vlines(x[mask], rows[mask, 3], rows[mask, 2], color=color, linewidth=1)
+        ax.bar(x[mask], np.abs(rows[mask, 4] - rows[mask, 1]), bottom=np.minimum(rows[mask, 1], rows[mask, 4]),
+               width=0.7, color=color)
+    ticks = np.linspace(0, len(rows) - 1, num=min(6, len(rows)), dtype=int)
+    fmt = "%H:%M" if WINDOWS[window] <= 86400 else "%d %b"
+    ax.set_xticks(ticks, [time.strftime(fmt, time.localtime(rows[i, 0])) for i in ticks])
+    ax.tick_params(colors="#c9d1d9", labelsize=8)
+    for spine in ax.spines.values():
+        spine.set_color("#30363d")
+    ax.grid(color="#30363d", linewidth=0.5)
+    ax.set_title(f"{symbol} — {window} ({res // 60}m candles)", color="#c9d1d9")
+    fig.tight_layout()
+    out = io.BytesIO()
+    fig.savefig(out, format="png", facecolor=fig.get_facecolor())
+    return out.getvalue()
+
+
+def chart(symbol, window=DEFAULT_WINDOW):
+    """PNG bytes for a symbol / window, or None without history. Cached per last candle."""
+    global _pool
+    symbol, seconds = norm(symbol), WINDOWS[window]
+    res = pick_resolution(seconds)
+    rows = candles(symbol, res, since=time.time() - seconds)
+    if len(rows) == 0:
+        return None
+    key = (symbol, window, tuple(rows[-1]))
+    with _lock:
+        png = _images.get(key)
+        if png is not None:
+            _images.move_to_end(key)
+            return png
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=CHART_WORKERS, thread_name_prefix="wenbnb-chart")
+        pool = _pool
+    png = pool.submit(render, symbol, window, rows, res).result(timeout=RENDER_TIMEOUT)
+    with _lock:
+        _images[key] = png
+        while len(_images) > IMAGE_CACHE:
+            _images.popitem(last=False)
+    return png
+
+
+def chart_cmd(update: Update, context: CallbackContext):
+    args = context.args or []
+    if not args:
+        update.message.reply_text(f"💡 Usage: /chart <symbol> [{'|'.join(WINDOWS)}]")
+        return
+    symbol = norm(args[0])
+    window = args[1].lower() if len(args) > 1 else DEFAULT_WINDOW
+    if window not in WINDOWS:
+        update.message.reply_text(f"⚠️ Window must be one of: {', '.join(WINDOWS)}")
+        return
+    if not re.match(r"^[A-Z0-9]{1,20}$", symbol):
+        update.message.reply_text("⚠️ Use a token symbol, e.g. /chart BNB 24h")
+        return
+    try:
+        png = chart(symbol, window)
+    except Exception as e:
+        log(f"⚠️ Render failed for {symbol}: {e}")
+        update.message.reply_text("⚙️ Chart engine busy — please retry shortly.")
+        return
+    if png is None:
+        update.message.reply_text(
+            f"📭 No price history for <b>{symbol}</b> yet — /price {symbol} starts recording it.",
+            parse_mode="HTML")
+        return
+    _, price = last_price(symbol)
+    update.message.reply_photo(io.BytesIO(png), caption=f"📈 <b>{symbol}</b> — {window} | last ${price:,.8g}\n\n{BRAND_TAG}",
+                               parse_mode="HTML")
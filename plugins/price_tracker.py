@@ -1,12 +1,11 @@
 # --- WENBNB Market Feed v8.5.2 “Easter Pulse Edition” ⚡ ---
 # (Upgraded from v8.5.1 - Zero data impact, flavor + health monitoring added)
 
-from telegram.ext import CommandHandler
 import requests, html, random, math, time, logging
+from plugins import binance_stream, metrics_exporter, price_history, token_resolver
 
 # === Branding ===
 BRAND_FOOTER = "💫 Powered by <b>WENBNB Neural Engine</b> — Neural Market Feed v8.5.2 ⚡"
-DEXSCREENER_SEARCH = "https://api.dexscreener.io/latest/dex/search?q={q}"
 COINGECKO_SIMPLE = "https://api.coingecko.com/api/v3/simple/price?ids={id}&vs_currencies=usd"
 BINANCE_SIMPLE = "https://api.binance.com/api/v3/ticker/price?symbol={symbol}"
 
@@ -30,14 +29,6 @@ def short_float(x):
     except Exception:
         return str(x)
 
-def detect_chain(dex_id):
-    d = (dex_id or "").lower()
-    if "pancake" in d: return "BSC"
-    if "uniswap" in d: return "Ethereum"
-    if "base" in d: return "Base"
-    if "arbitrum" in d: return "Arbitrum"
-    return "Unknown"
-
 def neural_rank(liq, vol):
     try:
         L = max(1.0, float(liq))
@@ -52,11 +43,14 @@ def neural_rank(liq, vol):
 
 def cache_get(t):
     if t in price_cache and time.time() - price_cache[t][1] < CACHE_EXPIRY:
+        metrics_exporter.cache_hit("price", True)
         return price_cache[t][0]
+    metrics_exporter.cache_hit("price", False)
     return None
 
 def cache_set(t, p):
     price_cache[t] = (p, time.time())
+    price_history.record(t, p)
 
 # === Neural Pulse Easter Egg ===
 def neural_easter():
@@ -92,17 +86,37 @@ def price_cmd(update, context):
             log_heartbeat(success=True)
             return
 
+        # --- Known miss: every source said "no such token" recently ---
+        if token_resolver.is_missing(token):
+            hint = ", ".join(token_resolver.suggest(token))
+            update.message.reply_text(
+                f"🔍 No market data for <b>{html.escape(token)}</b> — check the symbol or contract."
+                + (f"\n💡 Did you mean: {html.escape(hint)}" if hint else "") + f"\n\n{BRAND_FOOTER}",
+                parse_mode="HTML"
+            )
+            log_heartbeat(success=True)
+            return
+
         context.bot.send_chat_action(chat_id=update.effective_chat.id, action="typing")
 
-        price, source = cache_get(token), "Binance (cached)"
+        # answered stays True only while every source replied "no such token" —
+        # an error / timeout / rate limit must never become a cached miss
+        answered = True
+        price, source = binance_stream.price(KNOWN_TOKENS.get(token, "")), "Binance (live)"
+        if not price:
+            price, source = cache_get(token), "Binance (cached)"
         if not price:
             # 1️⃣ Binance
             try:
                 if token in KNOWN_TOKENS:
                     data = requests.get(BINANCE_SIMPLE.format(symbol=KNOWN_TOKENS[token]), timeout=6).json()
                     price = data.get("price"); source = "Binance"
-                    if price: cache_set(token, price)
-            except: pass
+                    if price:
+                        cache_set(token, price)
+                        binance_stream.track(KNOWN_TOKENS[token])
+                    elif data.get("code") != -1121:     # anything but "Invalid symbol"
+                        answered = False
+            except: answered = False
 
             # 2️⃣ CoinGecko
             if not price:
@@ -110,19 +124,21 @@ def price_cmd(update, context):
                     cg = requests.get(COINGECKO_SIMPLE.format(id=token.lower()), timeout=6).json()
                     price = cg.get(token.lower(), {}).get("usd"); source = "CoinGecko"
                     if price: cache_set(token, price)
-                except: pass
+                    elif not isinstance(cg, dict) or "status" in cg or "error" in cg:   # rate limit / error body
+                        answered = False
+                except: answered = False
 
             # 3️⃣ Dex Screener Fallback
             if not price:
                 try:
-                    dex = requests.get(DEXSCREENER_SEARCH.format(q=token), timeout=6).json()
-                    pair = dex.get("pairs", [])[0]
-                    base = pair.get("baseToken", {})
-                    name, symbol = base.get("name", token), base.get("symbol", token)
-                    price = pair.get("priceUsd"); source = pair.get("dexId", "DexScreener")
-                    liq, vol = pair.get("liquidity", {}).get("usd", 0), pair.get("volume", {}).get("h24", 0)
-                    rank, chain = neural_rank(liq, vol), detect_chain(source)
-                    chart = pair.get("url", "")
+                    quote = token_resolver.find_pair(token)     # PairQuote
+                    if not quote:
+                        raise LookupError(token)
+                    name, symbol = quote.name or token, quote.symbol or token
+                    price = quote.price; source = quote.dex or "DexScreener"
+                    liq, vol = quote.liquidity, quote.volume24
+                    rank, chain = neural_rank(liq, vol), quote.chain_label
+                    chart = quote.url
                     insight = random.choice([
                         f"{symbol} volatility rising — traders alert 🔥",
                         f"{symbol} gaining strong momentum 💎",
@@ -145,7 +161,10 @@ def price_cmd(update, context):
                     update.message.reply_text(msg, parse_mode="HTML", disable_web_page_preview=False)
                     log_heartbeat(success=True)
                     return
+                except LookupError:                     # DexScreener answered: no pairs
+                    log_heartbeat(success=False)
                 except:
+                    answered = False
                     log_heartbeat(success=False)
 
         if price:
@@ -160,6 +179,8 @@ def price_cmd(update, context):
             update.message.reply_text(msg, parse_mode="HTML", disable_web_page_preview=True)
             log_heartbeat(success=True)
         else:
+            if answered:
+                token_resolver.miss(token)
             update.message.reply_text(
                 "⚠️ Neural Feed unavailable — system will auto-sync soon.\n\n" + BRAND_FOOTER,
                 parse_mode="HTML"
@@ -170,6 +191,6 @@ def price_cmd(update, context):
         log_heartbeat(success=False)
         update.message.reply_text("⚙️ Neural Engine syncing... please retry soon.", parse_mode="HTML")
 
-def register(dispatcher, core=None):
-    dispatcher.add_handler(CommandHandler("price", price_cmd))
-    print("✅ Loaded plugin: plugins.price_tracker (v8.5.2 Easter Pulse Edition)")
+PLUGIN_MANIFEST = {
+    "commands": {"price": "price_cmd"},
+}
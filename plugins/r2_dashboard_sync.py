@@ -1,44 +1,55 @@
 import os
-import boto3
-from botocore.client import Config
 import json
-from datetime import datetime
 
-S3_ENABLED = os.getenv("S3_ENABLED", "false").lower() == "true"
-S3_BUCKET = os.getenv("S3_BUCKET")
-S3_REGION = os.getenv("S3_REGION", "auto")
-S3_ACCESS_KEY = os.getenv("S3_ACCESS_KEY")
-S3_SECRET_KEY = os.getenv("S3_SECRET_KEY")
-S3_ENDPOINT = os.getenv("S3_ENDPOINT")
+from plugins import r2_sync
+
+S3_ENABLED = r2_sync.S3_ENABLED
+S3_BUCKET = r2_sync.S3_BUCKET
+LATEST_CACHE_FILE = "data/r2_latest.json"
 
 def get_r2_client():
+    return r2_sync.get_r2_client()
+
+def list_backups(limit=20):
+    """📚 Newest-first backup entries from the catalog (no bucket listing)"""
     if not S3_ENABLED:
-        raise RuntimeError("R2 storage disabled")
-    return boto3.client(
-        "s3",
-        region_name=S3_REGION,
-        endpoint_url=S3_ENDPOINT,
-        aws_access_key_id=S3_ACCESS_KEY,
-        aws_secret_access_key=S3_SECRET_KEY,
-        config=Config(signature_version="s3v4")
-    )
-
-def fetch_latest_backup():
-    """📊 Fetch most recent backup file from R2"""
+        return {"error": "Cloud sync disabled"}
+    try:
+        catalog = r2_sync.fetch_catalog()
+        entries = catalog.get("backups", [])
+        return {
+            "updated": catalog.get("updated"),
+            "count": len(entries),
+            "backups": entries[::-1][:limit],
+        }
+    except Exception as e:
+        return {"error": str(e)}
+
+def fetch_latest_backup(include_data=True):
+    """📊 Latest backup from the catalog; JSON backups are downloaded once per ETag"""
     if not S3_ENABLED:
         return {"error": "Cloud sync disabled"}
     try:
-        s3 = get_r2_client()
-        files = s3.list_objects_v2(Bucket=S3_BUCKET)
-        if "Contents" not in files:
+        latest = r2_sync.fetch_catalog().get("latest")
+        if not latest:
             return {"error": "No backups found"}
-        sorted_files = sorted(files["Contents"], key=lambda x: x["LastModified"], reverse=True)
-        latest_file = sorted_files[0]["Key"]
-        local_file = f"tmp_latest.json"
-        s3.download_file(S3_BUCKET, latest_file, local_file)
-        with open(local_file, "r") as f:
-            data = json.load(f)
-        print(f"✅ Dashboard sync: {latest_file}")
+        if not include_data or not latest["key"].endswith(".json"):
+            return latest
+
+        try:
+            with open(LATEST_CACHE_FILE, "r") as f:
+                cached = json.load(f)
+            if cached.get("etag") == latest["etag"]:
+                return cached["data"]
+        except (FileNotFoundError, ValueError):
+            pass
+
+        body = get_r2_client().get_object(Bucket=S3_BUCKET, Key=latest["key"])["Body"].read()
+        data = json.loads(body)
+        os.makedirs(os.path.dirname(LATEST_CACHE_FILE), exist_ok=True)
+        with open(LATEST_CACHE_FILE, "w") as f:
+            json.dump({"etag": latest["etag"], "data": data}, f)
+        print(f"✅ Dashboard sync: {latest['key']}")
         return data
     except Exception as e:
         return {"error": str(e)}
@@ -47,3 +58,4 @@ def fetch_latest_backup():
 if __name__ == "__main__":
     result = fetch_latest_backup()
     print(json.dumps(result, indent=2))
+    print(json.dumps(list_backups(), indent=2, default=str))
@@ -1,31 +1,317 @@
 import os
-import boto3
-from botocore.client import Config
 from datetime import datetime
-import json
+import base64, hashlib, json, threading, time
+from concurrent.futures import ThreadPoolExecutor
 
 # ───────────────────────────────────────────────
 # 🌩️  Load R2 environment
 S3_ENABLED = os.getenv("S3_ENABLED", "false").lower() == "true"
-S3_BUCKET = os.getenv("S3_BUCKET")
+S3_BUCKET = os.getenv("S3_BUCKET") or os.getenv("R2_BUCKET_NAME")
 S3_REGION = os.getenv("S3_REGION", "auto")
-S3_ACCESS_KEY = os.getenv("S3_ACCESS_KEY")
-S3_SECRET_KEY = os.getenv("S3_SECRET_KEY")
-S3_ENDPOINT = os.getenv("S3_ENDPOINT")
+S3_ACCESS_KEY = os.getenv("S3_ACCESS_KEY") or os.getenv("R2_ACCESS_KEY_ID")
+S3_SECRET_KEY = os.getenv("S3_SECRET_KEY") or os.getenv("R2_SECRET_ACCESS_KEY")
+S3_ENDPOINT = os.getenv("S3_ENDPOINT") or os.getenv("R2_ENDPOINT")
+S3_ADDRESSING = os.getenv("S3_ADDRESSING_STYLE", "path")   # local stand-ins need path-style
+
+# Multipart pipeline: memory stays around (UPLOAD_WORKERS + 1) × PART_SIZE
+PART_SIZE = max(int(os.getenv("S3_PART_MB", "8")), 5) * 1024 * 1024   # S3 minimum is 5 MB
+UPLOAD_WORKERS = int(os.getenv("S3_UPLOAD_WORKERS", "4"))
+UPLOAD_STATE_FILE = "data/r2_uploads.json"
+# Integrity comes from Content-MD5 on every part (the server rejects a bad
+# body). ETag == MD5 only holds on plain S3/R2 — SSE-KMS/SSE-C buckets,
+# other S3-compatibles and proxies return opaque ETags — so a mismatch
+# is a warning unless S3_STRICT_ETAG=true
+STRICT_ETAG = os.getenv("S3_STRICT_ETAG", "false").lower() == "true"
+BACKUP_PREFIX = "backups/"
+
+# Catalog: one small manifest object listing every upload, so "latest" /
+# "list" never walk the bucket. Local copy is revalidated by ETag.
+CATALOG_KEY = os.getenv("S3_CATALOG_KEY", f"{BACKUP_PREFIX}catalog.json")
+CATALOG_CACHE_FILE = "data/r2_catalog.json"
+CATALOG_TTL = int(os.getenv("S3_CATALOG_TTL", "60"))      # seconds without any request
+CATALOG_MAX = 1000
+
+_client = None
+_client_lock = threading.Lock()
+_state_lock = threading.Lock()
+_catalog_lock = threading.RLock()
 
 # ───────────────────────────────────────────────
-# 📦  Create R2 client
+# 📦  Create R2 client (cached — boto3 clients are thread-safe)
 def get_r2_client():
+    global _client
     if not S3_ENABLED:
         raise RuntimeError("R2 storage disabled (S3_ENABLED=false)")
-    return boto3.client(
-        "s3",
-        region_name=S3_REGION,
-        endpoint_url=S3_ENDPOINT,
-        aws_access_key_id=S3_ACCESS_KEY,
-        aws_secret_access_key=S3_SECRET_KEY,
-        config=Config(signature_version="s3v4")
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                import boto3  # deferred: only needed once cloud sync actually runs
+                from botocore.client import Config
+                _client = boto3.client(
+                    "s3",
+                    region_name=S3_REGION,
+                    endpoint_url=S3_ENDPOINT,
+                    aws_access_key_id=S3_ACCESS_KEY,
+                    aws_secret_access_key=S3_SECRET_KEY,
+                    config=Config(
+                        signature_version="s3v4",
+                        s3={"addressing_style": S3_ADDRESSING},
+                        max_pool_connections=UPLOAD_WORKERS * 2,
+                        retries={"max_attempts": 5, "mode": "standard"},
+                    )
+                )
+    return _client
+
+# ───────────────────────────────────────────────
+# 💾  Resumable upload state (upload id + finished parts per key)
+def _load_state():
+    try:
+        with open(UPLOAD_STATE_FILE, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _save_state(state):
+    os.makedirs(os.path.dirname(UPLOAD_STATE_FILE), exist_ok=True)
+    tmp = f"{UPLOAD_STATE_FILE}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, UPLOAD_STATE_FILE)
+
+
+def _update_state(key, entry):
+    with _state_lock:
+        state = _load_state()
+        if entry is None:
+            state.pop(key, None)
+        else:
+            state[key] = entry
+        _save_state(state)
+
+
+def _resume_point(s3, key):
+    """Existing upload id + {part_number: md5} already on the server, if resumable."""
+    entry = _load_state().get(key)
+    if not entry or entry.get("part_size") != PART_SIZE:
+        return None, {}
+    try:
+        done = {}
+        for page in s3.get_paginator("list_parts").paginate(
+                Bucket=S3_BUCKET, Key=key, UploadId=entry["upload_id"]):
+            for part in page.get("Parts", []):
+                done[part["PartNumber"]] = part["ETag"].strip('"')
+        return entry["upload_id"], done
+    except Exception:
+        return None, {}   # upload expired / aborted server-side — start over
+
+# ───────────────────────────────────────────────
+# 🚀  Streaming multipart upload
+def _parts(chunks, part_size):
+    """Re-slice an arbitrary byte-chunk iterator into part_size parts."""
+    buf = bytearray()
+    for data in chunks:
+        buf += data
+        while len(buf) >= part_size:
+            yield bytes(buf[:part_size])
+            del buf[:part_size]
+    if buf:
+        yield bytes(buf)
+
+
+def _put_part(s3, key, upload_id, number, body):
+    digest = hashlib.md5(body).digest()
+    resp = s3.upload_part(
+        Bucket=S3_BUCKET, Key=key, UploadId=upload_id, PartNumber=number, Body=body,
+        ContentMD5=base64.b64encode(digest).decode(),   # server rejects corrupted parts
     )
+    etag = resp["ETag"].strip('"')
+    if etag != digest.hex():
+        _etag_mismatch(f"part {number} ETag {etag} != MD5 {digest.hex()}")
+    return number, etag
+
+
+def _etag_mismatch(msg):
+    if STRICT_ETAG:
+        raise IOError(f"checksum mismatch: {msg}")
+    print(f"⚠️  R2 ETag is not an MD5 ({msg}) — relying on Content-MD5")
+
+
+def upload_stream(chunks, key, workers=UPLOAD_WORKERS, resume=True):
+    """
+    Stream byte chunks into an S3 multipart upload with bounded memory.
+    Parts go up in parallel with Content-MD5 (checked server-side); on
+    failure the upload is left open and recorded so the next call for the
+    same key (with the same byte stream) skips parts the server already has.
+    Returns {"key", "size", "etag", "parts", "resumed"}.
+    """
+    s3 = get_r2_client()
+    upload_id, done = _resume_point(s3, key) if resume else (None, {})
+    resumed = bool(upload_id)
+    if not upload_id:
+        upload_id = s3.create_multipart_upload(Bucket=S3_BUCKET, Key=key)["UploadId"]
+    _update_state(key, {"upload_id": upload_id, "part_size": PART_SIZE,
+                        "started": datetime.utcnow().isoformat()})
+
+    etags, digests, size, pending = {}, {}, 0, []
+    slots = threading.Semaphore(workers + 1)          # caps parts held in memory
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="r2-part") as pool:
+        def _release(_):
+            slots.release()
+
+        for number, body in enumerate(_parts(chunks, PART_SIZE), start=1):
+            size += len(body)
+            md5 = hashlib.md5(body).hexdigest()
+            digests[number] = md5
+            if done.get(number) == md5:
+                etags[number] = md5
+                continue
+            slots.acquire()
+            fut = pool.submit(_put_part, s3, key, upload_id, number, body)
+            fut.add_done_callback(_release)
+            pending.append(fut)
+        for fut in pending:
+            number, etag = fut.result()               # re-raises part failures
+            etags[number] = etag
+
+    if not etags:   # empty stream: S3 needs at least one part
+        etags[1] = _put_part(s3, key, upload_id, 1, b"")[1]
+        digests[1] = hashlib.md5(b"").hexdigest()
+
+    parts = [{"PartNumber": n, "ETag": f'"{etags[n]}"'} for n in sorted(etags)]
+    resp = s3.complete_multipart_upload(Bucket=S3_BUCKET, Key=key, UploadId=upload_id,
+                                        MultipartUpload={"Parts": parts})
+    expected = hashlib.md5(b"".join(bytes.fromhex(digests[n]) for n in sorted(digests))).hexdigest()
+    etag = resp["ETag"].strip('"')
+    if etag != f"{expected}-{len(parts)}":
+        _etag_mismatch(f"{key} ETag {etag} != {expected}-{len(parts)}")
+    _update_state(key, None)
+    return {"key": key, "size": size, "etag": etag, "parts": len(parts), "resumed": resumed}
+
+
+def abort_upload(key):
+    """Drop an unfinished upload (frees its parts server-side)."""
+    entry = _load_state().get(key)
+    if entry:
+        try:
+            get_r2_client().abort_multipart_upload(Bucket=S3_BUCKET, Key=key, UploadId=entry["upload_id"])
+        except Exception as e:
+            print(f"⚠️  Abort failed for {key}: {e}")
+        _update_state(key, None)
+
+
+# ───────────────────────────────────────────────
+# 📚  Backup catalog (manifest object + ETag-validated local cache)
+def _load_catalog_cache():
+    try:
+        with open(CATALOG_CACHE_FILE, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _save_catalog_cache(etag, catalog):
+    cache = {"etag": etag, "checked": time.time(), "catalog": catalog}
+    os.makedirs(os.path.dirname(CATALOG_CACHE_FILE), exist_ok=True)
+    tmp = f"{CATALOG_CACHE_FILE}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(cache, f)
+    os.replace(tmp, CATALOG_CACHE_FILE)
+    return cache
+
+
+def _empty_catalog():
+    return {"version": 1, "updated": None, "latest": None, "backups": []}
+
+
+def fetch_catalog(max_age=CATALOG_TTL):
+    """
+    The backup catalog. Served from the local copy while younger than
+    max_age; after that one conditional GET (If-None-Match) — a 304 costs
+    no body. Missing catalog → rebuilt once from a paginated listing.
+    """
+    cache = _load_catalog_cache()
+    if cache and time.time() - cache.get("checked", 0) < max_age:
+        return cache["catalog"]
+
+    from botocore.exceptions import ClientError
+    s3 = get_r2_client()
+    with _catalog_lock:
+        try:
+            kwargs = {"IfNoneMatch": f'"{cache["etag"]}"'} if cache.get("etag") else {}
+            resp = s3.get_object(Bucket=S3_BUCKET, Key=CATALOG_KEY, **kwargs)
+            catalog = json.loads(resp["Body"].read())
+            return _save_catalog_cache(resp["ETag"].strip('"'), catalog)["catalog"]
+        except ClientError as e:
+            code = e.response.get("Error", {}).get("Code")
+            status = e.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+            if status == 304 or code in ("304", "NotModified"):
+                return _save_catalog_cache(cache["etag"], cache["catalog"])["catalog"]
+            if code in ("NoSuchKey", "404"):
+                return rebuild_catalog()
+            raise
+
+
+def _write_catalog(catalog):
+    catalog["updated"] = datetime.utcnow().isoformat(timespec="seconds")
+    catalog["backups"] = catalog["backups"][-CATALOG_MAX:]
+    catalog["latest"] = catalog["backups"][-1] if catalog["backups"] else None
+    body = json.dumps(catalog, separators=(",", ":")).encode()
+    resp = get_r2_client().put_object(Bucket=S3_BUCKET, Key=CATALOG_KEY, Body=body,
+                                      ContentType="application/json")
+    _save_catalog_cache(resp["ETag"].strip('"'), catalog)
+    return catalog
+
+
+def rebuild_catalog():
+    """One-off paginated listing (bootstraps buckets from before the catalog)."""
+    s3 = get_r2_client()
+    entries = []
+    for page in s3.get_paginator("list_objects_v2").paginate(Bucket=S3_BUCKET):
+        for obj in page.get("Contents", []):
+            if obj["Key"] == CATALOG_KEY:
+                continue
+            entries.append({
+                "key": obj["Key"],
+                "size": obj["Size"],
+                "etag": obj["ETag"].strip('"'),
+                "uploaded": obj["LastModified"].strftime("%Y-%m-%dT%H:%M:%S"),
+            })
+    entries.sort(key=lambda e: e["uploaded"])
+    catalog = _empty_catalog()
+    catalog["backups"] = entries
+    print(f"📚 Rebuilt R2 catalog ({len(entries)} objects)")
+    return _write_catalog(catalog)
+
+
+def update_catalog(entry):
+    """Record a finished upload (single writer: the bot process)."""
+    with _catalog_lock:
+        catalog = fetch_catalog(max_age=0)
+        catalog["backups"] = [e for e in catalog["backups"] if e["key"] != entry["key"]]
+        catalog["backups"].append(entry)
+        return _write_catalog(catalog)
+
+
+def _record_upload(result, **extra):
+    try:
+        update_catalog(dict({
+            "key": result["key"],
+            "size": result["size"],
+            "etag": result["etag"],
+            "uploaded": datetime.utcnow().isoformat(timespec="seconds"),
+        }, **extra))
+    except Exception as e:
+        print(f"⚠️  Catalog update failed for {result['key']}: {e}")
+
+
+def _file_chunks(path, size=1024 * 1024):
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(size)
+            if not data:
+                return
+            yield data
 
 # ───────────────────────────────────────────────
 # 🧠  Upload telemetry / backup file
@@ -38,15 +324,40 @@ def upload_backup(local_path: str, remote_name: str = None):
         timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
         remote_name = f"backup_{timestamp}.json"
 
-    s3 = get_r2_client()
     try:
-        s3.upload_file(local_path, S3_BUCKET, remote_name)
+        _record_upload(upload_stream(_file_chunks(local_path), remote_name))
         print(f"✅ Uploaded {remote_name} → R2 bucket {S3_BUCKET}")
         return True
     except Exception as e:
         print(f"❌ Upload failed: {e}")
         return False
 
+
+def upload_snapshot(snapshot_id=None):
+    """Stream a backup_engine snapshot as a ZIP straight into R2 (no temp file)."""
+    if not S3_ENABLED:
+        print("⚠️  Cloud sync skipped (S3 disabled).")
+        return None
+    from plugins import backup_engine
+    snapshot_id = snapshot_id or (backup_engine.list_snapshots() or [None])[-1]
+    if not snapshot_id:
+        return None
+    key = f"{BACKUP_PREFIX}WENBNB_Backup_{snapshot_id}.zip"
+    try:
+        get_r2_client().head_object(Bucket=S3_BUCKET, Key=key)
+        return {"key": key, "skipped": True}       # already uploaded
+    except Exception:
+        pass
+    try:
+        result = upload_stream(backup_engine.stream_zip(snapshot_id), key)
+        _record_upload(result, snapshot=snapshot_id)
+        print(f"✅ Uploaded {key} ({result['size'] / 1048576:.2f} MB, "
+              f"{result['parts']} parts{', resumed' if result['resumed'] else ''}) → R2")
+        return result
+    except Exception as e:
+        print(f"❌ Snapshot upload failed (resumable): {e}")
+        return None
+
 # ───────────────────────────────────────────────
 # ⬇️  Download file (optional, for dashboard)
 def download_backup(remote_name: str, local_path: str):
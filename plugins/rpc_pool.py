@@ -0,0 +1,258 @@
+"""
+WENBNB RPC Pool v1.0 — Latency-Aware BSC Endpoint Routing + Failover
+──────────────────────────────────────────────────────────────────────────────
+• Several BSC JSON-RPC endpoints instead of one hardcoded node:
+  BSC_RPC_URLS (comma list) → BSC_RPC → config.json web3.rpc_url → public
+  dataseeds, in that priority order
+• Every request goes to the healthy endpoint with the lowest latency
+  (EWMA of live calls + background eth_blockNumber probes)
+• Read calls that time out, error or get rate-limited are retried on a
+  different node; the failing node cools down with exponential backoff
+• Nodes lagging more than MAX_LAG_BLOCKS behind the best head are stale
+  and skipped until they catch up
+• Per-endpoint latency / error stats: stats(), /rpc (admin), and the
+  rpc_ms / rpc_errors metrics
+
+    rpc_pool.post([{"jsonrpc": "2.0", "id": 1, "method": "eth_blockNumber", "params": []}])
+"""
+
+import html, json, os, re, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+import requests
+from telegram import Update
+from telegram.ext import CallbackContext
+
+from plugins import metrics_exporter
+
+DEFAULT_ENDPOINTS = [
+    "https://bsc-dataseed.binance.org/",
+    "https://bsc-dataseed1.defibit.io/",
+    "https://bsc-dataseed1.ninicoin.io/",
+    "https://bsc-rpc.publicnode.com/",
+]
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config.json")
+ADMIN_IDS = [5698007588]
+BRAND_TAG = "🚀 <b>WENBNB Neural Engine</b> — Web3 Intelligence 24×7 ⚡"
+
+RPC_TIMEOUT = 10
+PROBE_TIMEOUT = 4
+RETRIES = 2                  # extra endpoints tried for an idempotent read
+EWMA_ALPHA = 0.3
+PRIOR_MS = 400               # assumed latency of a node never measured yet
+COOLDOWN = 5                 # seconds benched after one failure, doubled per repeat
+MAX_COOLDOWN = 300
+MAX_LAG_BLOCKS = 40
+RATE_LIMIT_CODES = {-32005, -32090, 429}
+# -32005 also means "query returned too many results" on eth_getLogs — that is the
+# caller's range, not the node's health, so the message must say rate limit too
+RATE_LIMIT_RE = re.compile(r"rate|too many requests|request count|capacity", re.I)
+WRITE_METHODS = {"eth_sendRawTransaction", "eth_sendTransaction"}
+
+PLUGIN_MANIFEST = {
+    "commands": {"rpc": "rpc_status"},
+    "jobs": [{"callback": "health_check", "interval": 30, "first": 0, "env": "RPC_HEALTH_SECONDS"}],
+}
+
+
+def log(msg):
+    print(f"[RpcPool] {msg}")
+
+
+class Endpoint:
+    """One RPC node plus its running health record."""
+
+    def __init__(self, url, rank):
+        self.url = url
+        self.name = urlparse(url).netloc or url
+        self.rank = rank              # config order breaks latency ties
+        self.ewma_ms = None
+        self.calls = 0
+        self.errors = 0
+        self.consecutive = 0
+        self.down_until = 0.0
+        self.block = None
+        self.stale = False
+        self.last_error = None
+        self.last_probe = None
+
+    def healthy(self, now):
+        return now >= self.down_until and not self.stale
+
+    def score(self):
+        return (self.ewma_ms if self.ewma_ms is not None else PRIOR_MS, self.rank)
+
+    def snapshot(self, now):
+        return {
+            "name": self.name, "url": self.url, "healthy": self.healthy(now),
+            "latency_ms": self.ewma_ms, "calls": self.calls, "errors": self.errors,
+            "block": self.block, "stale": self.stale,
+            "down_for": max(self.down_until - now, 0), "last_error": self.last_error,
+        }
+
+
+# === ENDPOINTS ===
+def _configured_urls():
+    urls = [u.strip() for u in os.getenv("BSC_RPC_URLS", "").split(",") if u.strip()]
+    if os.getenv("BSC_RPC"):
+        urls.append(os.getenv("BSC_RPC"))
+    try:
+        with open(CONFIG_FILE, "r", encoding="utf-8") as f:
+            url = json.load(f).get("web3", {}).get("rpc_url")
+        if url:
+            urls.append(url)
+    except (OSError, ValueError):
+        pass
+    return list(dict.fromkeys(urls + DEFAULT_ENDPOINTS))
+
+
+ENDPOINTS = [Endpoint(u, i) for i, u in enumerate(_configured_urls())]
+_session = requests.Session()
+_lock = threading.Lock()
+
+
+def configure(urls):
+    """Replace the endpoint set (tests, load harness, runtime overrides)."""
+    global ENDPOINTS
+    with _lock:
+        ENDPOINTS = [Endpoint(u, i) for i, u in enumerate(dict.fromkeys(urls))]
+
+
+def pick(exclude=()):
+    """Lowest-latency healthy endpoint; if every node is benched, the one back soonest."""
+    now = time.time()
+    with _lock:
+        pool = [e for e in ENDPOINTS if e not in exclude]
+        if not pool:
+            return None
+        healthy = [e for e in pool if e.healthy(now)]
+        if healthy:
+            return min(healthy, key=Endpoint.score)
+        return min(pool, key=lambda e: (e.stale, e.down_until, e.rank))
+
+
+def _ok(ep, ms):
+    with _lock:
+        ep.calls += 1
+        ep.consecutive = 0
+        ep.down_until = 0.0
+        ep.ewma_ms = ms if ep.ewma_ms is None else ep.ewma_ms + EWMA_ALPHA * (ms - ep.ewma_ms)
+    metrics_exporter.observe("rpc_ms", ms, endpoint=ep.name)
+
+
+def _fail(ep, reason, error):
+    with _lock:
+        ep.calls += 1
+        ep.errors += 1
+        ep.consecutive += 1
+        ep.down_until = time.time() + min(COOLDOWN * 2 ** (ep.consecutive - 1), MAX_COOLDOWN)
+        ep.last_error = f"{reason}: {error}"[:160]
+    metrics_exporter.inc("rpc_errors", endpoint=ep.name, reason=reason)
+
+
+def _rate_limited(body):
+    for reply in body if isinstance(body, list) else [body]:
+        err = reply.get("error") if isinstance(reply, dict) else None
+        if err and err.get("code") in RATE_LIMIT_CODES and RATE_LIMIT_RE.search(str(err.get("message", ""))):
+            return True
+    return False
+
+
+# === REQUESTS ===
+def post(payload, timeout=RPC_TIMEOUT):
+    """Send a JSON-RPC request / batch; returns the decoded JSON body.
+
+    Reads fail over to the next-best node (up to RETRIES times); anything in
+    WRITE_METHODS goes out exactly once. Raises the last error if every try fails.
+    """
+    methods = {p.get("method") for p in (payload if isinstance(payload, list) else [payload])}
+    attempts = 1 if methods & WRITE_METHODS else RETRIES + 1
+    tried, error = [], None
+    for _ in range(attempts):
+        ep = pick(exclude=tried)
+        if ep is None:
+            break
+        if tried:
+            metrics_exporter.inc("rpc_failovers")
+        tried.append(ep)
+        started = time.perf_counter()
+        try:
+            r = _session.post(ep.url, json=payload, timeout=timeout)
+            r.raise_for_status()
+            body = r.json()
+        except requests.Timeout as e:
+            _fail(ep, "timeout", e); error = e
+            continue
+        except requests.HTTPError as e:
+            _fail(ep, "rate_limit" if e.response.status_code == 429 else "http", e); error = e
+            continue
+        except (requests.RequestException, ValueError) as e:
+            _fail(ep, "transport", e); error = e
+            continue
+        if _rate_limited(body):
+            error = requests.HTTPError(f"{ep.name} rate-limited the request")
+            _fail(ep, "rate_limit", error)
+            continue
+        _ok(ep, (time.perf_counter() - started) * 1000)
+        return body
+    raise error or requests.ConnectionError("no RPC endpoints configured")
+
+
+# === HEALTH ===
+def probe(ep):
+    """eth_blockNumber against one node — latency + head block for the stale check."""
+    started = time.perf_counter()
+    try:
+        r = _session.post(ep.url, json={"jsonrpc": "2.0", "id": 1, "method": "eth_blockNumber", "params": []},
+                          timeout=PROBE_TIMEOUT)
+        r.raise_for_status()
+        body = r.json()
+        block = int(body["result"], 16)
+    except Exception as e:
+        _fail(ep, "probe", e)
+        return None
+    _ok(ep, (time.perf_counter() - started) * 1000)
+    with _lock:
+        ep.block = block
+        ep.last_probe = time.time()
+    return block
+
+
+def check_all():
+    endpoints = list(ENDPOINTS)
+    with ThreadPoolExecutor(max_workers=max(len(endpoints), 1)) as pool:
+        blocks = list(pool.map(probe, endpoints))
+    head = max((b for b in blocks if b is not None), default=None)
+    with _lock:
+        for ep, block in zip(endpoints, blocks):
+            stale = head is not None and block is not None and head - block > MAX_LAG_BLOCKS
+            if stale and not ep.stale:
+                log(f"⚠️ {ep.name} is {head - block} blocks behind — skipping it")
+            ep.stale = stale
+    return head
+
+
+def health_check(context: CallbackContext):
+    check_all()
+
+
+def stats():
+    now = time.time()
+    with _lock:
+        return [e.snapshot(now) for e in sorted(ENDPOINTS, key=Endpoint.score)]
+
+
+# === /rpc (ADMIN) ===
+def rpc_status(update: Update, context: CallbackContext):
+    if update.effective_user.id not in ADMIN_IDS:
+        return update.message.reply_text("🚫 Only admin can view RPC endpoints.")
+
+    text = f"🛰️ <b>WENBNB RPC Pool</b> — {len(ENDPOINTS)} endpoints\n\n"
+    for s in stats():
+        state = "🟢" if s["healthy"] else ("🟡 stale" if s["stale"] else f"🔴 {s['down_for']:.0f}s")
+        latency = f"{s['latency_ms']:.0f} ms" if s["latency_ms"] is not None else "—"
+        text += (f"{state} <b>{s['name']}</b> — {latency} | calls {s['calls']} | "
+                 f"❌ {s['errors']} | block {s['block'] or '—'}\n")
+        if s["last_error"] and not s["healthy"]:
+            text += f"   <code>{html.escape(s['last_error'][:80])}</code>\n"
+    update.message.reply_text(text + f"\n{BRAND_TAG}", parse_mode="HTML")
@@ -0,0 +1,233 @@
+"""
+WENBNB Scheduler v1.0 — One Timing Wheel for Every Background Task
+──────────────────────────────────────────────────────────────────────────────
+• A single scheduler thread sleeps until the next due task (heap-ordered)
+  instead of a dozen daemon threads each sleeping on their own clock
+• Tasks run on a small worker pool — a slow task never delays the others
+• Stop per task (cancel), per plugin (cancel_owner) or globally (shutdown)
+• Jitter spreads tasks that share an interval; a task still running when
+  its next slot arrives is an overrun — the slot is skipped and counted
+• Per-task stats (next run, last duration, runs, failures, last error)
+  feed the /jobs admin view
+
+    scheduler.every("system_monitor.sample", sample, 120, owner="system_monitor")
+    scheduler.once("welcome_guard.kick.42", check_kick, 120, args=(...))
+"""
+
+import heapq, os, random, threading, time, traceback
+from concurrent.futures import ThreadPoolExecutor
+
+WORKERS = int(os.getenv("SCHEDULER_WORKERS", "4"))
+DEFAULT_JITTER = 0.02      # fraction of the interval
+MAX_DEFAULT_JITTER = 30.0  # seconds
+
+# === SCHEDULER STATE ===
+TASKS = {}        # name -> Task
+STATS = {"wakeups": 0, "dispatched": 0, "overruns": 0, "failures": 0,
+         "lag_ms": 0.0, "max_lag_ms": 0.0}
+_heap = []        # (due, seq, name) — stale entries are skipped on pop
+_cond = threading.Condition()
+_seq = 0
+_thread = None
+_pool = None
+_stopping = False
+
+
+def log(msg):
+    print(f"[Scheduler] {msg}")
+
+
+class Task:
+    """One scheduled callable. interval=None means run once."""
+
+    def __init__(self, name, fn, interval, args, owner, jitter):
+        self.name = name
+        self.fn = fn
+        self.interval = interval
+        self.args = args
+        self.owner = owner
+        self.jitter = jitter
+        self.seq = 0
+        self.next_run = None
+        self.running = False
+        self.runs = 0
+        self.failures = 0
+        self.overruns = 0
+        self.last_run = None
+        self.last_ms = None
+        self.last_error = None
+
+    def snapshot(self):
+        return {
+            "name": self.name,
+            "owner": self.owner,
+            "interval": self.interval,
+            "next_run": self.next_run,
+            "running": self.running,
+            "runs": self.runs,
+            "failures": self.failures,
+            "overruns": self.overruns,
+            "last_run": self.last_run,
+            "last_ms": self.last_ms,
+            "last_error": self.last_error,
+        }
+
+
+# === PUBLIC API ===
+def every(name, fn, interval, first=None, args=(), owner=None, jitter=None):
+    """
+    Run fn(*args) every `interval` seconds, first after `first` seconds
+    (default: one interval). Re-using a name replaces the old task.
+    `jitter` is seconds of random spread per run (default 2% of interval).
+    """
+    if jitter is None:
+        jitter = min(interval * DEFAULT_JITTER, MAX_DEFAULT_JITTER)
+    task = Task(name, fn, interval, tuple(args), owner, jitter)
+    _schedule(task, time.time() + (interval if first is None else first))
+    return task
+
+
+def once(name, fn, delay, args=(), owner=None):
+    """Run fn(*args) once after `delay` seconds. Re-using a name replaces it."""
+    task = Task(name, fn, None, tuple(args), owner, 0.0)
+    _schedule(task, time.time() + delay)
+    return task
+
+
+def cancel(name):
+    with _cond:
+        task = TASKS.pop(name, None)
+        _cond.notify()
+    return task is not None
+
+
+def cancel_owner(owner):
+    """Cancel every task a plugin owns (used on teardown / hot reload)."""
+    with _cond:
+        names = [n for n, t in TASKS.items() if t.owner == owner]
+        for n in names:
+            del TASKS[n]
+        _cond.notify()
+    return names
+
+
+def pending(name):
+    """True while a task of that name is queued (not yet handed to a worker)."""
+    with _cond:
+        task = TASKS.get(name)
+        return task is not None and task.next_run is not None
+
+
+def tasks():
+    with _cond:
+        return sorted((t.snapshot() for t in TASKS.values()),
+                      key=lambda s: s["next_run"] or 0)
+
+
+def start():
+    global _thread, _pool, _stopping
+    with _cond:
+        if _thread is not None and _thread.is_alive():
+            return
+        _stopping = False
+        _pool = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="wenbnb-task")
+        _thread = threading.Thread(target=_loop, name="wenbnb-scheduler", daemon=True)
+        _thread.start()
+    log(f"⏱️ Scheduler online ({WORKERS} workers)")
+
+
+def shutdown(wait=False):
+    global _stopping
+    with _cond:
+        _stopping = True
+        TASKS.clear()
+        del _heap[:]
+        _cond.notify()
+    if _pool is not None:
+        _pool.shutdown(wait=wait)
+
+
+# === INTERNALS ===
+def _schedule(task, due):
+    global _seq
+    start()
+    with _cond:
+        _seq += 1
+        task.seq = _seq
+        task.next_run = due
+        TASKS[task.name] = task
+        heapq.heappush(_heap, (due, _seq, task.name))
+        _cond.notify()
+
+
+def _loop():
+    while True:
+        with _cond:
+            while True:
+                if _stopping:
+                    return
+                STATS["wakeups"] += 1
+                if not _heap:
+                    _cond.wait()
+                    continue
+                due, seq, name = _heap[0]
+                now = time.time()
+                if due > now:
+                    _cond.wait(due - now)
+                    continue
+                heapq.heappop(_heap)
+                task = TASKS.get(name)
+                if task is None or task.seq != seq:
+                    continue  # cancelled or replaced since it was queued
+                break
+            _dispatch(task, due, now)
+
+
+def _dispatch(task, due, now):
+    """Called with _cond held: hand the task to a worker, queue its next slot."""
+    global _seq
+    lag = (now - due) * 1000
+    STATS["lag_ms"] = round(lag, 1)
+    STATS["max_lag_ms"] = round(max(STATS["max_lag_ms"], lag), 1)
+
+    if task.running:
+        task.overruns += 1
+        STATS["overruns"] += 1
+        log(f"⚠️ Overrun: {task.name} still running — slot skipped")
+    else:
+        task.running = True
+        STATS["dispatched"] += 1
+        _pool.submit(_run, task)
+
+    if task.interval is None:
+        task.next_run = None
+        return
+    next_due = due + task.interval
+    if next_due <= now:
+        next_due = now + task.interval  # fell behind — don't burst to catch up
+    next_due += random.uniform(0, task.jitter) if task.jitter else 0
+    _seq += 1
+    task.seq = _seq
+    task.next_run = next_due
+    heapq.heappush(_heap, (next_due, _seq, task.name))
+
+
+def _run(task):
+    started = time.time()
+    try:
+        task.fn(*task.args)
+        task.last_error = None
+    except Exception as e:
+        task.failures += 1
+        STATS["failures"] += 1
+        task.last_error = str(e).split("\n")[0]
+        log(f"❌ {task.name} failed: {task.last_error}\n{traceback.format_exc()}")
+    finally:
+        task.last_run = started
+        task.last_ms = round((time.time() - started) * 1000, 1)
+        task.runs += 1
+        task.running = False
+        if task.interval is None:
+            with _cond:
+                if TASKS.get(task.name) is task and task.next_run is None:
+                    del TASKS[task.name]
@@ -0,0 +1,262 @@
+"""
+WENBNB Sentiment v1.0 — Fast Lexicon Sentiment (VADER-style) with Batch Scoring
+──────────────────────────────────────────────────────────────────────────────
+• Replaces per-message TextBlob(text).sentiment: a valence table (English +
+  crypto slang + Hinglish + Devanagari + emoji) loaded once into dicts
+• VADER rules: boosters ("very", "bahut"), negation ("not", "nahi") over a
+  3-token window, CAPS emphasis, "but" shifts weight to the second clause,
+  "!" / "??" amplification; compound = s / √(s² + 15) in [-1, 1]
+• Pluggable backends — SENTIMENT_BACKEND=vader (default) | textblob, or
+  register_backend(name, fn) for anything returning a polarity in [-1, 1]
+• polarity() is cached for short (repeated) messages; score_many() scores
+  a whole backfill in one vectorised NumPy pass
+• mood() maps polarity onto the existing Positive / Negative / Balanced /
+  Reflective labels with each caller's own thresholds
+"""
+
+import math, os, re
+from functools import lru_cache
+import numpy as np
+
+BACKEND = os.getenv("SENTIMENT_BACKEND", "vader").lower()
+CACHE_MAX_CHARS = 200        # longer texts are rarely repeated — don't cache them
+ALPHA = 15                   # VADER normalisation constant
+
+# === VALENCE TABLES ===
+VALENCE = {
+    # English
+    "good": 1.9, "great": 3.1, "awesome": 3.1, "amazing": 2.8, "excellent": 3.2, "nice": 1.8,
+    "love": 3.2, "loved": 2.9, "like": 1.5, "happy": 2.7, "glad": 2.0, "excited": 2.2,
+    "cool": 1.3, "fun": 2.3, "best": 3.2, "better": 1.9, "win": 2.8, "winning": 2.4,
+    "won": 2.7, "thanks": 1.9, "thank": 1.5, "wow": 2.8, "beautiful": 2.9, "perfect": 2.7,
+    "hope": 1.9, "safe": 1.9, "strong": 2.3, "easy": 1.9, "yay": 2.4, "lol": 1.8,
+    "haha": 2.0, "fantastic": 2.6, "brilliant": 2.8, "proud": 2.1, "calm": 1.3,
+    "bad": -2.5, "terrible": -2.1, "awful": -2.0, "worst": -3.1, "worse": -2.1, "hate": -2.7,
+    "sad": -2.1, "angry": -2.3, "upset": -1.6, "tired": -1.9, "bored": -1.1, "scared": -1.9,
+    "afraid": -2.0, "worried": -1.7, "fear": -2.2, "lose": -1.3, "losing": -1.6, "lost": -1.3,
+    "pain": -2.3, "hurt": -2.4, "sucks": -1.5, "stupid": -2.4, "depressed": -2.3,
+    "annoying": -1.7, "boring": -1.3, "broke": -1.8, "broken": -1.8, "problem": -1.7,
+    "fail": -2.5, "failed": -2.3, "wrong": -2.1, "sorry": -0.3, "ugh": -1.8, "damn": -1.7,
+    "stress": -1.8, "stressed": -1.4, "lonely": -1.5, "cry": -2.1, "crying": -2.1,
+    # crypto
+    "moon": 2.0, "mooning": 2.4, "pump": 1.5, "pumping": 1.7, "bullish": 2.3, "bull": 1.2,
+    "gains": 2.1, "gain": 1.6, "profit": 1.9, "profits": 1.9, "green": 1.0, "ath": 2.0,
+    "lfg": 2.6, "wagmi": 2.5, "gem": 1.9, "hodl": 0.8, "surge": 1.5, "rally": 1.8,
+    "bearish": -2.1, "bear": -1.0, "dump": -2.0, "dumping": -2.2, "dumped": -2.0,
+    "crash": -2.6, "crashed": -2.6, "rekt": -2.8, "rug": -3.0, "rugged": -3.1, "scam": -3.1,
+    "loss": -1.8, "losses": -1.8, "red": -0.8, "ngmi": -2.4, "fud": -1.8, "liquidated": -2.6,
+    "dip": -0.9, "rekted": -2.8, "exploit": -2.4, "hacked": -2.8,
+    # Hinglish
+    "accha": 1.5, "acha": 1.5, "badhiya": 2.4, "mast": 2.3, "zabardast": 2.9, "khush": 2.3,
+    "shukriya": 1.9, "dhanyavaad": 1.9, "sahi": 1.4, "shandar": 2.6, "kamaal": 2.5,
+    "bura": -2.2, "bekaar": -2.3, "bakwas": -2.4, "dukhi": -2.2, "pareshan": -1.9,
+    "gussa": -2.2, "ganda": -2.0, "ghatiya": -2.6, "dhoka": -2.8, "nuksaan": -2.0,
+    # Devanagari
+    "अच्छा": 1.5, "बढ़िया": 2.4, "शानदार": 2.6, "खुश": 2.3, "मस्त": 2.3, "धन्यवाद": 1.9,
+    "मुनाफा": 1.9, "बुरा": -2.2, "बेकार": -2.3, "दुखी": -2.2, "परेशान": -1.9, "गुस्सा": -2.2,
+    "नुकसान": -2.0, "गिरावट": -1.5, "धोखा": -2.8, "थकान": -1.6,
+    # emoji
+    "😂": 1.8, "🤣": 1.9, "😊": 2.2, "😁": 2.2, "😍": 2.7, "🥰": 2.7, "😎": 1.7, "🔥": 1.6,
+    "🚀": 1.8, "🎉": 2.3, "🥳": 2.5, "💎": 1.1, "🙌": 1.9, "👍": 1.8, "💪": 1.7, "❤": 2.6,
+    "🫶": 2.4, "✨": 1.2, "🤑": 1.8, "😭": -2.1, "😢": -2.0, "😔": -1.7, "😞": -1.9,
+    "😡": -2.6, "😠": -2.3, "🤬": -2.8, "💀": -1.2, "📉": -1.6, "🤮": -2.5, "👎": -1.8,
+    "😴": -0.6, "😩": -1.9, "🤯": -0.4, "🗑": -1.4,
+}
+BOOSTERS = {
+    "very": 0.293, "really": 0.293, "so": 0.293, "extremely": 0.293, "super": 0.293,
+    "totally": 0.293, "absolutely": 0.293, "hella": 0.293, "mega": 0.293, "too": 0.293,
+    "bahut": 0.293, "bohot": 0.293, "bohat": 0.293, "ekdum": 0.293, "bahut-bahut": 0.293,
+    "बहुत": 0.293, "काफी": 0.293,
+    "slightly": -0.293, "somewhat": -0.293, "barely": -0.293, "kinda": -0.293,
+    "little": -0.293, "thoda": -0.293, "थोड़ा": -0.293,
+}
+NEGATIONS = {
+    "not", "no", "never", "none", "nobody", "nothing", "neither", "nor", "cannot", "cant",
+    "dont", "wont", "isnt", "aint", "without", "nahi", "nahin", "nai", "mat", "नहीं", "मत",
+}
+CAPS_INCR = 0.733
+NEGATE = -0.74
+WINDOW_DAMP = (1.0, 0.95, 0.9)      # booster strength 1, 2, 3 tokens back
+TOKEN = re.compile(r"[\w\u0900-\u097F'\-]+|[^\w\s\ufe0f\u200d]")
+MOODS = ("Positive", "Negative", "Balanced")
+
+
+def log(msg):
+    print(f"[Sentiment] {msg}")
+
+
+# Batch path: one dict lookup per token → row in these arrays (row 0 = unknown word)
+_VOCAB = [None] + sorted(set(VALENCE) | set(BOOSTERS) | NEGATIONS | {"but"})
+_INDEX = {tok: i for i, tok in enumerate(_VOCAB)}
+_VAL = np.array([VALENCE.get(t, 0.0) for t in _VOCAB])
+_BOOST = np.array([BOOSTERS.get(t, 0.0) for t in _VOCAB])
+_NEG = np.array([t in NEGATIONS for t in _VOCAB])
+_BUT = _INDEX["but"]
+
+
+def _tokens(text):
+    """(lower-cased tokens, CAPS-emphasis flags or None when nothing is shouted)."""
+    # Tokenize once and lower per token: lowering the whole text first can
+    # change the token count ("İ" → "i" + combining dot), and caps must line up
+    raw = TOKEN.findall(text or "")
+    toks = [t.lower() for t in raw]
+    if "'" in (text or ""):
+        toks = ["not" if t.endswith("n't") else t for t in toks]    # don't / isn't → not
+    caps = None
+    if toks != raw:
+        shouted = [len(t) > 1 and t.isupper() for t in raw]
+        if any(shouted) and not all(t.isupper() for t in raw if t.isalpha()):
+            caps = shouted      # VADER: emphasis only when some, not all, words are CAPS
+    return toks, caps
+
+
+def _punct(text, s):
+    """VADER punctuation emphasis, pushed in the direction of the sum."""
+    if not s:
+        return 0.0
+    bang = min(text.count("!"), 4) * 0.292
+    ask = text.count("?")
+    ask = (min(ask, 3) * 0.18 if ask > 1 else 0.0)
+    return math.copysign(bang + ask, s)
+
+
+# === VADER BACKEND ===
+def _vader(text):
+    toks, caps = _tokens(text)
+    try:
+        but = toks.index("but")
+    except ValueError:
+        but = -1
+    s = 0.0
+    for i, tok in enumerate(toks):
+        v = VALENCE.get(tok)
+        if v is None:
+            continue
+        sign = 1.0 if v > 0 else -1.0
+        if caps and caps[i]:
+            v += sign * CAPS_INCR
+        negated = False
+        for k in (1, 2, 3):
+            if i < k:
+                break
+            prev = toks[i - k]
+            b = BOOSTERS.get(prev)
+            if b:
+                v += sign * b * WINDOW_DAMP[k - 1]
+            negated = negated or prev in NEGATIONS
+        if negated:
+            v *= NEGATE
+        if but >= 0:
+            v *= 0.5 if i < but else 1.5 if i > but else 1.0
+        s += v
+    s += _punct(text, s)
+    return max(-1.0, min(1.0, s / math.sqrt(s * s + ALPHA)))
+
+
+def _vader_many(texts):
+    """score_many for the VADER backend: one flat token array for every message."""
+    n = len(texts)
+    ids, rows, caps = [], [], []
+    get = _INDEX.get
+    for m, text in enumerate(texts):
+        toks, cap = _tokens(text)
+        ids.extend([m] * len(toks))
+        rows.extend([get(t, 0) for t in toks])
+        caps.extend(cap or [False] * len(toks))
+    if not ids:
+        return np.zeros(n)
+    ids, rows, caps = np.asarray(ids), np.asarray(rows), np.asarray(caps)
+    v, boost, neg, is_but = _VAL[rows], _BOOST[rows], _NEG[rows], rows == _BUT
+    sign = np.sign(v)
+    pos = np.arange(len(ids))
+
+    v = v + sign * CAPS_INCR * caps
+    negated = np.zeros(len(ids), bool)
+    for k, damp in zip((1, 2, 3), WINDOW_DAMP):
+        same = np.zeros(len(ids), bool)
+        same[k:] = ids[k:] == ids[:-k]                   # window never crosses messages
+        prev_boost = np.zeros(len(ids))
+        prev_boost[k:] = boost[:-k]
+        prev_neg = np.zeros(len(ids), bool)
+        prev_neg[k:] = neg[:-k]
+        v = v + np.where(same, sign * prev_boost * damp, 0.0)
+        negated |= same & prev_neg
+    v = np.where(negated, v * NEGATE, v)
+
+    first_but = np.full(n, len(ids))                     # first "but" per message
+    np.minimum.at(first_but, ids[is_but], pos[is_but])
+    fb = first_but[ids]
+    has_but = fb < len(ids)
+    v = v * np.where(has_but & (pos < fb), 0.5, np.where(has_but & (pos > fb), 1.5, 1.0))
+    v = np.where(sign == 0, 0.0, v)
+
+    s = np.bincount(ids, weights=v, minlength=n)
+    s = s + np.array([_punct(t or "", x) for t, x in zip(texts, s)])
+    return np.clip(s / np.sqrt(s * s + ALPHA), -1.0, 1.0)
+
+
+# === TEXTBLOB BACKEND (optional) ===
+def _textblob(text):
+    from textblob import TextBlob    # heavy import — only when selected
+    return float(TextBlob(text).sentiment.polarity)
+
+
+# === BACKENDS ===
+BACKENDS = {"vader": _vader, "textblob": _textblob}
+BATCH = {"vader": _vader_many}
+
+
+def register_backend(name, fn, batch=None):
+    """fn(text) -> polarity in [-1, 1]; batch(texts) -> array (optional)."""
+    BACKENDS[name] = fn
+    if batch:
+        BATCH[name] = batch
+
+
+def use(name):
+    global BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"unknown sentiment backend: {name}")
+    BACKEND = name
+    _cached.cache_clear()
+    log(f"🎚️ Backend → {name}")
+
+
+@lru_cache(maxsize=4096)
+def _cached(backend, text):
+    return BACKENDS[backend](text)
+
+
+def polarity(text):
+    """Polarity in [-1, 1] from the active backend; 0.0 if the backend fails."""
+    text = text or ""
+    backend = BACKEND if BACKEND in BACKENDS else "vader"
+    try:
+        if len(text) <= CACHE_MAX_CHARS:
+            return _cached(backend, text)
+        return BACKENDS[backend](text)
+    except Exception:
+        return 0.0
+
+
+def score_many(texts):
+    """Polarity for many texts at once (np.ndarray) — for backfills and reports."""
+    texts = list(texts)
+    backend = BACKEND if BACKEND in BACKENDS else "vader"
+    if backend in BATCH:
+        return BATCH[backend](texts)
+    return np.array([polarity(t) for t in texts], dtype=float)
+
+
+def label(p, positive=0.3, negative=-0.3, labels=MOODS):
+    """(positive label, negative label, neutral label) by threshold."""
+    return labels[0] if p > positive else labels[1] if p < negative else labels[2]
+
+
+def mood(text, positive=0.3, negative=-0.3, labels=MOODS):
+    return label(polarity(text), positive, negative, labels)
+
+
+def moods(texts, positive=0.3, negative=-0.3, labels=MOODS):
+    p = score_many(texts)
+    return np.select([p > positive, p < negative], labels[:2], labels[2]).tolist()
@@ -0,0 +1,165 @@
+"""
+WENBNB Startup Profiler v1.0 — Cold-Start Budget Tracker
+──────────────────────────────────────────────────────────────────────────────
+• Times each boot phase (core imports, dispatcher build, polling, setups)
+• Per-plugin cost: import / register (manifest + handlers) / setup hook
+• Hooks __import__ during boot to attribute third-party import cost
+  (web3, flask, textblob, boto3 …) to the module that pulled it in
+• Flags anything over budget and writes data/startup_profile.json
+
+Budgets (ms) come from STARTUP_BUDGET_MS (time until polling) and
+IMPORT_BUDGET_MS (any single dependency or plugin). STARTUP_PROFILE=false
+turns the import hook off; phases are still timed.
+"""
+
+import builtins, json, os, sys, threading, time
+from contextlib import contextmanager
+
+REPORT_FILE = "data/startup_profile.json"
+ENABLED = os.getenv("STARTUP_PROFILE", "true").lower() == "true"
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "4000"))
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "250"))
+FIRST_PARTY = ("plugins", "dashboard", "wenbot")
+
+T0 = time.time()
+
+# === PROFILE STATE ===
+PHASES = []        # [{"name", "start_ms", "ms"}]
+MILESTONES = {}    # name -> ms since T0 ("polling", "ready")
+PLUGINS = {}       # plugin -> {"import_ms", "register_ms", "setup_ms"}
+DEPENDENCIES = {}  # module -> {"ms", "by"}
+_lock = threading.Lock()
+_local = threading.local()
+_original_import = None
+
+
+def log(msg):
+    print(f"[StartupProfiler] {msg}")
+
+
+def elapsed_ms(since=None):
+    return round((time.time() - (since or T0)) * 1000, 1)
+
+
+# === IMPORT HOOK ===
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    # Only the outermost absolute import of a not-yet-loaded module is timed;
+    # nested imports are included in their parent's cost.
+    if level or getattr(_local, "depth", 0) or name in sys.modules \
+            or name.partition(".")[0] in FIRST_PARTY:
+        return _original_import(name, globals, locals, fromlist, level)
+    importer = (globals or {}).get("__name__", "?")
+    _local.depth = 1
+    started = time.time()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        _local.depth = 0
+        ms = elapsed_ms(started)
+        with _lock:
+            DEPENDENCIES.setdefault(name, {"ms": ms, "by": importer})
+
+
+def install():
+    """Start attributing import cost. Safe to call more than once."""
+    global _original_import
+    if not ENABLED or _original_import is not None:
+        return
+    _original_import = builtins.__import__
+    builtins.__import__ = _timed_import
+
+
+def uninstall():
+    """Restore the stock __import__ — no overhead once the bot is up."""
+    global _original_import
+    if _original_import is None:
+        return
+    builtins.__import__ = _original_import
+    _original_import = None
+
+
+# === RECORDING ===
+@contextmanager
+def phase(name):
+    started = time.time()
+    try:
+        yield
+    finally:
+        with _lock:
+            PHASES.append({
+                "name": name,
+                "start_ms": round((started - T0) * 1000, 1),
+                "ms": elapsed_ms(started),
+            })
+
+
+def mark(name):
+    """Record a milestone (ms since process boot)."""
+    with _lock:
+        MILESTONES[name] = elapsed_ms()
+    return MILESTONES[name]
+
+
+def record_plugin(plugin, kind, ms):
+    """kind: "import_ms" | "register_ms" | "setup_ms" (accumulates)."""
+    with _lock:
+        entry = PLUGINS.setdefault(plugin, {"import_ms": 0.0, "register_ms": 0.0, "setup_ms": 0.0})
+        entry[kind] = round(entry.get(kind, 0.0) + ms, 1)
+
+
+# === REPORT ===
+def over_budget():
+    flagged = []
+    polling = MILESTONES.get("polling")
+    if polling is not None and polling > STARTUP_BUDGET_MS:
+        flagged.append({"kind": "startup", "name": "time_to_polling",
+                        "ms": polling, "budget_ms": STARTUP_BUDGET_MS})
+    for name, dep in DEPENDENCIES.items():
+        if dep["ms"] > IMPORT_BUDGET_MS:
+            flagged.append({"kind": "dependency", "name": name,
+                            "ms": dep["ms"], "budget_ms": IMPORT_BUDGET_MS})
+    for name, p in PLUGINS.items():
+        total = p["import_ms"] + p["register_ms"] + p["setup_ms"]
+        if total > IMPORT_BUDGET_MS:
+            flagged.append({"kind": "plugin", "name": name,
+                            "ms": round(total, 1), "budget_ms": IMPORT_BUDGET_MS})
+    return sorted(flagged, key=lambda f: -f["ms"])
+
+
+def report():
+    with _lock:
+        deps = sorted(DEPENDENCIES.items(), key=lambda kv: -kv[1]["ms"])
+        plugins = sorted(
+            PLUGINS.items(),
+            key=lambda kv: -(kv[1]["import_ms"] + kv[1]["register_ms"] + kv[1]["setup_ms"]),
+        )
+        return {
+            "generated": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "pid": os.getpid(),
+            "total_ms": elapsed_ms(),
+            "budgets": {"startup_ms": STARTUP_BUDGET_MS, "import_ms": IMPORT_BUDGET_MS},
+            "milestones": dict(MILESTONES),
+            "phases": list(PHASES),
+            "plugins": {name: dict(p) for name, p in plugins},
+            "dependencies": {name: dict(d) for name, d in deps},
+            "over_budget": over_budget(),
+        }
+
+
+def write_report(path=REPORT_FILE):
+    data = report()
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, path)
+    except Exception as e:
+        log(f"⚠️ Report write failed: {e}")
+        return data
+
+    log(f"⏱️ Polling at {data['milestones'].get('polling', '?')} ms | "
+        f"ready at {data['milestones'].get('ready', '?')} ms → {path}")
+    for f in data["over_budget"][:5]:
+        log(f"🐢 {f['kind']} {f['name']}: {f['ms']:.0f} ms (budget {f['budget_ms']:.0f})")
+    return data
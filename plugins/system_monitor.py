@@ -4,21 +4,23 @@ WENBNB System Monitor v8.4-Pro++ — Auto-Healing + Dual Command Support
 Monitors CPU, RAM, uptime, and API health + maintains self-healing plugin sync.
 Now includes:
 • Dual command support (/status + /system)
-• Heartbeat-aware monitoring threads
+• Monitor + auto-heal run as scheduler tasks (no dedicated threads)
+• CPU/RAM come from metrics_sampler (non-blocking, with p95 + trend)
 • Safe reboot telemetry access
 💫 Powered by WENBNB Neural Engine — Resilience Framework 24×7 ⚡
 """
 
-import time, threading, requests, traceback, platform, psutil, importlib, os, json
+import requests, traceback, platform, os, json
 from datetime import datetime
 from telegram import Update
-from telegram.ext import CommandHandler, CallbackContext
+from telegram.ext import CallbackContext
+from plugins import plugin_registry, scheduler, metrics_sampler
 
 # === CONFIG ===
 ADMIN_IDS = [5698007588]  # Replace with your Telegram ID
-PLUGIN_DIR = "plugins"
 BOT_START_TIME = datetime.now()
 CHECK_INTERVAL = 120  # seconds
+HEAL_INTERVAL = 300
 BRAND_TAG = "💫 WENBNB Neural Engine — Resilience Framework 24×7 ⚡"
 
 SYSTEM_STATUS = {
@@ -29,80 +31,66 @@ SYSTEM_STATUS = {
     "autoheal": "✅ Active"
 }
 
-ACTIVE_PLUGINS = {}
-STOP_FLAG = False
-
-
 # === AUTO-HEALING CORE ===
 def auto_heal_plugins(dispatcher):
-    while not STOP_FLAG:
-        try:
-            for file in os.listdir(PLUGIN_DIR):
-                if file.endswith(".py") and not file.startswith("__"):
-                    module_name = file[:-3]
-                    if module_name not in ACTIVE_PLUGINS or ACTIVE_PLUGINS[module_name] == "❌ Error":
-                        try:
-                            module = importlib.import_module(f"{PLUGIN_DIR}.{module_name}")
-                            if hasattr(module, "register_handlers"):
-                                module.register_handlers(dispatcher)
-                                ACTIVE_PLUGINS[module_name] = "✅ Recovered"
-                                print(f"[AutoHeal] Recovered {module_name}")
-                                for admin_id in ADMIN_IDS:
-                                    dispatcher.bot.send_message(
-                                        admin_id,
-                                        f"🛠️ Auto-Healed Plugin: <b>{module_name}</b>",
-                                        parse_mode="HTML"
-                                    )
-                        except Exception as e:
-                            print(f"[AutoHeal] Failed to reload {module_name}: {e}")
-            time.sleep(300)
-        except Exception as e:
-            print(f"[AutoHeal Thread Error] {e}")
-            time.sleep(300)
+    """Retry plugins whose lazy import failed (registry-tracked)."""
+    try:
+        for module_name in plugin_registry.heal_failed():
+            print(f"[AutoHeal] Recovered {module_name}")
+            for admin_id in ADMIN_IDS:
+                dispatcher.bot.send_message(
+                    admin_id,
+                    f"🛠️ Auto-Healed Plugin: <b>{module_name}</b>",
+                    parse_mode="HTML"
+                )
+    except Exception as e:
+        print(f"[AutoHeal Error] {e}")
 
 
 # === SYSTEM MONITOR ===
 def monitor_system(dispatcher):
     global SYSTEM_STATUS
-    while not STOP_FLAG:
+    try:
+        m = metrics_sampler.latest()
+        cpu_usage = round(m["cpu"], 1)
+        ram_usage = round(m["ram"], 1)
+        uptime_seconds = (datetime.now() - BOT_START_TIME).total_seconds()
+        hours, remainder = divmod(int(uptime_seconds), 3600)
+        minutes, _ = divmod(remainder, 60)
+
         try:
-            cpu_usage = psutil.cpu_percent(interval=1)
-            ram_usage = psutil.virtual_memory().percent
-            uptime_seconds = (datetime.now() - BOT_START_TIME).total_seconds()
-            hours, remainder = divmod(int(uptime_seconds), 3600)
-            minutes, _ = divmod(remainder, 60)
-
-            try:
-                res = requests.get("https://api.binance.com/api/v3/time", timeout=5)
-                api_status = "✅ OK" if res.status_code == 200 else "⚠️ Slow"
-            except Exception:
-                api_status = "❌ Down"
-
-            SYSTEM_STATUS.update({
-                "cpu": cpu_usage,
-                "ram": ram_usage,
-                "uptime": f"{hours}h {minutes}m",
-                "api": api_status
-            })
-
-            if api_status == "❌ Down":
-                for admin_id in ADMIN_IDS:
-                    dispatcher.bot.send_message(
-                        admin_id,
-                        "⚠️ <b>Binance API is DOWN!</b>\nSystem entering Watch Mode.",
-                        parse_mode="HTML"
-                    )
-
-        except Exception as e:
-            print(f"[SystemMonitor Error] {traceback.format_exc()}")
-        time.sleep(CHECK_INTERVAL)
-
-
-# === START MONITOR THREAD ===
+            res = requests.get("https://api.binance.com/api/v3/time", timeout=5)
+            api_status = "✅ OK" if res.status_code == 200 else "⚠️ Slow"
+        except Exception:
+            api_status = "❌ Down"
+
+        SYSTEM_STATUS.update({
+            "cpu": cpu_usage,
+            "ram": ram_usage,
+            "uptime": f"{hours}h {minutes}m",
+            "api": api_status
+        })
+
+        if api_status == "❌ Down":
+            for admin_id in ADMIN_IDS:
+                dispatcher.bot.send_message(
+                    admin_id,
+                    "⚠️ <b>Binance API is DOWN!</b>\nSystem entering Watch Mode.",
+                    parse_mode="HTML"
+                )
+
+    except Exception as e:
+        print(f"[SystemMonitor Error] {traceback.format_exc()}")
+
+
+# === START MONITOR TASKS ===
 def start_monitor(dispatcher):
-    threading.Thread(target=monitor_system, args=(dispatcher,), daemon=True).start()
-    threading.Thread(target=auto_heal_plugins, args=(dispatcher,), daemon=True).start()
-    print("🧠 WENBNB System Monitor & Auto-Heal threads initialized.")
+    metrics_sampler.start()
+    scheduler.every("system_monitor.sample", monitor_system, CHECK_INTERVAL, first=0,
+                    args=(dispatcher,), owner="system_monitor")
+    scheduler.every("system_monitor.autoheal", auto_heal_plugins, HEAL_INTERVAL, first=0,
+                    args=(dispatcher,), owner="system_monitor")
+    print("🧠 WENBNB System Monitor & Auto-Heal tasks scheduled.")
 
 
 # === STATUS COMMANDS ===
@@ -124,12 +112,26 @@ def status_command(update: Update, context: CallbackContext):
     except Exception as e:
         print(f"[Status] Failed to read last reboot time: {e}")
 
+    m = metrics_sampler.summary(900)
+    arrow = metrics_sampler.trend_arrow
+    if m["samples"]:
+        load = (
+            f"💻 CPU: <b>{m['cpu']['last']:.0f}%</b> (p95 {m['cpu']['p95']:.0f}% {arrow(m['cpu']['trend'])})\n"
+            f"📈 RAM: <b>{m['ram']['last']:.0f}%</b> | RSS <b>{m['rss_mb']['last']:.0f} MB</b> {arrow(m['rss_mb']['trend'])}\n"
+            f"🧵 Threads: <b>{m['threads']['last']:.0f}</b> | FDs: <b>{m['fds']['last']:.0f}</b> | "
+            f"Lag p95: <b>{m['lag_ms']['p95']:.0f} ms</b>\n"
+        )
+    else:
+        load = (
+            f"💻 CPU Usage: <b>{s['cpu']}%</b>\n"
+            f"📈 RAM Usage: <b>{s['ram']}%</b>\n"
+        )
+
     text = (
         f"🧩 <b>WENBNB System Monitor v8.4-Pro++</b>\n\n"
         f"🕒 Uptime: <b>{s['uptime']}</b>\n"
         f"🔁 Last Reboot: <b>{last_reboot}</b>\n"
-        f"💻 CPU Usage: <b>{s['cpu']}%</b>\n"
-        f"📈 RAM Usage: <b>{s['ram']}%</b>\n"
+        f"{load}"
         f"🌐 API Health: {s['api']}\n"
         f"🩺 Auto-Heal: {s['autoheal']}\n"
         f"⚙️ Platform: {platform.system()} {platform.release()}\n\n"
@@ -156,10 +158,12 @@ def reboot_info(update: Update, context: CallbackContext):
     update.message.reply_text(f"🕓 <b>Last Reboot:</b> {timestamp}", parse_mode="HTML")
 
 
-# === REGISTER HANDLERS ===
-def register_handlers(dp):
-    dp.add_handler(CommandHandler("status", status_command))
-    dp.add_handler(CommandHandler("system", status_command))  # ✅ Added alias
-    dp.add_handler(CommandHandler("rebootinfo", reboot_info))
-    start_monitor(dp)
-    print("✅ System Monitor Handlers Registered — /status & /system ready.")
+# === PLUGIN MANIFEST ===
+PLUGIN_MANIFEST = {
+    "commands": {
+        "status": "status_command",
+        "system": "status_command",  # ✅ alias
+        "rebootinfo": "reboot_info",
+    },
+    "setup": "start_monitor",
+}
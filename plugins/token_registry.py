@@ -0,0 +1,158 @@
+"""
+WENBNB Token Registry v1.0 — Persistent BEP-20 Metadata + Supply Cache
+──────────────────────────────────────────────────────────────────────────────
+• One record per contract: symbol, name, decimals and a totalSupply
+  snapshot, each stamped with its own fetch time and TTL (decimals ~never
+  change, supply does)
+• Repeat lookups are answered locally; an expired field is returned as-is
+  and refreshed in the background — /supply never waits on a known token
+• Unknown tokens are fetched in one Multicall3 round trip (chain_reads);
+  stale ones are refreshed together in one batch by a manifest job
+• Records persist to data/token_registry.json and seed chain_reads.META on
+  load, so /wallet skips metadata reads after a restart too
+
+    token_registry.lookup("0xdef…")   # {"symbol", "name", "decimals", "supply", "age", …}
+    token_registry.warm(WALLET_TOKENS)
+"""
+
+import json, os, threading, time
+from telegram.ext import CallbackContext
+
+from plugins import chain_reads, scheduler
+
+REGISTRY_FILE = "data/token_registry.json"
+FIELD_TTL = {                 # seconds a field is trusted before a background refresh
+    "decimals": 30 * 86400,
+    "symbol": 7 * 86400,
+    "name": 7 * 86400,
+    "supply": 600,
+}
+ACTIVE_WINDOW = 86400         # the refresh job only touches tokens looked up this recently
+SAVE_DELAY = 5                # debounce: many updates → one file write
+
+PLUGIN_MANIFEST = {
+    "jobs": [{"callback": "refresh_job", "interval": 600, "first": 120, "env": "TOKEN_REFRESH_SECONDS"}],
+}
+
+# === STATE ===
+TOKENS = {}                   # contract (lower) -> record
+_lock = threading.Lock()
+_loaded = False
+
+
+def log(msg):
+    print(f"[TokenRegistry] {msg}")
+
+
+# === PERSISTENCE ===
+def load():
+    global _loaded
+    with _lock:
+        if _loaded:
+            return
+        _loaded = True
+        try:
+            with open(REGISTRY_FILE, "r", encoding="utf-8") as f:
+                TOKENS.update(json.load(f))
+        except (FileNotFoundError, ValueError):
+            pass
+        for contract, rec in TOKENS.items():
+            if rec.get("decimals") is not None:
+                chain_reads.META.setdefault(contract, _meta(rec))
+    if TOKENS:
+        log(f"📦 Loaded {len(TOKENS)} tokens")
+
+
+def save():
+    with _lock:
+        # Tokens chain_reads met on its own (e.g. /wallet) are worth keeping too
+        for contract, meta in chain_reads.META.items():
+            if contract not in TOKENS:
+                TOKENS[contract] = dict(meta, fetched={f: time.time() for f in meta})
+        data = json.dumps(TOKENS, indent=1)
+    os.makedirs(os.path.dirname(REGISTRY_FILE), exist_ok=True)
+    tmp = f"{REGISTRY_FILE}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(data)
+    os.replace(tmp, REGISTRY_FILE)
+
+
+def _save_later():
+    scheduler.once("token_registry.save", save, SAVE_DELAY, owner="token_registry")
+
+
+def _meta(rec):
+    return {"symbol": rec.get("symbol") or "?", "decimals": rec["decimals"],
+            "name": rec.get("name") or rec.get("symbol") or "?"}
+
+
+# === FETCH ===
+def fetch_many(contracts):
+    """totalSupply + symbol + decimals + name for every contract, one round trip."""
+    contracts = list(dict.fromkeys(c.lower() for c in contracts))
+    if not contracts:
+        return 0
+    fields = ("supply", "symbol", "decimals", "name")
+    reads = [(c, fn) for c in contracts for fn in ("totalSupply", "symbol", "decimals", "name")]
+    values = chain_reads.read_many(reads)
+    now, found = time.time(), 0
+    with _lock:
+        for i, contract in enumerate(contracts):
+            supply, symbol, decimals, name = values[4 * i:4 * i + 4]
+            if decimals is None or supply is None:
+                continue                     # not an ERC-20 (or the read failed) — keep any old record
+            found += 1
+            rec = TOKENS.setdefault(contract, {"fetched": {}})
+            rec.update(symbol=symbol or rec.get("symbol") or "?", decimals=decimals,
+                       name=name or symbol or rec.get("name") or "?", total_supply=supply)
+            rec.setdefault("fetched", {}).update({f: now for f in fields})
+            chain_reads.META[contract] = _meta(rec)
+    if found:
+        _save_later()
+    return found
+
+
+def _expired(rec, now):
+    fetched = rec.get("fetched", {})
+    return [f for f, ttl in FIELD_TTL.items() if now - fetched.get(f, 0) > ttl]
+
+
+def _refresh_later(contract):
+    scheduler.once(f"token_registry.refresh.{contract}", fetch_many, 0,
+                   args=([contract],), owner="token_registry")
+
+
+# === LOOKUP ===
+def lookup(contract):
+    """Record for a contract, or None if it isn't an ERC-20. Never blocks on a known token."""
+    load()
+    contract, now = contract.lower(), time.time()
+    rec = TOKENS.get(contract)
+    if rec is None or rec.get("total_supply") is None:
+        if not fetch_many([contract]):
+            return None
+        rec = TOKENS[contract]
+    elif _expired(rec, now):
+        _refresh_later(contract)
+    rec["used"] = now
+    return dict(rec, supply=rec["total_supply"] / 10 ** rec["decimals"],
+                age=now - rec["fetched"].get("supply", now))
+
+
+def warm(contracts):
+    """Load the registry and fetch every listed token not known yet (one batch)."""
+    load()
+    missing = [c for c in dict.fromkeys(c.lower() for c in contracts) if c not in TOKENS]
+    found = fetch_many(missing) if missing else 0
+    log(f"🔥 Warm: {len(TOKENS)} tokens cached, {found} fetched")
+    return found
+
+
+def refresh_job(context: CallbackContext):
+    load()
+    now = time.time()
+    with _lock:
+        stale = [c for c, rec in TOKENS.items()
+                 if now - rec.get("used", 0) < ACTIVE_WINDOW and _expired(rec, now)]
+    if stale:
+        fetch_many(stale)
@@ -0,0 +1,294 @@
+"""
+WENBNB Token Resolver v1.0 — Local Symbol → Contract Index + Negative Cache
+──────────────────────────────────────────────────────────────────────────────
+• One index of symbol / name / alias → contract + chain, seeded from
+  web3_connect.ALIASES, price_tracker.KNOWN_TOKENS and the token registry,
+  and grown from every DexScreener search result (persisted)
+• Only exact symbol / name / alias hits resolve (ties broken by the
+  liquidity seen last time); fuzzy prefix matches ("panc" → PancakeSwap
+  Token) are suggest()ions, never answers
+• A resolved token is fetched from DexScreener's per-token endpoint — the
+  heavy search?q= endpoint only runs for queries with no exact index hit
+• The pair returned is the best-ranked one (plugins/pair_ranker), not
+  whatever DexScreener listed first, parsed into a PairQuote
+  (plugins/market_models) — raw responses are dropped; quotes are cached
+  per contract for QUOTE_TTL; a fresh quote feeds plugins/price_history
+  only when its contract is the canonical one for the symbol (look-alikes
+  reusing "BNB" / "CAKE" must not land in the chart / alert series)
+• Misses are remembered with a TTL: "dex" (search found nothing) and "all"
+  (every price source answered "no such token" — errors and timeouts never
+  count) — unknown symbols cost zero upstream calls until the entry
+  expires; seeded / registry tokens are never marked missing
+
+    quote = token_resolver.find_pair("cake")     # PairQuote — tokeninfo / price / airdropcheck
+    token_resolver.is_missing("zzqx")            # → True after a full miss
+"""
+
+import bisect, json, os, re, threading, time
+import requests
+
+from plugins import metrics_exporter, pair_ranker, price_history, scheduler
+from plugins.market_models import PairQuote
+
+INDEX_FILE = "data/token_index.json"
+DEX_SEARCH = "https://api.dexscreener.com/latest/dex/search?q={q}"
+DEX_TOKENS = "https://api.dexscreener.com/latest/dex/tokens/{contract}"
+NEGATIVE_TTL = {"dex": 1800, "all": 900}   # seconds a miss is trusted, per kind
+SEEDED = ("seed", "registry")  # sources that are never missed and own their symbol
+LEARN_PAIRS = 10             # search results folded into the index per query
+MAX_LEARNED = 5000
+MIN_PREFIX = 3
+SAVE_DELAY = 10             # first change → save; later changes ride along
+QUOTE_TTL = 60               # seconds a parsed quote answers repeat lookups
+MAX_QUOTES = 2000
+ADDRESS_RE = re.compile(r"^0x[0-9a-fA-F]{40}$")
+
+# === STATE ===
+ENTRIES = {}                  # key (contract or "sym:<SYMBOL>") -> entry
+TERMS = {}                    # normalised term -> {keys}
+NEGATIVE = {}                 # (kind, term) -> expires at
+QUOTES = {}                   # contract -> PairQuote
+_learned = {}                 # key -> entry, the part that is persisted
+_sorted_terms = []
+_dirty = True
+_seeded = False
+_lock = threading.RLock()
+
+
+def log(msg):
+    print(f"[TokenResolver] {msg}")
+
+
+def norm(text):
+    return " ".join((text or "").lower().replace("$", "").split())
+
+
+# === INDEX ===
+def _add(entry, terms):
+    global _dirty
+    key = entry["contract"] or f"sym:{entry['symbol'].upper()}"
+    old = ENTRIES.get(key)
+    if old:
+        entry = dict(old, **{k: v for k, v in entry.items() if v})
+        if old["source"] in SEEDED:
+            entry["source"] = old["source"]       # search data never demotes a seed
+    ENTRIES[key] = entry
+    for term in filter(None, map(norm, terms)):
+        TERMS.setdefault(term, set()).add(key)
+    _dirty = True
+    return key
+
+
+def _entry(symbol, name="", contract="", chain="", binance="", coingecko="", liquidity=0, source="seed"):
+    return {"symbol": symbol, "name": name or symbol, "contract": (contract or "").lower(), "chain": chain,
+            "binance": binance, "coingecko": coingecko, "liquidity": liquidity, "source": source}
+
+
+def _seed():
+    """Static aliases + the token registry, then whatever past searches taught us."""
+    global _seeded
+    with _lock:
+        if _seeded:
+            return
+        _seeded = True
+        from plugins import web3_connect, price_tracker, token_registry
+        for alias, (binance, cg_id, contract) in web3_connect.ALIASES.items():
+            _add(_entry(alias.upper(), cg_id, contract, "bsc", binance, cg_id), [alias, cg_id])
+        for symbol, ref in price_tracker.KNOWN_TOKENS.items():
+            is_contract = bool(ADDRESS_RE.match(ref))
+            _add(_entry(symbol, contract=ref if is_contract else "", chain="bsc" if is_contract else "",
+                        binance="" if is_contract else ref), [symbol])
+        token_registry.load()
+        for contract, rec in list(token_registry.TOKENS.items()):
+            if rec.get("symbol"):
+                _add(_entry(rec["symbol"], rec.get("name", ""), contract, "bsc", source="registry"),
+                     [rec["symbol"], rec.get("name")])
+        try:
+            with open(INDEX_FILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            data = {}
+        for key, entry in data.get("learned", {}).items():
+            key = _add(entry, [entry["symbol"], entry["name"]])
+            if ENTRIES[key]["source"] == "search":   # older files also hold merged seeds
+                _learned[key] = ENTRIES[key]
+        now = time.time()
+        NEGATIVE.update({tuple(k.split(":", 1)): exp for k, exp in data.get("negative", {}).items() if exp > now})
+    log(f"📚 Index ready: {len(ENTRIES)} tokens, {len(TERMS)} terms")
+
+
+def save():
+    with _lock:
+        now = time.time()
+        data = {"learned": dict(_learned),
+                "negative": {f"{kind}:{term}": exp for (kind, term), exp in NEGATIVE.items() if exp > now}}
+    os.makedirs(os.path.dirname(INDEX_FILE), exist_ok=True)
+    tmp = f"{INDEX_FILE}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, INDEX_FILE)
+
+
+def _save_later():
+    # Don't push a queued save back — under steady traffic it would never run
+    if not scheduler.pending("token_resolver.save"):
+        scheduler.once("token_resolver.save", save, SAVE_DELAY, owner="token_resolver")
+
+
+def learn(pairs):
+    """Fold DexScreener pairs into the index (base token → contract, chain, liquidity)."""
+    with _lock:
+        for p in pairs[:LEARN_PAIRS]:
+            base = p.get("baseToken") or {}
+            if not base.get("address") or not base.get("symbol"):
+                continue
+            liquidity = float((p.get("liquidity") or {}).get("usd") or 0)
+            key = base["address"].lower()
+            if liquidity < (ENTRIES.get(key) or {}).get("liquidity", 0):
+                continue                      # keep the liquidity of its deepest pair
+            if len(_learned) >= MAX_LEARNED and key not in _learned:
+                continue
+            entry = _entry(base["symbol"], base.get("name", ""), key, p.get("chainId", ""),
+                           liquidity=liquidity, source="search")
+            _add(entry, [base["symbol"], base.get("name")])
+            if ENTRIES[key]["source"] == "search":   # seeds are rebuilt at startup, not persisted
+                _learned[key] = ENTRIES[key]
+    _save_later()
+
+
+# === LOOKUP ===
+def _rank(q):
+    # Exact symbol beats name / alias; then the deepest liquidity seen
+    return lambda e: (norm(e["symbol"]) == q, bool(e["contract"]), e["liquidity"], e["source"] == "seed")
+
+
+def resolve(query):
+    """Index entry for an exact symbol / name / alias / contract, or None."""
+    _seed()
+    q = norm(query)
+    if ADDRESS_RE.match(q):
+        return ENTRIES.get(q) or _entry("", contract=q, source="address")
+    with _lock:
+        keys = TERMS.get(q)
+        return max((ENTRIES[k] for k in keys), key=_rank(q)) if keys else None
+
+
+def suggest(query, limit=5):
+    """Symbols whose terms start with the query — "did you mean", never an answer."""
+    _seed()
+    q = norm(query)
+    if len(q) < MIN_PREFIX:
+        return []
+    with _lock:
+        keys = set()
+        for term in _prefix(q):
+            keys |= TERMS[term]
+        entries = sorted((ENTRIES[k] for k in keys), key=_rank(q), reverse=True)
+    out = []
+    for e in entries:
+        if e["symbol"] and e["symbol"].upper() not in out and norm(e["symbol"]) != q:
+            out.append(e["symbol"].upper())
+    return out[:limit]
+
+
+def _prefix(q, limit=50):
+    global _sorted_terms, _dirty
+    if _dirty:
+        _sorted_terms, _dirty = sorted(TERMS), False
+    out, i = [], bisect.bisect_left(_sorted_terms, q)
+    while i < len(_sorted_terms) and _sorted_terms[i].startswith(q) and len(out) < limit:
+        out.append(_sorted_terms[i])
+        i += 1
+    return out
+
+
+def canonical(symbol):
+    """Contract that owns a symbol's price series: a seeded / registry entry
+    if one exists for the exact symbol (Binance-only seeds own it with no
+    contract at all), else the deepest-liquidity learned entry."""
+    _seed()
+    q = norm(symbol)
+    with _lock:
+        entries = [ENTRIES[k] for k in TERMS.get(q, ()) if norm(ENTRIES[k]["symbol"]) == q]
+    seeded = [e for e in entries if e["source"] in SEEDED]
+    if seeded:
+        return max(seeded, key=lambda e: bool(e["contract"]))["contract"]
+    return max(entries, key=_rank(q))["contract"] if entries else ""
+
+
+# === NEGATIVE CACHE ===
+def miss(query, kind="all"):
+    """Remember that a source answered "no such token". Callers must not
+    report errors / timeouts here; seeded and registry tokens are never missed."""
+    _seed()
+    q = norm(query)
+    with _lock:
+        keys = list(TERMS.get(q, ())) + ([q] if q in ENTRIES else [])     # a term or a contract
+        if any(ENTRIES[k]["source"] in SEEDED for k in keys):
+            return
+        NEGATIVE[(kind, q)] = time.time() + NEGATIVE_TTL[kind]
+    _save_later()
+
+
+def is_missing(query, kind="all"):
+    _seed()
+    key = (kind, norm(query))
+    exp = NEGATIVE.get(key)
+    if exp is None:
+        return False
+    if exp > time.time():
+        metrics_exporter.cache_hit("token_negative", True)
+        return True
+    NEGATIVE.pop(key, None)
+    return False
+
+
+# === DEXSCREENER ===
+def _quote(pair):
+    quote = PairQuote.parse(pair)
+    if quote.contract:
+        if len(QUOTES) >= MAX_QUOTES:
+            for contract in [c for c, q in QUOTES.items() if q.age >= QUOTE_TTL]:
+                QUOTES.pop(contract, None)
+        QUOTES[quote.contract] = quote
+    if quote.price and quote.contract and canonical(quote.symbol) == quote.contract:
+        price_history.record(quote.symbol, quote.price, source="dexscreener")
+    return quote
+
+
+def find_pair(query, timeout=6):
+    """Best DexScreener pair for a free-text query as a PairQuote, hitting search?q=
+    only when the local index can't resolve it. Returns None on a (cached) miss."""
+    if is_missing(query, "dex"):
+        return None
+    entry = resolve(query)
+    metrics_exporter.cache_hit("token_resolver", bool(entry and entry["contract"]))
+    if entry and entry["contract"]:
+        quote = QUOTES.get(entry["contract"])
+        metrics_exporter.cache_hit("pair_quote", bool(quote and quote.age < QUOTE_TTL))
+        if quote and quote.age < QUOTE_TTL:
+            return quote
+        data = requests.get(DEX_TOKENS.format(contract=entry["contract"]), timeout=timeout).json()
+        pairs = [p for p in data.get("pairs") or []
+                 if (p.get("baseToken") or {}).get("address", "").lower() == entry["contract"]]
+        if pairs:
+            pair = pair_ranker.best(pairs, chain=entry["chain"] or None)
+            learn([pair])
+            return _quote(pair)
+        if entry["source"] == "address":        # a wallet, or a token with no pool
+            miss(query, "dex")
+            return None
+        if ADDRESS_RE.match(norm(query)):       # search?q=<contract> adds only pairs quoting it
+            return None
+
+    data = requests.get(DEX_SEARCH.format(q=query.strip()), timeout=timeout).json()
+    pairs = data.get("pairs") or []
+    if not pairs:
+        miss(query, "dex")
+        return None
+    # Search also matches quote tokens and look-alikes — rank the exact symbol hits if any
+    q = norm(query)
+    exact = [p for p in pairs if norm((p.get("baseToken") or {}).get("symbol")) == q]
+    ranked = pair_ranker.top(pairs, LEARN_PAIRS)
+    learn(ranked)
+    return _quote(pair_ranker.best(exact) if exact else ranked[0])
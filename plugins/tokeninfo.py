@@ -7,13 +7,13 @@ real-time token insights, liquidity scan, and neural ranking.
 💫 Powered by WENBNB Neural Engine — Token Intelligence 24×7 ⚡
 """
 
-from telegram.ext import CommandHandler
 from telegram import Update
 import requests, html, math, random, time
 
+from plugins import binance_stream, price_history, token_resolver
+
 # === Branding ===
 BRAND_TAG = "💫 WENBNB Neural Engine — Token Intelligence 24×7 ⚡"
-DEX_URL = "https://api.dexscreener.com/latest/dex/search?q={q}"
 CG_PRICE = "https://api.coingecko.com/api/v3/simple/price?ids={id}&vs_currencies=usd"
 BINANCE_URL = "https://api.binance.com/api/v3/ticker/price?symbol={symbol}"
 
@@ -25,15 +25,6 @@ def short_float(v):
         else: return f"{val:.8f}"
     except: return str(v)
 
-def detect_chain(dex):
-    dex = (dex or "").lower()
-    if "pancake" in dex: return "BSC"
-    if "uniswap" in dex: return "Ethereum"
-    if "base" in dex: return "Base"
-    if "arbitrum" in dex: return "Arbitrum"
-    if "solana" in dex: return "Solana"
-    return "Unknown"
-
 def neural_rank(liq, vol):
     try:
         L = max(1.0, float(liq))
@@ -53,10 +44,19 @@ def get_token_info(query):
     liquidity, volume, rank = 0, 0, "N/A"
     pair_url, address = "", ""
 
-    # 1️⃣ Try Binance (for known tickers)
+    # answered stays True only while every source replied "no such token" —
+    # an error / timeout / rate limit must never become a cached miss
+    answered = True
+
+    # 1️⃣ Try Binance (for known tickers) — live stream first, then REST
     try:
-        data = requests.get(BINANCE_URL.format(symbol=query.upper() + "USDT"), timeout=4).json()
+        pair = query.upper() + "USDT"
+        live = binance_stream.price(pair)
+        data = {"price": live} if live else requests.get(BINANCE_URL.format(symbol=pair), timeout=4).json()
         if "price" in data:
+            if not live:
+                price_history.record(query, data["price"], source="binance")
+                binance_stream.track(pair)
             return {
                 "name": query.upper(),
                 "symbol": query.upper(),
@@ -69,28 +69,29 @@ def get_token_info(query):
                 "url": "",
                 "address": ""
             }
+        if data.get("code") != -1121:                  # anything but "Invalid symbol"
+            answered = False
     except:
-        pass
+        answered = False
 
-    # 2️⃣ DexScreener scan
+    # 2️⃣ DexScreener scan (resolver: local index → per-token endpoint, search only when unseen)
     try:
-        dex = requests.get(DEX_URL.format(q=query), timeout=6).json()
-        pairs = dex.get("pairs", [])
-        if pairs:
-            p = pairs[0]
-            base = p.get("baseToken", {})
-            token_name = base.get("name") or query.upper()
-            symbol = base.get("symbol") or query.upper()
-            price = p.get("priceUsd", "N/A")
-            chain = detect_chain(p.get("dexId"))
-            dex_name = p.get("dexId", "DEX").capitalize()
-            liquidity = p.get("liquidity", {}).get("usd", 0)
-            volume = p.get("volume", {}).get("h24", 0)
+        q = token_resolver.find_pair(query)     # PairQuote
+        if q:
+            answered = False                      # the token exists, whatever its price
+            token_name = q.name or query.upper()
+            symbol = q.symbol or query.upper()
+            price = q.price if q.price is not None else "N/A"
+            chain = q.chain_label
+            dex_name = q.dex_label
+            liquidity = q.liquidity
+            volume = q.volume24
             rank = neural_rank(liquidity, volume)
-            pair_url = p.get("url", "")
-            address = base.get("address", "")
-    except:
-        pass
+            pair_url = q.url
+            address = q.contract
+    except Exception as e:
+        print(f"[TokenInfo] DexScreener lookup failed for {query}: {e}")
+        answered = False
 
     # 3️⃣ CoinGecko fallback
     if price == "N/A":
@@ -99,8 +100,13 @@ def get_token_info(query):
             if query in cg_data:
                 price = cg_data[query]["usd"]
                 dex_name = "CoinGecko"
+                price_history.record(symbol or query, price, source="coingecko")
+            elif "status" in cg_data or "error" in cg_data:      # rate limit / error body
+                answered = False
         except:
-            pass
+            answered = False
+    if price == "N/A" and answered:
+        token_resolver.miss(query)
 
     return {
         "name": token_name,
@@ -120,6 +126,12 @@ def tokeninfo_cmd(update: Update, context):
     try:
         context.bot.send_chat_action(chat_id=update.effective_chat.id, action="typing")
         token = context.args[0] if context.args else "wenbnb"
+        if token_resolver.is_missing(token):
+            update.message.reply_text(
+                f"🔍 No token data for <b>{html.escape(token)}</b> — check the symbol or contract.\n\n{BRAND_TAG}",
+                parse_mode="HTML"
+            )
+            return
         info = get_token_info(token)
         ts = time.strftime("%H:%M:%S", time.localtime())
 
@@ -160,6 +172,6 @@ def tokeninfo_cmd(update: Update, context):
         update.message.reply_text("⚙️ Neural Engine syncing... please retry shortly.", parse_mode="HTML")
 
 # === Register ===
-def register(dispatcher, core=None):
-    dispatcher.add_handler(CommandHandler("tokeninfo", tokeninfo_cmd))
-    print("✅ Loaded plugin: plugins.tokeninfo (v5.5-Pro Sync)")
+PLUGIN_MANIFEST = {
+    "commands": {"tokeninfo": "tokeninfo_cmd"},
+}
@@ -0,0 +1,272 @@
+"""
+WENBNB Wallet Indexer v1.0 — Local On-Chain Activity Index for Airdrop Scoring
+──────────────────────────────────────────────────────────────────────────────
+• Per wallet: nonce (lifetime sent txs), BEP-20 transfers in both
+  directions (eth_getLogs on the Transfer topic, chunked over block
+  ranges and sent as JSON-RPC batches) and the `to` of every tx the
+  wallet sent (protocol interactions)
+• Stored in SQLite (data/wallet_index.db) with a per-wallet last-indexed
+  block — a rescan only fetches blocks after it
+• Ranges a node refuses (too many results / range limit) are split in
+  half and retried; any other RPC error fails the scan. A range still
+  refused at MIN_CHUNK is a gap: last_block stops before it, so the next
+  scan retries it, and the wallet has no score until it is filled
+• features() / score() are plain SQL over the local index — milliseconds
+  once a wallet has been indexed
+• lookup() never scans on the caller's thread: indexing runs on the
+  scheduler and lookup() answers None ("indexing") until it is complete
+
+    wallet_indexer.index("0xabc…")       # first call: lookback window, then incremental
+    wallet_indexer.score(wallet_indexer.lookup("0xabc…"))
+"""
+
+import math, os, re, sqlite3, threading, time
+
+from plugins import chain_reads, metrics_exporter, scheduler
+
+DB_FILE = "data/wallet_index.db"
+TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+LOOKBACK_BLOCKS = int(os.getenv("WALLET_INDEX_LOOKBACK_BLOCKS", "1000000"))   # first index window
+LOG_CHUNK = 5000              # blocks per eth_getLogs — public BSC nodes cap the range
+MIN_CHUNK = 50                # stop splitting below this; the range is recorded as a gap
+BATCH_SIZE = 25               # requests per JSON-RPC batch POST
+CONFIRMATIONS = 3             # stay this far behind head so reorgs don't leave ghost logs
+BLOCKS_PER_DAY = int(os.getenv("BSC_BLOCKS_PER_DAY", "115200"))   # 0.75 s blocks
+REFRESH_AGE = 60              # seconds before a lookup triggers a rescan
+# Refusals that mean "ask for less" — split the range. Anything else (method
+# not found, auth, rate limit, …) fails the scan instead of halving forever
+LIMIT_CODES = {-32005, -32602, -32000}
+LIMIT_RE = re.compile(r"more than \d+ results|too many results|block range|range (is )?too (large|wide)|"
+                      r"range limit|exceed(s|ed)? (the )?max|limited to|response size|result window", re.I)
+
+# Routers / pools / lending markets a sent tx can target
+PROTOCOLS = {
+    "0x10ed43c718714eb63d5aa57b78b54704e256024e": "PancakeSwap v2",
+    "0x13f4ea83d0bd40e75c8222255bc855a974568dd4": "PancakeSwap v3",
+    "0xa5f8c5dbd5f286960b9d90548680ae5ff69c04cd": "PancakeSwap Farms",
+    "0x45c54210128a065de780c4b0df3d16664f7f859e": "PancakeSwap Staking",
+    "0x3a6d8ca21d1cf76f653a67577fa0d27453350dd8": "Biswap",
+    "0x1111111254eeb25477b68fb85ed929f73a960582": "1inch",
+    "0xa07c5b74c9b40447a954e1466938b865b6bbea36": "Venus",
+    "0xfd5840cd36d94d7229439859c0112a4185bc0255": "Venus",
+    "0xfd36e2c2a6789db23113685031d7f16329158384": "Venus",
+    "0x4a364f8c717caad9a442737eb7b8a55cc6cf18d8": "Stargate",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS wallets (
+    address TEXT PRIMARY KEY, first_block INTEGER, last_block INTEGER,
+    nonce INTEGER, gaps INTEGER DEFAULT 0, updated REAL
+);
+CREATE TABLE IF NOT EXISTS transfers (
+    wallet TEXT, block INTEGER, tx TEXT, log_index INTEGER, token TEXT,
+    counterparty TEXT, outgoing INTEGER, amount TEXT,
+    PRIMARY KEY (wallet, tx, log_index)
+);
+CREATE INDEX IF NOT EXISTS transfers_wallet_block ON transfers (wallet, block);
+CREATE TABLE IF NOT EXISTS txs (
+    wallet TEXT, tx TEXT, block INTEGER, to_addr TEXT,
+    PRIMARY KEY (wallet, tx)
+);
+"""
+
+# === STATE ===
+_db = None
+_db_lock = threading.Lock()
+_wallet_locks = {}
+FAILED = {}                   # address -> last background index error, reported once by lookup()
+
+
+class IndexIncomplete(Exception):
+    """Some block ranges could not be fetched; the wallet has no trustworthy score yet."""
+
+
+def log(msg):
+    print(f"[WalletIndexer] {msg}")
+
+
+def db():
+    global _db
+    with _db_lock:
+        if _db is None:
+            os.makedirs(os.path.dirname(DB_FILE), exist_ok=True)
+            _db = sqlite3.connect(DB_FILE, check_same_thread=False)
+            _db.execute("PRAGMA journal_mode=WAL")
+            _db.executescript(SCHEMA)
+        return _db
+
+
+def _wallet_lock(address):
+    with _db_lock:
+        return _wallet_locks.setdefault(address, threading.Lock())
+
+
+def _topic(address):
+    return "0x" + "0" * 24 + address[2:].lower()
+
+
+def _addr(topic):
+    return "0x" + topic[-40:].lower()
+
+
+# === FETCH ===
+def _rpc_many(calls):
+    out = []
+    for i in range(0, len(calls), BATCH_SIZE):
+        out += chain_reads.rpc_batch(calls[i:i + BATCH_SIZE])
+    return out
+
+
+def _is_limit(err):
+    return (err.code in LIMIT_CODES or err.code is None) and bool(LIMIT_RE.search(str(err)))
+
+
+def fetch_logs(address, start, end):
+    """Transfer logs from or to `address` in [start, end] → (logs, gap ranges).
+    Raises RpcError on anything but a range / result-limit refusal."""
+    pending = []
+    for lo in range(start, end + 1, LOG_CHUNK):
+        hi = min(lo + LOG_CHUNK - 1, end)
+        pending += [(lo, hi, [TRANSFER_TOPIC, _topic(address)]),
+                    (lo, hi, [TRANSFER_TOPIC, None, _topic(address)])]
+    logs, gaps = [], []
+    while pending:
+        calls = [("eth_getLogs", [{"fromBlock": hex(lo), "toBlock": hex(hi), "topics": topics}])
+                 for lo, hi, topics in pending]
+        results, retry = _rpc_many(calls), []
+        for (lo, hi, topics), result in zip(pending, results):
+            if not isinstance(result, chain_reads.RpcError):
+                logs += result or []
+            elif not _is_limit(result):
+                raise result
+            elif hi - lo + 1 > MIN_CHUNK:          # node refused the range — halve it
+                mid = (lo + hi) // 2
+                retry += [(lo, mid, topics), (mid + 1, hi, topics)]
+            else:
+                gaps.append((lo, hi))
+        pending = retry
+    metrics_exporter.inc("wallet_index_logs", len(logs))
+    return logs, gaps
+
+
+def index(address):
+    """Bring one wallet's index up to head; returns the number of new transfers.
+    Raises IndexIncomplete (after storing what was fetched) if ranges were lost."""
+    address = address.lower()
+    with _wallet_lock(address):
+        conn = db()
+        with _db_lock:
+            row = conn.execute("SELECT last_block FROM wallets WHERE address = ?", (address,)).fetchone()
+        head, nonce = _rpc_many([("eth_blockNumber", []), ("eth_getTransactionCount", [address, "latest"])])
+        if isinstance(head, chain_reads.RpcError):
+            raise head
+        end = int(head, 16) - CONFIRMATIONS
+        start = row[0] + 1 if row else max(end - LOOKBACK_BLOCKS, 0)
+        if start > end:
+            return 0
+
+        started = time.time()
+        logs, gaps = fetch_logs(address, start, end)
+        # Never mark blocks at or after the first gap as indexed — the next scan starts there
+        covered = min(lo for lo, _ in gaps) - 1 if gaps else end
+        transfers = {}
+        for lg in logs:
+            topics = lg.get("topics") or []
+            if len(topics) != 3:                     # ERC-721 puts tokenId in topic 3 — skip NFTs
+                continue
+            sender, receiver = _addr(topics[1]), _addr(topics[2])
+            outgoing = int(sender == address)
+            transfers[(lg["transactionHash"], int(lg["logIndex"], 16))] = (
+                address, int(lg["blockNumber"], 16), lg["transactionHash"], int(lg["logIndex"], 16),
+                lg["address"].lower(), receiver if outgoing else sender, outgoing,
+                str(int((lg.get("data") or "0x")[2:66] or "0", 16)))
+
+        # Which contract did each tx call? Only txs the wallet sent count as interactions
+        with _db_lock:
+            known = {r[0] for r in conn.execute("SELECT tx FROM txs WHERE wallet = ?", (address,))}
+        hashes = sorted({t[2] for t in transfers.values()} - known)
+        txs = []
+        for h, tx in zip(hashes, _rpc_many([("eth_getTransactionByHash", [h]) for h in hashes])):
+            if isinstance(tx, dict) and (tx.get("from") or "").lower() == address:
+                txs.append((address, h, int(tx["blockNumber"], 16), (tx.get("to") or "").lower()))
+
+        with _db_lock:
+            conn.executemany("INSERT OR IGNORE INTO transfers VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                             transfers.values())
+            conn.executemany("INSERT OR IGNORE INTO txs VALUES (?, ?, ?, ?)", txs)
+            conn.execute(
+                "INSERT INTO wallets (address, first_block, last_block, nonce, gaps, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(address) DO UPDATE SET "
+                "last_block = excluded.last_block, nonce = COALESCE(excluded.nonce, nonce), "
+                "gaps = excluded.gaps, updated = excluded.updated",
+                (address, start, covered, None if isinstance(nonce, chain_reads.RpcError) else int(nonce, 16),
+                 len(gaps), time.time()))
+            conn.commit()
+        log(f"📇 {address[:10]}… blocks {start}-{covered}: {len(transfers)} transfers, "
+            f"{len(txs)} txs in {time.time() - started:.1f}s" + (f" ({len(gaps)} gaps)" if gaps else ""))
+        if gaps:
+            raise IndexIncomplete(f"{len(gaps)} block range(s) refused by the node, from block {covered + 1}")
+        return len(transfers)
+
+
+# === FEATURES ===
+def features(address):
+    """Eligibility features from the local index, or None if the wallet was never indexed."""
+    address = address.lower()
+    conn = db()
+    with _db_lock:
+        w = conn.execute("SELECT first_block, last_block, nonce, gaps, updated FROM wallets "
+                         "WHERE address = ?", (address,)).fetchone()
+        if not w:
+            return None
+        t = conn.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT token), COUNT(DISTINCT counterparty), "
+            "COUNT(DISTINCT block / ?), SUM(outgoing), MIN(block), MAX(block) "
+            "FROM transfers WHERE wallet = ?", (BLOCKS_PER_DAY, address)).fetchone()
+        targets = conn.execute("SELECT to_addr, COUNT(*) FROM txs WHERE wallet = ? GROUP BY to_addr",
+                               (address,)).fetchall()
+    protocols = {}
+    for to, n in targets:
+        if to in PROTOCOLS:
+            protocols[PROTOCOLS[to]] = protocols.get(PROTOCOLS[to], 0) + n
+    return {
+        "address": address, "nonce": w[2] or 0, "transfers": t[0], "sent": t[4] or 0,
+        "tokens": t[1], "counterparties": t[2], "active_days": t[3],
+        "contracts": len(targets), "protocols": protocols,
+        "protocol_txs": sum(protocols.values()),
+        "first_seen": t[5], "last_seen": t[6],
+        "window_days": w[1] // BLOCKS_PER_DAY - w[0] // BLOCKS_PER_DAY + 1, "gaps": w[3], "updated": w[4],
+    }
+
+
+def score(f):
+    """0-100 from real activity — each feature saturates so no single one dominates."""
+    def part(value, full, weight):
+        return weight * min(math.log1p(value) / math.log1p(full), 1.0)
+    return round(part(f["nonce"], 500, 25) + part(f["active_days"], 60, 20)
+                 + part(len(f["protocols"]), 5, 20) + part(f["protocol_txs"], 100, 10)
+                 + part(f["tokens"], 30, 15) + part(f["transfers"], 300, 10))
+
+
+def _index_job(address):
+    try:
+        index(address)
+        FAILED.pop(address, None)
+    except Exception as e:
+        FAILED[address] = e
+        log(f"⚠️ {address[:10]}… index failed: {e}")
+
+
+def lookup(address):
+    """features() with index upkeep, never scanning on the caller's thread.
+    Returns None while the wallet is (re)indexing — first scan or unfilled
+    gaps — and raises the last background failure once so it can be reported."""
+    address = address.lower()
+    err = FAILED.pop(address, None)
+    if err is not None:
+        raise err
+    f = features(address)
+    if f is None or f["gaps"] or time.time() - f["updated"] > REFRESH_AGE:
+        scheduler.once(f"wallet_indexer.index.{address}", _index_job, 0,
+                       args=(address,), owner="wallet_indexer")
+    return f if f is not None and not f["gaps"] else None
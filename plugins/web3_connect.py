@@ -2,25 +2,25 @@
 WENBNB Web3 Connect v6.3.2 — Hybrid RPC Fix
 ──────────────────────────────────────────────
 🔥 Fully self-contained — no BscScan key required.
-💰 Wallet balance & Token supply use RPC calls.
+💰 Wallet portfolio & Token supply use batched RPC reads (plugins/chain_reads:
+   Multicall3 aggregate3 — one round trip for BNB + dozens of tokens).
+📦 Token metadata + supply come from the token registry (cached, refreshed
+   in the background).
 💎 Token price via Binance → CoinGecko → DexScreener
 ⚡ Powered by WENBNB Neural Engine — Web3 Intelligence 24×7
 """
 
-import requests, time, json
-from web3 import Web3
+import os, requests, time, json
 from telegram import Update
-from telegram.ext import CommandHandler, CallbackContext
+from telegram.ext import CallbackContext
+from plugins import binance_stream, chain_reads, price_history, scheduler, token_registry, token_resolver
 
 # === CONFIG ===
-BSC_RPC = "https://bsc-dataseed.binance.org/"
-w3 = Web3(Web3.HTTPProvider(BSC_RPC))
 BRAND_TAG = "🚀 <b>WENBNB Neural Engine</b> — Web3 Intelligence 24×7 ⚡"
 
 # === PRICE SOURCES ===
 BINANCE_URL = "https://api.binance.com/api/v3/ticker/price?symbol={symbol}"
 COINGECKO_URL = "https://api.coingecko.com/api/v3/simple/price?ids={id}&vs_currencies=usd"
-DEX_URL = "https://api.dexscreener.com/latest/dex/tokens/{contract}"
 
 # === TOKEN MAP ===
 ALIASES = {
@@ -36,6 +36,31 @@ ALIASES = {
     "wenbnb": ("", "wenbnb", "0x4507cEf57C46789eF8d1a19EA45f4216bae2B528"),
 }
 
+# === WALLET WATCHLIST (BEP-20, read in one Multicall3 batch) ===
+WALLET_TOKENS = [t.strip() for t in os.getenv("WALLET_TOKENS", "").split(",") if t.strip()] or [
+    "0x55d398326f99059fF775485246999027B3197955",  # USDT
+    "0x8AC76a51cc950d9822D68b83fE1Ad97B32Cd580d",  # USDC
+    "0xe9e7CEA3DedcA5984780Bafc599bD69ADd087D56",  # BUSD
+    "0xc5f0f7b66764F6ec8C8Dff7BA683102295E16409",  # FDUSD
+    "0x1AF3F329e8BE154074D8769D1FFa4eE058B1DBc3",  # DAI
+    "0xbb4CdB9CBd36B01bD1cBaEBF2De08d9173bc095c",  # WBNB
+    "0x2170Ed0880ac9A755fd29B2688956BD959F933F8",  # ETH
+    "0x7130d2A12B9BCbFAe4f2634d864A1Ee1Ce3Ead9c",  # BTCB
+    "0x0E09FaBB73Bd3Ade0a17ECC321fD13a19e81cE82",  # CAKE
+    "0xbA2aE424d960c26247Dd6c32edC70B295c744C43",  # DOGE
+    "0x1D2F0da169ceB9fC7B3144628dB156f3F6c60dBE",  # XRP
+    "0x3EE2200Efb3400fAbB9AacF31297cBdD1d435D47",  # ADA
+    "0x7083609fCE4d1d8Dc0C979AAb8c869Ea2C873402",  # DOT
+    "0xF8A0BF9cF54Bb92F17374d9e9A321E6a111a51bD",  # LINK
+    "0xBf5140A22578168FD562DCcF235E5D43A02ce9B1",  # UNI
+    "0xCE7de646e7208a4Ef112cb6ed5038FA6cC6b12e3",  # TRX
+    "0x2859e4544C4bB03966803b044A93563Bd2D0DD4D",  # SHIB
+    "0x4B0F1812e5Df2A09796481Ff14017e6005508003",  # TWT
+    "0xcF6BB5389c92Bdda8a3747Ddb454cB7a64626C63",  # XVS
+    "0x4507cEf57C46789eF8d1a19EA45f4216bae2B528",  # WENBNB
+]
+WALLET_SHOW = 15
+
 # === TOKEN PRICE ===
 def get_token_price(token: str):
     token = token.lower().strip()
@@ -46,12 +71,17 @@ def get_token_price(token: str):
 
     binance_symbol, cg_id, contract = alias
 
-    # 1️⃣ Binance
+    # 1️⃣ Binance — live stream first, REST when the pair isn't streamed
     if binance_symbol:
+        p = binance_stream.price(binance_symbol)
+        if p:
+            return f"💰 <b>{token.upper()} Price:</b> ${p:,.6f}\n📈 <b>Source:</b> Binance (live)\n\n{BRAND_TAG}"
         try:
             r = requests.get(BINANCE_URL.format(symbol=binance_symbol), timeout=5).json()
             if "price" in r:
                 p = float(r["price"])
+                price_history.record(token, p, source="binance")
+                binance_stream.track(binance_symbol)
                 return f"💰 <b>{token.upper()} Price:</b> ${p:,.6f}\n📈 <b>Source:</b> Binance\n\n{BRAND_TAG}"
         except Exception:
             pass
@@ -61,41 +91,59 @@ def get_token_price(token: str):
         r = requests.get(COINGECKO_URL.format(id=cg_id), timeout=6).json()
         if cg_id in r:
             p = float(r[cg_id]["usd"])
+            price_history.record(token, p, source="coingecko")
             return f"💰 <b>{token.upper()} Price:</b> ${p:,.8f}\n📈 <b>Source:</b> CoinGecko\n\n{BRAND_TAG}"
     except Exception:
         pass
 
-    # 3️⃣ DexScreener
+    # 3️⃣ DexScreener — via the resolver: only pairs where the alias contract is
+    # the base token, best-ranked, recorded only under its canonical symbol
     try:
-        r = requests.get(DEX_URL.format(contract=contract), timeout=8).json()
-        pairs = r.get("pairs", [])
-        if pairs:
-            p = float(pairs[0].get("priceUsd", 0))
-            name = pairs[0].get("baseToken", {}).get("name", token.upper())
-            return f"💰 <b>{name} ({token.upper()})</b>\n💎 <b>Price:</b> ${p:,.8f}\n📈 <b>Source:</b> DexScreener\n\n{BRAND_TAG}"
-    except Exception:
-        pass
+        quote = token_resolver.find_pair(contract, timeout=8)
+        if quote and quote.price:
+            name = quote.name or token.upper()
+            return f"💰 <b>{name} ({token.upper()})</b>\n💎 <b>Price:</b> ${quote.price:,.8f}\n📈 <b>Source:</b> DexScreener\n\n{BRAND_TAG}"
+    except Exception as e:
+        print(f"[Web3Connect] ⚠️ DexScreener lookup failed for {token}: {e}")
 
     return f"⏳ <b>{token.upper()}</b> data syncing to NeuralFeed — coming soon 🚀\n\n{BRAND_TAG}"
 
 # === WALLET BALANCE (RPC BASED) ===
 def get_wallet_balance(address):
     try:
-        checksum = w3.to_checksum_address(address)
-        balance_wei = w3.eth.get_balance(checksum)
-        balance_bnb = balance_wei / 1e18
-        return f"{balance_bnb:.6f} BNB"
+        if not chain_reads.is_address(address):
+            raise ValueError(address)
+        balance = chain_reads.read_many([(chain_reads.MULTICALL3, "getEthBalance", address)])[0]
+        return f"{balance / 1e18:.6f} BNB"
     except Exception:
         return "❌ Invalid address or RPC error."
 
+def get_wallet_portfolio(address):
+    """BNB + every WALLET_TOKENS balance in one round trip, formatted for /wallet."""
+    try:
+        if not chain_reads.is_address(address):
+            raise ValueError(address)
+        p = chain_reads.portfolio(address, WALLET_TOKENS)
+    except Exception:
+        return "❌ Invalid address or RPC error."
+    lines = [f"💎 <b>BNB:</b> <b>{p['native']:.6f}</b>"]
+    for t in p["tokens"][:WALLET_SHOW]:
+        lines.append(f"• <b>{t['symbol']}</b>: {t['balance']:,.6g}")
+    if len(p["tokens"]) > WALLET_SHOW:
+        lines.append(f"… +{len(p['tokens']) - WALLET_SHOW} more")
+    if not p["tokens"]:
+        lines.append(f"<i>No balances among {len(WALLET_TOKENS)} tracked tokens</i>")
+    return "\n".join(lines)
+
 # === TOKEN SUPPLY (RPC BASED) ===
 def get_token_supply(contract):
     try:
-        abi = [{"constant": True, "inputs": [], "name": "totalSupply", "outputs": [{"name": "", "type": "uint256"}], "type": "function"}]
-        checksum = w3.to_checksum_address(contract)
-        token = w3.eth.contract(address=checksum, abi=abi)
-        supply = token.functions.totalSupply().call()
-        return f"{supply / 1e18:,.0f} tokens"
+        if not chain_reads.is_address(contract):
+            raise ValueError(contract)
+        info = token_registry.lookup(contract)   # local after the first call
+        if not info:
+            raise ValueError("not an ERC-20")
+        return f"{info['supply']:,.0f} {info['symbol']}"
     except Exception:
         return "❌ Could not fetch token supply."
 
@@ -130,8 +178,8 @@ def wallet(update: Update, context: CallbackContext):
         update.message.reply_text("💡 Usage: /wallet <BSC_address>")
         return
     address = context.args[0]
-    balance = get_wallet_balance(address)
-    text = f"👛 <b>Wallet:</b> <code>{address}</code>\n💎 <b>Balance:</b> <b>{balance}</b>\n\n{BRAND_TAG}"
+    holdings = get_wallet_portfolio(address)
+    text = f"👛 <b>Wallet:</b> <code>{address}</code>\n{holdings}\n\n{BRAND_TAG}"
     update.message.reply_text(text, parse_mode="HTML")
 
 def supply(update: Update, context: CallbackContext):
@@ -143,10 +191,24 @@ def supply(update: Update, context: CallbackContext):
     text = f"📊 <b>Token Supply</b>\n<code>{contract}</code>\n💰 <b>Total:</b> <b>{supply}</b>\n\n{BRAND_TAG}"
     update.message.reply_text(text, parse_mode="HTML")
 
-def register_handlers(dp):
-    dp.add_handler(CommandHandler("web3", web3_panel))
-    dp.add_handler(CommandHandler("tokenprice", tokenprice))
-    dp.add_handler(CommandHandler("wallet", wallet))
-    dp.add_handler(CommandHandler("supply", supply))
-    dp.add_handler(CommandHandler("analyze", analyze_wallet))
-    print("✅ Loaded plugin: plugins.web3_connect (v6.3.2-Hybrid RPC)")
+# === SETUP ===
+def _warm_tokens():
+    try:
+        token_registry.warm(WALLET_TOKENS)
+    except Exception as e:
+        print(f"[Web3Connect] ⚠️ Token warm-up skipped: {e}")
+
+def warm_registry(dispatcher):
+    # Off the setup path: a slow RPC node must not hold up (or fail) plugin setup
+    scheduler.once("web3_connect.warm", _warm_tokens, 0, owner="web3_connect")
+
+PLUGIN_MANIFEST = {
+    "setup": "warm_registry",
+    "commands": {
+        "web3": "web3_panel",
+        "tokenprice": "tokenprice",
+        "wallet": "wallet",
+        "supply": "supply",
+        "analyze": "analyze_wallet",
+    },
+}
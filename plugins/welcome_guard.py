@@ -1,10 +1,11 @@
 import os
 from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton, ChatPermissions
-from telegram.ext import MessageHandler, Filters, CallbackContext, CallbackQueryHandler
-from threading import Timer
+from telegram.ext import CallbackContext, DispatcherHandlerStop
 import time
 import secrets
 
+from plugins import scheduler
+
 PENDING_VERIFY = {}  # uid: {"ts": time, "msg_id": id, "token": token}
 VERIFY_TIMEOUT = 60  # seconds
 ADMIN_IDS = [int(os.getenv("OWNER_ID", "0"))]
@@ -51,7 +52,9 @@ def send_welcome(update, context, member):
     sent = context.bot.send_message(chat_id, msg, reply_markup=keyboard, parse_mode="Markdown")
     PENDING_VERIFY[uid]["msg_id"] = sent.message_id
 
-    Timer(VERIFY_TIMEOUT, check_kick, args=(context, chat_id, uid, name)).start()
+    # one-shot scheduler task instead of a Timer thread per joiner
+    scheduler.once(f"welcome_guard.kick.{uid}", check_kick, VERIFY_TIMEOUT,
+                   args=(context, chat_id, uid, name), owner="welcome_guard")
 
 
 def check_kick(context, chat_id, uid, name):
@@ -80,7 +83,7 @@ def verify_response(update: Update, context: CallbackContext):
             update.message.delete()  # delete unverified messages
         except:
             pass
-        return
+        raise DispatcherHandlerStop  # message is gone — skip reply stage
 
 
 def button_verify(update: Update, context: CallbackContext):
@@ -115,8 +118,9 @@ def button_verify(update: Update, context: CallbackContext):
     chat_id = PENDING_VERIFY[uid]["chat_id"]
     msg_id = PENDING_VERIFY[uid]["msg_id"]
 
-    # verified, remove pending
+    # verified, remove pending + its kick timer
     PENDING_VERIFY.pop(uid, None)
+    scheduler.cancel(f"welcome_guard.kick.{uid}")
 
     # unrestrict user
     context.bot.restrict_chat_member(
@@ -140,18 +144,10 @@ def button_verify(update: Update, context: CallbackContext):
     context.bot.send_message(chat_id, f"✅ Verified! **Welcome to WENBNB 🧠⚡️**", parse_mode="Markdown")
 
 
-def register_handlers(dp, config=None):
-    dp.add_handler(
-        MessageHandler(Filters.text & ~Filters.command, verify_response),
-        group=0
-    )
-
-    dp.add_handler(
-        MessageHandler(Filters.status_update.new_chat_members, welcome_new_member),
-        group=1
-    )
-
-    dp.add_handler(
-        CallbackQueryHandler(button_verify, pattern="^verify_"),
-        group=2
-    )
+PLUGIN_MANIFEST = {
+    "messages": [
+        {"stage": "guard", "callback": "verify_response"},
+        {"stage": "events", "callback": "welcome_new_member"},
+    ],
+    "callbacks": [{"pattern": "^verify_", "callback": "button_verify"}],
+}
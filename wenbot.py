@@ -4,8 +4,15 @@
 # Reply Keyboard • Human Command Flow • Emotion Sync Tone
 # ============================================================
 
-import os, sys, time, logging, threading, requests, traceback
-from flask import Flask, jsonify
+import os, sys, time, logging, traceback
+
+# Startup profiler goes first so every later import is measured
+from plugins import startup_profiler
+startup_profiler.install()
+
+from plugins import scheduler
+
+import requests
 from telegram import (
     Update, ParseMode, ReplyKeyboardMarkup
 )
@@ -13,11 +20,6 @@ from telegram.ext import (
     Updater, CommandHandler, MessageHandler, Filters, CallbackContext
 )
 
-# WENBNB AI brains
-from plugins.ai_auto_reply import register_handlers as reply_handlers
-# from plugins.ai_auto_context import register_handlers as context_handlers
-from plugins import welcome_guard
-
 # ===========================
 # ⚙️ Engine & Branding
 # ===========================
@@ -47,55 +49,62 @@ if not TELEGRAM_TOKEN:
 # ===========================
 # 🌐 Flask Keep-Alive
 # ===========================
-app = Flask(__name__)
-
-@app.route("/ping")
-def ping():
-    return jsonify({
-        "status": "ok",
-        "engine": ENGINE_VERSION,
-        "core": CORE_VERSION,
-        "timestamp": int(time.time())
-    })
-
-def _keep_alive_loop(ping_url: str, interval: int = 600):
-    while True:
-        try:
-            requests.get(ping_url, timeout=8)
-            logger.info("💓 KeepAlive Ping → OK")
-        except Exception as e:
-            logger.warning(f"KeepAlive error: {e}")
-        time.sleep(interval)
+def create_app():
+    """Ping app — built on demand so flask stays off the cold-start path."""
+    from flask import Flask, jsonify
+    app = Flask(__name__)
+
+    @app.route("/ping")
+    def ping():
+        return jsonify({
+            "status": "ok",
+            "engine": ENGINE_VERSION,
+            "core": CORE_VERSION,
+            "timestamp": int(time.time())
+        })
+
+    return app
+
+def _keep_alive_ping(ping_url: str):
+    try:
+        requests.get(ping_url, timeout=8)
+        logger.info("💓 KeepAlive Ping → OK")
+    except Exception as e:
+        logger.warning(f"KeepAlive error: {e}")
 
-def start_keep_alive():
+def start_keep_alive(interval: int = 600):
     if RENDER_APP_URL:
-        threading.Thread(target=_keep_alive_loop, args=(RENDER_APP_URL,), daemon=True).start()
+        scheduler.every("core.keep_alive", _keep_alive_ping, interval, first=0,
+                        args=(RENDER_APP_URL,), owner="core")
         logger.info("🩵 Keep-alive enabled (RenderSafe++)")
 
 # ===========================
 # 🧩 Plugin Manager
 # ===========================
-from plugins import plugin_manager
+from plugins import plugin_manager, metrics_exporter, perf_trace
+
+# Commands owned by the core — plugins claiming these are reported as conflicts
+CORE_COMMANDS = ("start", "about")
 
 def register_all_plugins(dispatcher):
+    # Setup hooks (threads, reboot notices) wait until polling is live
     try:
-        plugin_manager.load_all_plugins(dispatcher)
+        plugin_manager.load_all_plugins(dispatcher, reserved=CORE_COMMANDS, defer_setup=True)
         logger.info("✅ PluginManager loaded successfully.")
     except Exception as e:
         logger.error(f"❌ PluginManager failed: {e}")
 
-# ===========================
-# 🧠 Core Plugin Imports
-# ===========================
-try:
-    from plugins import (
-        aianalyze,
-        ai_auto_reply,
-        admin_tools
-    )
-    logger.info("🧠 Core modules loaded successfully (AI, Admin, Auto-Reply)")
-except Exception as e:
-    logger.warning(f"⚠️ Core plugin import failed: {e}")
+def finish_startup(dispatcher):
+    """Runs after polling starts: plugin setup hooks, then the startup report."""
+    try:
+        with startup_profiler.phase("plugin_setup"):
+            plugin_manager.run_deferred_setups(dispatcher)
+    except Exception as e:
+        logger.error(f"❌ Deferred plugin setup failed: {e}")
+    startup_profiler.mark("ready")
+    metrics_exporter.start()
+    startup_profiler.uninstall()
+    startup_profiler.write_report()
 
 # ===========================
 # 🛡️ Instance Lock
@@ -118,22 +127,13 @@ def release_instance_lock():
 # ===========================
 # 💬 Telegram Bot Setup
 # ===========================
-def start_bot():
-    check_single_instance()
-
-    updater = Updater(TELEGRAM_TOKEN, use_context=True)
-    dp = updater.dispatcher
-
-    # WENBNB Neural core sequence
-    # context_handlers(dp)   # thread + topic lock
-
+def build_dispatcher(dp):
     try:
         dp.handlers.clear()
     except Exception:
         pass
 
-    reply_handlers(dp)     # human vibe + emotion sync
-
+    # Manifest registry: lazy plugins, one owner per command / reply stage
     register_all_plugins(dp)
 
     # === /start Command ===
@@ -199,43 +199,38 @@ def start_bot():
     dp.add_handler(MessageHandler(Filters.all, ignore_verify_button), group=0)
     
     dp.add_handler(MessageHandler(Filters.text & ~Filters.command, button_handler))
-    dp.add_handler(MessageHandler(Filters.text & ~Filters.command, ai_auto_reply.ai_auto_chat))
 
-    welcome_guard.register_handlers(dp)
+    # Live metrics: counts every update ahead of all handlers (group -100)
+    metrics_exporter.install(dp)
+    # Spans for outbound HTTP / LLM / Telegram calls inside handler traces
+    perf_trace.install()
+    return dp
 
-    # === Plugin Command Handlers ===
-    try:
-        dp.add_handler(CommandHandler("aianalyze", aianalyze.aianalyze_cmd))
-        dp.add_handler(CommandHandler("admin", lambda u, c: admin_tools.admin_status(u, c, {
-            "version": ENGINE_VERSION,
-            "branding": {"footer": BRAND_SIGNATURE},
-            "admin": {"allowed_admins": [int(os.getenv("OWNER_ID", "0"))]}
-        })))
-        dp.add_handler(CommandHandler("reboot", lambda u, c: admin_tools.admin_reboot(u, c, {
-            "admin": {"allowed_admins": [int(os.getenv("OWNER_ID", "0"))]}
-        })))
-        logger.info("💬 Plugin command handlers active")
-    except Exception as e:
-        logger.warning(f"⚠️ Plugin load issue: {e}")
-        traceback.print_exc()
+def start_bot():
+    check_single_instance()
+
+    with startup_profiler.phase("updater"):
+        updater = Updater(TELEGRAM_TOKEN, use_context=True)
+    with startup_profiler.phase("dispatcher"):
+        dp = build_dispatcher(updater.dispatcher)
 
     # === Heartbeat ===
     def heartbeat():
-        while True:
-            time.sleep(30)
-            try:
-                if RENDER_APP_URL:
-                    requests.get(f"{RENDER_APP_URL}/ping", timeout=5)
-                logger.info("💓 Poll heartbeat alive")
-            except Exception:
-                logger.warning("⚠️ Heartbeat missed")
+        try:
+            if RENDER_APP_URL:
+                requests.get(f"{RENDER_APP_URL}/ping", timeout=5)
+            logger.info("💓 Poll heartbeat alive")
+        except Exception:
+            logger.warning("⚠️ Heartbeat missed")
 
-    threading.Thread(target=heartbeat, daemon=True).start()
+    scheduler.every("core.heartbeat", heartbeat, 30, owner="core")
 
     # === Start Polling ===
     try:
         logger.info("🚀 Starting Telegram polling (HumanTriggerPolish Reply Mode)...")
         updater.start_polling(clean=True)
+        startup_profiler.mark("polling")
+        scheduler.once("core.finish_startup", finish_startup, 0, args=(dp,), owner="core")
         updater.idle()
     except Exception as e:
         logger.error(f"❌ Polling error: {e}")
@@ -253,6 +248,7 @@ def main():
         logger.error(f"❌ Fatal error in main: {e}")
         traceback.print_exc()
     finally:
+        scheduler.shutdown()
         release_instance_lock()
 
 if __name__ == "__main__":